@@ -3,25 +3,211 @@ Secure Alarm System Integration for Home Assistant
 Custom security system with dedicated authentication and database
 """
 import logging
-import asyncio
-from datetime import timedelta
-from typing import Optional
+import base64
+import binascii
+import functools
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import Unauthorized
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.event import async_track_time_interval
-from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, CONF_DB_PATH
+from .const import (
+    DOMAIN,
+    CONF_PIN_HASH_BUDGET,
+    PIN_HASH_BUDGET_MS,
+    QUERY_DEFAULT_LIMIT,
+    QUERY_MAX_LIMIT,
+    USER_FIELDS,
+    EVENT_FIELDS,
+    ZONE_FIELDS,
+    FAILED_ATTEMPT_FIELDS,
+    RETENTION_MAX_BATCHES,
+    EXPORT_DIR,
+    EXPORT_SOURCE_EVENTS,
+    EXPORT_SOURCE_FAILED_ATTEMPTS,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_JSONL,
+    RETENTION_PRUNE_INTERVAL,
+    ZONE_TYPE_PERIMETER,
+    ZONE_TYPE_INTERIOR,
+    ZONE_TYPE_ENTRY,
+)
 from .database import AlarmDatabase
+from .admission import SOURCE_SERVICE, AuthCaller, auth_caller
 from .alarm_coordinator import AlarmCoordinator
+from .timestamps import ms_to_iso, now_ms, to_ms
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = ["alarm_control_panel", "sensor", "binary_sensor"]
 
+PAGE_SCHEMA = {
+    vol.Optional("limit", default=QUERY_DEFAULT_LIMIT): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=QUERY_MAX_LIMIT)
+    ),
+    vol.Optional("offset", default=0): vol.All(vol.Coerce(int), vol.Range(min=0)),
+}
+
+# Admin services take an admin PIN or a session token from authenticate_admin
+ADMIN_AUTH_SCHEMA = {
+    vol.Optional("admin_pin"): cv.string,
+    vol.Optional("session_token"): cv.string,
+}
+ADMIN_AUTH_REQUIRED = cv.has_at_least_one_key("admin_pin", "session_token")
+
+# One entry of secure_alarm.batch, validated by its action
+BATCH_OPERATION_SCHEMA = cv.key_value_schemas("action", {
+    "bypass_zone": vol.Schema({
+        vol.Required("action"): "bypass_zone",
+        vol.Required("zone_entity_id"): cv.entity_id,
+        vol.Optional("bypass", default=True): cv.boolean,
+    }),
+    "add_user": vol.Schema({
+        vol.Required("action"): "add_user",
+        vol.Required("name"): cv.string,
+        vol.Required("pin"): cv.string,
+        vol.Optional("is_admin", default=False): cv.boolean,
+        vol.Optional("is_duress", default=False): cv.boolean,
+        vol.Optional("phone"): cv.string,
+        vol.Optional("email"): cv.string,
+        vol.Optional("has_separate_lock_pin", default=False): cv.boolean,
+        vol.Optional("lock_pin"): cv.string,
+    }),
+    "update_user": vol.Schema({
+        vol.Required("action"): "update_user",
+        vol.Required("user_id"): cv.positive_int,
+        vol.Optional("name"): cv.string,
+        vol.Optional("pin"): cv.string,
+        vol.Optional("phone"): cv.string,
+        vol.Optional("email"): cv.string,
+        vol.Optional("is_admin"): cv.boolean,
+        vol.Optional("has_separate_lock_pin"): cv.boolean,
+        vol.Optional("lock_pin"): cv.string,
+    }),
+    "set_user_lock_access": vol.Schema({
+        vol.Required("action"): "set_user_lock_access",
+        vol.Required("user_id"): cv.positive_int,
+        vol.Required("lock_entity_id"): cv.entity_id,
+        vol.Required("can_access"): cv.boolean,
+    }),
+    "update_config": vol.Schema({
+        vol.Required("action"): "update_config",
+        vol.Optional("entry_delay"): cv.positive_int,
+        vol.Optional("exit_delay"): cv.positive_int,
+        vol.Optional("alarm_duration"): cv.positive_int,
+        vol.Optional("trigger_doors"): cv.string,
+        vol.Optional("notification_mobile"): cv.boolean,
+        vol.Optional("notification_sms"): cv.boolean,
+        vol.Optional("sms_numbers"): cv.string,
+    }),
+})
+
+# One zone of secure_alarm.register_zones; a bare entity ID uses the defaults
+ZONE_REGISTRATION_SCHEMA = vol.All(
+    lambda value: {"entity_id": value} if isinstance(value, str) else value,
+    vol.Schema({
+        vol.Required("entity_id"): cv.entity_id,
+        vol.Optional("zone_name"): cv.string,
+        vol.Optional("zone_type", default=ZONE_TYPE_PERIMETER): vol.In(
+            [ZONE_TYPE_PERIMETER, ZONE_TYPE_INTERIOR, ZONE_TYPE_ENTRY]
+        ),
+        vol.Optional("enabled_away", default=True): cv.boolean,
+        vol.Optional("enabled_home", default=True): cv.boolean,
+    })
+)
+
+def _fields(allowed: tuple) -> vol.All:
+    """Validate a list of field names to return."""
+    return vol.All(cv.ensure_list, [vol.In(allowed)])
+
+def _page_cursor(value: Any) -> Tuple[int, int]:
+    """Decode a next_cursor value into the (timestamp, id) key it encodes."""
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(
+            cv.string(value).encode()
+        ).decode().rsplit("|", 1)
+        return int(timestamp), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as err:
+        raise vol.Invalid("invalid cursor") from err
+
+def _encode_cursor(key: Optional[Tuple[int, int]]) -> Optional[str]:
+    """Encode a (timestamp, id) key as an opaque cursor."""
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(f"{key[0]}|{key[1]}".encode()).decode()
+
+def _page_response(key: str, page: Dict[str, Any], offset: int,
+                   time_fields: Tuple[str, ...] = ()) -> ServiceResponse:
+    """Build a paginated service response.
+    
+    Epoch millisecond ``time_fields`` are returned as ISO 8601 UTC strings.
+    """
+    items = page["items"]
+    total = page["total"]
+    end = offset + len(items)
+    
+    for item in items:
+        for field in time_fields:
+            if field in item:
+                item[field] = ms_to_iso(item[field])
+    
+    response = {
+        key: items,
+        "total": total,
+        "offset": offset,
+        "next_offset": end if total is not None and end < total else None,
+    }
+    
+    if "next_key" in page:
+        response["next_cursor"] = _encode_cursor(page["next_key"])
+    
+    return response
+
+def _paginate(rows: List[Dict], call: ServiceCall) -> Dict[str, Any]:
+    """Slice rows to the requested page and keep only the requested fields."""
+    offset = call.data["offset"]
+    items = rows[offset:offset + call.data["limit"]]
+    fields = call.data.get("fields")
+    
+    if fields:
+        items = [{field: row.get(field) for field in fields} for row in items]
+    
+    return {"total": len(rows), "items": items}
+
+def _epoch_ms(value: Optional[datetime]) -> Optional[int]:
+    """Convert a service datetime to stored epoch milliseconds."""
+    if value is None:
+        return None
+    return to_ms(dt_util.as_utc(value))
+
+def _admission_scope(handler):
+    """Attribute PIN checks made by a service handler to its caller.
+    
+    The Home Assistant user comes from the call context. The ``code``
+    field is caller supplied, so it is only stored with failed attempts
+    and never used as the lockout source.
+    """
+    @functools.wraps(handler)
+    async def wrapper(call: ServiceCall):
+        caller = AuthCaller(call.service, SOURCE_SERVICE, call.context.user_id)
+        with auth_caller(caller):
+            return await handler(call)
+    
+    return wrapper
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Secure Alarm System component."""
     hass.data.setdefault(DOMAIN, {})
@@ -32,13 +218,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     # Initialize database
     db_path = hass.config.path(f"{DOMAIN}.db")
-    database = AlarmDatabase(db_path)
+    # Calibrates the bcrypt cost, so options take effect on reload
+    database = await hass.async_add_executor_job(
+        AlarmDatabase, db_path, None,
+        entry.options.get(CONF_PIN_HASH_BUDGET, PIN_HASH_BUDGET_MS)
+    )
     
     # Ensure admin user exists
-    await hass.async_add_executor_job(_ensure_admin_user, database, entry)
+    await database.async_run_job(_ensure_admin_user, database, entry)
     
     # Initialize coordinator
     coordinator = AlarmCoordinator(hass, database)
+    coordinator.async_start()
     
     # Store in hass.data
     hass.data[DOMAIN][entry.entry_id] = {
@@ -46,6 +237,32 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "coordinator": coordinator,
     }
     
+    async def _async_close_database(_event: Event) -> None:
+        """Flush buffered audit events and close the database on shutdown."""
+        await hass.async_add_executor_job(database.close)
+    
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_database)
+    )
+    
+    async def _async_prune_audit_log(_now: datetime) -> None:
+        """Prune expired audit rows, one small batch per database job."""
+        pruned = 0
+        for _ in range(RETENTION_MAX_BATCHES):
+            count = await database.async_run_job(database.prune_audit_log)
+            if not count:
+                break
+            pruned += count
+        
+        if pruned:
+            _LOGGER.info(f"Pruned {pruned} expired audit row(s)")
+    
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_prune_audit_log, timedelta(seconds=RETENTION_PRUNE_INTERVAL)
+        )
+    )
+    
     # Setup platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
@@ -89,7 +306,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        data["coordinator"].shutdown()
+        await hass.async_add_executor_job(data["database"].close)
     
     return unload_ok
 
@@ -101,6 +320,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         entry_id = list(hass.data[DOMAIN].keys())[0]
         return hass.data[DOMAIN][entry_id]
     
+    @_admission_scope
     async def handle_arm_away(call: ServiceCall) -> None:
         """Handle arm away service call."""
         data = get_data()
@@ -114,6 +334,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if not result["success"]:
             _LOGGER.warning(f"Arm away failed: {result['message']}")
     
+    @_admission_scope
     async def handle_arm_home(call: ServiceCall) -> None:
         """Handle arm home service call."""
         data = get_data()
@@ -127,6 +348,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if not result["success"]:
             _LOGGER.warning(f"Arm home failed: {result['message']}")
     
+    @_admission_scope
     async def handle_disarm(call: ServiceCall) -> None:
         """Handle disarm service call."""
         data = get_data()
@@ -140,6 +362,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if not result["success"]:
             _LOGGER.warning(f"Disarm failed: {result['message']}")
     
+    @_admission_scope
     async def handle_add_user(call: ServiceCall) -> None:
         """Handle add user service call."""
         data = get_data()
@@ -154,12 +377,13 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         email = call.data.get("email")
         has_separate_lock_pin = call.data.get("has_separate_lock_pin", False)
         lock_pin = call.data.get("lock_pin")
+        session_token = call.data.get("session_token")
         
         _LOGGER.info(f"Service: add_user called for {name}")
         
         result = await coordinator.add_user(
             name, pin, admin_pin, is_admin, is_duress,
-            phone, email, has_separate_lock_pin, lock_pin
+            phone, email, has_separate_lock_pin, lock_pin, session_token
         )
         
         if result["success"]:
@@ -183,6 +407,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 },
             )
     
+    @_admission_scope
     async def handle_remove_user(call: ServiceCall) -> None:
         """Handle remove user service call."""
         data = get_data()
@@ -190,28 +415,124 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         
         user_id = call.data.get("user_id")
         admin_pin = call.data.get("admin_pin")
+        session_token = call.data.get("session_token")
         
-        result = await coordinator.remove_user(user_id, admin_pin)
+        result = await coordinator.remove_user(user_id, admin_pin, session_token)
         
         if result["success"]:
             _LOGGER.info(f"User {user_id} removed successfully")
         else:
             _LOGGER.warning(f"Remove user failed: {result['message']}")
     
-    async def handle_get_users(call: ServiceCall) -> None:
-        """Handle get users service call."""
+    async def handle_get_users(call: ServiceCall) -> ServiceResponse:
+        """Return a page of users."""
         data = get_data()
         database = data["database"]
         
-        users = await hass.async_add_executor_job(database.get_users)
+        users = await database.async_run_job(database.get_users)
         
-        _LOGGER.info(f"Retrieved {len(users)} users")
+        for key in ("enabled", "is_admin"):
+            if key in call.data:
+                users = [user for user in users if bool(user[key]) == call.data[key]]
         
-        # Fire event with users
-        hass.bus.async_fire(f"{DOMAIN}_users_response", {
-            "users": users
-        })
+        if "name" in call.data:
+            search = call.data["name"].casefold()
+            users = [user for user in users if search in user["name"].casefold()]
+        
+        return _page_response("users", _paginate(users, call), call.data["offset"],
+                              ("created_at", "last_used"))
+    
+    async def handle_get_events(call: ServiceCall) -> ServiceResponse:
+        """Return a page of audit log events, newest first."""
+        database = get_data()["database"]
+        
+        page = await database.async_run_job(
+            database.query_events,
+            call.data["limit"],
+            call.data["offset"],
+            call.data.get("fields"),
+            call.data.get("event_type"),
+            call.data.get("user_name"),
+            call.data.get("zone_entity_id"),
+            _epoch_ms(call.data.get("since")),
+            _epoch_ms(call.data.get("until")),
+            call.data.get("cursor")
+        )
+        
+        return _page_response("events", page, call.data["offset"], ("timestamp",))
+    
+    async def handle_get_zones(call: ServiceCall) -> ServiceResponse:
+        """Return a page of zones from the in-memory registry."""
+        database = get_data()["database"]
+        now = now_ms()
+        
+        zones = database.zones.all()
+        
+        if "mode" in call.data:
+            zones = [zone for zone in zones if zone.monitored_in(call.data["mode"])]
+        if "zone_type" in call.data:
+            zones = [zone for zone in zones if zone.zone_type == call.data["zone_type"]]
+        if "bypassed" in call.data:
+            zones = [zone for zone in zones if zone.is_bypassed(now) == call.data["bypassed"]]
+        
+        rows = sorted((zone.as_dict() for zone in zones), key=lambda row: row["zone_name"])
+        
+        return _page_response("zones", _paginate(rows, call), call.data["offset"],
+                              ("bypass_until", "last_state_change"))
+    
+    async def handle_get_failed_attempts(call: ServiceCall) -> ServiceResponse:
+        """Return a page of failed authentication attempts, newest first."""
+        database = get_data()["database"]
+        
+        page = await database.async_run_job(
+            database.query_failed_attempts,
+            call.data["limit"],
+            call.data["offset"],
+            call.data.get("fields"),
+            _epoch_ms(call.data.get("since")),
+            _epoch_ms(call.data.get("until")),
+            call.data.get("cursor"),
+            call.data.get("source")
+        )
+        
+        return _page_response("attempts", page, call.data["offset"], ("timestamp",))
+    
+    async def handle_get_event_summary(call: ServiceCall) -> ServiceResponse:
+        """Return a page of daily counts of pruned audit rows, newest first."""
+        database = get_data()["database"]
+        since = call.data.get("since")
+        until = call.data.get("until")
+        
+        page = await database.async_run_job(
+            database.query_event_summary,
+            call.data["limit"],
+            call.data["offset"],
+            call.data.get("event_type"),
+            since.isoformat() if since else None,
+            until.isoformat() if until else None
+        )
+        
+        return _page_response("days", page, call.data["offset"])
+    
+    @_admission_scope
+    async def handle_set_audit_retention(call: ServiceCall) -> None:
+        """Handle set audit retention service call."""
+        data = get_data()
+        coordinator = data["coordinator"]
+        
+        result = await coordinator.set_audit_retention(
+            call.data["event_type"],
+            call.data.get("days"),
+            call.data.get("admin_pin"),
+            session_token=call.data.get("session_token")
+        )
+        
+        if result["success"]:
+            _LOGGER.info(f"Audit retention for {call.data['event_type']} updated")
+        else:
+            _LOGGER.warning(f"Set audit retention failed: {result['message']}")
     
+    @_admission_scope
     async def handle_update_user(call: ServiceCall) -> None:
         """Handle update user service call."""
         data = get_data()
@@ -222,14 +543,15 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         pin = call.data.get("pin")
         phone = call.data.get("phone")
         email = call.data.get("email")
-        is_admin = call.data.get("is_admin", False)
-        has_separate_lock_pin = call.data.get("has_separate_lock_pin", False)
+        is_admin = call.data.get("is_admin")
+        has_separate_lock_pin = call.data.get("has_separate_lock_pin")
         lock_pin = call.data.get("lock_pin")
         admin_pin = call.data.get("admin_pin")
+        session_token = call.data.get("session_token")
         
         result = await coordinator.update_user(
             user_id, name, pin, phone, email, is_admin,
-            has_separate_lock_pin, lock_pin, admin_pin
+            has_separate_lock_pin, lock_pin, admin_pin, session_token
         )
         
         if result["success"]:
@@ -237,6 +559,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         else:
             _LOGGER.warning(f"Update user failed: {result['message']}")
     
+    @_admission_scope
     async def handle_bypass_zone(call: ServiceCall) -> None:
         """Handle bypass zone service call."""
         data = get_data()
@@ -253,50 +576,153 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         else:
             _LOGGER.warning(f"Bypass zone failed: {result['message']}")
     
+    @_admission_scope
+    async def handle_remove_zone(call: ServiceCall) -> None:
+        """Handle remove zone service call."""
+        data = get_data()
+        coordinator = data["coordinator"]
+        
+        zone_entity_id = call.data.get("zone_entity_id")
+        admin_pin = call.data.get("admin_pin")
+        session_token = call.data.get("session_token")
+        
+        result = await coordinator.remove_zone(zone_entity_id, admin_pin, session_token)
+        
+        if result["success"]:
+            _LOGGER.info(f"Zone {zone_entity_id} removed")
+        else:
+            _LOGGER.warning(f"Remove zone failed: {result['message']}")
+    
+    async def handle_register_zones(call: ServiceCall) -> ServiceResponse:
+        """Add or update many zones in one transaction."""
+        # Same rule as admin services: HA admins and automations only
+        if call.context.user_id:
+            user = await hass.auth.async_get_user(call.context.user_id)
+            if user is None or not user.is_admin:
+                raise Unauthorized(context=call.context)
+        
+        database = get_data()["database"]
+        zones = []
+        
+        for zone in call.data["zones"]:
+            if "zone_name" not in zone:
+                state = hass.states.get(zone["entity_id"])
+                zone = {
+                    **zone,
+                    "zone_name": state.attributes.get("friendly_name", zone["entity_id"])
+                    if state else zone["entity_id"],
+                }
+            zones.append(zone)
+        
+        result = await database.async_run_job(database.register_zones, zones)
+        
+        if result is None:
+            return {"success": False, "message": "Failed to register zones"}
+        
+        _LOGGER.info(
+            f"Registered zones: {len(result['added'])} added, "
+            f"{len(result['changed'])} changed, {len(result['unchanged'])} unchanged"
+        )
+        
+        return {"success": True, **result}
+    
+    @_admission_scope
     async def handle_update_config(call: ServiceCall) -> None:
         """Handle update configuration service call."""
         data = get_data()
         coordinator = data["coordinator"]
         
         admin_pin = call.data.get("admin_pin")
+        session_token = call.data.get("session_token")
         config_updates = {
             k: v for k, v in call.data.items()
-            if k not in ["admin_pin"]
+            if k not in ["admin_pin", "session_token"]
         }
         
-        result = await coordinator.update_config(admin_pin, config_updates)
+        result = await coordinator.update_config(admin_pin, config_updates, session_token)
         
         if result["success"]:
             _LOGGER.info("Configuration updated successfully")
         else:
             _LOGGER.warning(f"Update config failed: {result['message']}")
     
-    async def handle_authenticate_admin(call: ServiceCall) -> None:
-        """Authenticate admin PIN and fire result event."""
+    @_admission_scope
+    async def handle_authenticate_admin(call: ServiceCall) -> ServiceResponse:
+        """Authenticate admin PIN and return a session token."""
         data = get_data()
-        database = data["database"]
+        coordinator = data["coordinator"]
         
         pin = call.data.get("pin")
         
         _LOGGER.info(f"Admin authentication attempt with PIN length {len(pin)}")
         
-        # Authenticate the user directly
-        user = await hass.async_add_executor_job(
-            database.authenticate_user,
-            pin,
-            None
+        result = await coordinator.start_admin_session(pin)
+        user = result.get("user")
+        
+        _LOGGER.info(f"Admin auth result: success={result['success']}, user={user.get('name') if user else None}")
+        
+        return {
+            "success": result["success"],
+            "is_admin": result["success"],
+            "user_name": user.get('name') if user else None,
+            "session_token": result.get("session_token"),
+            "expires_in": result.get("expires_in"),
+            "rate_limited": result.get("rate_limited", False),
+        }
+    
+    @_admission_scope
+    async def handle_batch(call: ServiceCall) -> ServiceResponse:
+        """Apply a list of operations under one authentication and transaction."""
+        coordinator = get_data()["coordinator"]
+        
+        result = await coordinator.run_batch(
+            call.data["operations"],
+            call.data.get("pin"),
+            call.data.get("session_token")
         )
         
-        success = user is not None and user.get('is_admin', False)
+        if result["success"]:
+            _LOGGER.info(result["message"])
+        else:
+            _LOGGER.warning(f"Batch failed: {result['message']}")
         
-        _LOGGER.info(f"Admin auth result: success={success}, user={user.get('name') if user else None}, is_admin={user.get('is_admin') if user else False}")
+        return result
+    
+    @_admission_scope
+    async def handle_export_events(call: ServiceCall) -> ServiceResponse:
+        """Export audit history to a file under the config directory."""
+        coordinator = get_data()["coordinator"]
         
-        # Fire event with result
-        hass.bus.async_fire(f"{DOMAIN}_auth_result", {
-            "success": success,
-            "is_admin": user.get('is_admin', False) if user else False,
-            "user_name": user.get('name') if user else None
-        })
+        source = call.data["source"]
+        export_format = call.data["format"]
+        filename = call.data.get("filename") or (
+            f"{source}-{dt_util.utcnow().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+        )
+        
+        result = await coordinator.export_events(
+            hass.config.path(EXPORT_DIR, filename),
+            source,
+            export_format,
+            _epoch_ms(call.data.get("since")),
+            _epoch_ms(call.data.get("until")),
+            call.data.get("event_type"),
+            call.data.get("admin_pin"),
+            session_token=call.data.get("session_token")
+        )
+        
+        if result["success"]:
+            _LOGGER.info(result["message"])
+        else:
+            _LOGGER.warning(f"Export failed: {result['message']}")
+        
+        return result
+    
+    async def handle_logout(call: ServiceCall) -> None:
+        """End an admin session."""
+        coordinator = get_data()["coordinator"]
+        
+        if coordinator.end_admin_session(call.data["session_token"]):
+            _LOGGER.info("Admin session ended")
     
     
     async def handle_bootstrap_admin(call: ServiceCall) -> None:
@@ -304,14 +730,14 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         data = get_data()
         database = data["database"]
         
-        users = await hass.async_add_executor_job(database.get_users)
+        users = await database.async_run_job(database.get_users)
         
         admin_name = call.data.get("name", "Admin")
         admin_pin = call.data.get("pin", "123456")
         
         _LOGGER.info(f"Bootstrap admin called - {len(users)} users exist")
         
-        user_id = await hass.async_add_executor_job(
+        user_id = await database.async_run_job(
             database.add_user,
             admin_name,
             admin_pin,
@@ -340,88 +766,46 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 },
             )
 
+    @_admission_scope
     async def handle_toggle_user_enabled(call: ServiceCall) -> None:
         """Handle toggle user enabled service call."""
         data = get_data()
-        database = data["database"]
+        coordinator = data["coordinator"]
         
         user_id = call.data.get("user_id")
         enabled = call.data.get("enabled")
         admin_pin = call.data.get("admin_pin")
+        session_token = call.data.get("session_token")
         
-        # Verify admin PIN
-        user = await hass.async_add_executor_job(
-            database.authenticate_user,
-            admin_pin,
-            None
-        )
-        
-        if not user or not user.get('is_admin', False):
-            _LOGGER.warning("Toggle user enabled failed: Admin authentication required")
-            return
-        
-        success = await hass.async_add_executor_job(
-            database.update_user,
-            user_id,
-            None,  # name
-            None,  # pin
-            None,  # is_admin
-            None,  # phone
-            None,  # email
-            None,  # has_separate_lock_pin
-            None   # lock_pin
+        result = await coordinator.set_user_enabled(
+            user_id, enabled, admin_pin, session_token
         )
         
-        # Need to update enabled field directly
-        conn = database.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(f'''
-                UPDATE {TABLE_USERS}
-                SET enabled = ?
-                WHERE id = ?
-            ''', (int(enabled), user_id))
-            conn.commit()
-            success = True
-        except Exception as e:
-            _LOGGER.error(f"Error toggling user enabled: {e}")
-            success = False
-        finally:
-            conn.close()
-        
-        if success:
+        if result["success"]:
             _LOGGER.info(f"User {user_id} enabled status set to {enabled}")
+        else:
+            _LOGGER.warning(f"Toggle user enabled failed: {result['message']}")
 
+    @_admission_scope
     async def handle_set_user_lock_access(call: ServiceCall) -> None:
         """Handle set user lock access service call."""
         data = get_data()
-        database = data["database"]
+        coordinator = data["coordinator"]
         
         user_id = call.data.get("user_id")
         lock_entity_id = call.data.get("lock_entity_id")
         can_access = call.data.get("can_access")
         admin_pin = call.data.get("admin_pin")
+        session_token = call.data.get("session_token")
         
-        # Verify admin PIN
-        user = await hass.async_add_executor_job(
-            database.authenticate_user,
-            admin_pin,
-            None
-        )
-        
-        if not user or not user.get('is_admin', False):
-            _LOGGER.warning("Set user lock access failed: Admin authentication required")
-            return
-        
-        success = await hass.async_add_executor_job(
-            database.set_user_lock_access,
-            user_id,
-            lock_entity_id,
-            can_access
+        result = await coordinator.set_user_lock_access(
+            user_id, lock_entity_id, can_access, admin_pin, session_token
         )
         
-        if success:
+        if result["success"]:
             _LOGGER.info(f"User {user_id} lock access updated for {lock_entity_id}")
+        else:
+            _LOGGER.warning(f"Set user lock access failed: {result['message']}")
     
     # Register all services
     hass.services.async_register(
@@ -450,45 +834,124 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     
     hass.services.async_register(
         DOMAIN, "add_user", handle_add_user,
-        schema=vol.Schema({
-            vol.Required("name"): cv.string,
-            vol.Required("pin"): cv.string,
-            vol.Required("admin_pin"): cv.string,
-            vol.Optional("is_admin", default=False): cv.boolean,
-            vol.Optional("is_duress", default=False): cv.boolean,
-            vol.Optional("phone"): cv.string,
-            vol.Optional("email"): cv.string,
-            vol.Optional("has_separate_lock_pin", default=False): cv.boolean,
-            vol.Optional("lock_pin"): cv.string,
-        })
+        schema=vol.All(
+            vol.Schema({
+                vol.Required("name"): cv.string,
+                vol.Required("pin"): cv.string,
+                **ADMIN_AUTH_SCHEMA,
+                vol.Optional("is_admin", default=False): cv.boolean,
+                vol.Optional("is_duress", default=False): cv.boolean,
+                vol.Optional("phone"): cv.string,
+                vol.Optional("email"): cv.string,
+                vol.Optional("has_separate_lock_pin", default=False): cv.boolean,
+                vol.Optional("lock_pin"): cv.string,
+            }),
+            ADMIN_AUTH_REQUIRED
+        )
     )
     
     hass.services.async_register(
         DOMAIN, "remove_user", handle_remove_user,
-        schema=vol.Schema({
-            vol.Required("user_id"): cv.positive_int,
-            vol.Required("admin_pin"): cv.string,
-        })
+        schema=vol.All(
+            vol.Schema({
+                vol.Required("user_id"): cv.positive_int,
+                **ADMIN_AUTH_SCHEMA,
+            }),
+            ADMIN_AUTH_REQUIRED
+        )
     )
     
     hass.services.async_register(
         DOMAIN, "get_users", handle_get_users,
-        schema=vol.Schema({})
+        schema=vol.Schema({
+            **PAGE_SCHEMA,
+            vol.Optional("fields"): _fields(USER_FIELDS),
+            vol.Optional("enabled"): cv.boolean,
+            vol.Optional("is_admin"): cv.boolean,
+            vol.Optional("name"): cv.string,
+        }),
+        supports_response=SupportsResponse.ONLY
     )
     
     hass.services.async_register(
-        DOMAIN, "update_user", handle_update_user,
+        DOMAIN, "get_events", handle_get_events,
         schema=vol.Schema({
-            vol.Required("user_id"): cv.positive_int,
-            vol.Optional("name"): cv.string,
-            vol.Optional("pin"): cv.string,
-            vol.Optional("phone"): cv.string,
-            vol.Optional("email"): cv.string,
-            vol.Optional("is_admin"): cv.boolean,
-            vol.Optional("has_separate_lock_pin"): cv.boolean,
-            vol.Optional("lock_pin"): cv.string,
-            vol.Required("admin_pin"): cv.string,
-        })
+            **PAGE_SCHEMA,
+            vol.Optional("cursor"): _page_cursor,
+            vol.Optional("fields"): _fields(EVENT_FIELDS),
+            vol.Optional("event_type"): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional("user_name"): cv.string,
+            vol.Optional("zone_entity_id"): cv.entity_id,
+            vol.Optional("since"): cv.datetime,
+            vol.Optional("until"): cv.datetime,
+        }),
+        supports_response=SupportsResponse.ONLY
+    )
+    
+    hass.services.async_register(
+        DOMAIN, "get_zones", handle_get_zones,
+        schema=vol.Schema({
+            **PAGE_SCHEMA,
+            vol.Optional("fields"): _fields(ZONE_FIELDS),
+            vol.Optional("mode"): vol.In(["armed_away", "armed_home"]),
+            vol.Optional("zone_type"): cv.string,
+            vol.Optional("bypassed"): cv.boolean,
+        }),
+        supports_response=SupportsResponse.ONLY
+    )
+    
+    hass.services.async_register(
+        DOMAIN, "get_failed_attempts", handle_get_failed_attempts,
+        schema=vol.Schema({
+            **PAGE_SCHEMA,
+            vol.Optional("cursor"): _page_cursor,
+            vol.Optional("fields"): _fields(FAILED_ATTEMPT_FIELDS),
+            vol.Optional("since"): cv.datetime,
+            vol.Optional("until"): cv.datetime,
+            vol.Optional("source"): cv.string,
+        }),
+        supports_response=SupportsResponse.ONLY
+    )
+    
+    hass.services.async_register(
+        DOMAIN, "get_event_summary", handle_get_event_summary,
+        schema=vol.Schema({
+            **PAGE_SCHEMA,
+            vol.Optional("event_type"): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional("since"): cv.date,
+            vol.Optional("until"): cv.date,
+        }),
+        supports_response=SupportsResponse.ONLY
+    )
+    
+    hass.services.async_register(
+        DOMAIN, "set_audit_retention", handle_set_audit_retention,
+        schema=vol.All(
+            vol.Schema({
+                vol.Required("event_type"): cv.string,
+                vol.Optional("days"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                **ADMIN_AUTH_SCHEMA,
+            }),
+            ADMIN_AUTH_REQUIRED
+        )
+    )
+    
+    hass.services.async_register(
+        DOMAIN, "update_user", handle_update_user,
+        schema=vol.All(
+            vol.Schema({
+                vol.Required("user_id"): cv.positive_int,
+                vol.Optional("name"): cv.string,
+                vol.Optional("pin"): cv.string,
+                vol.Optional("phone"): cv.string,
+                vol.Optional("email"): cv.string,
+                vol.Optional("is_admin"): cv.boolean,
+                vol.Optional("has_separate_lock_pin"): cv.boolean,
+                vol.Optional("lock_pin"): cv.string,
+                **ADMIN_AUTH_SCHEMA,
+            }),
+            ADMIN_AUTH_REQUIRED
+        )
     )
     
     hass.services.async_register(
@@ -501,17 +964,41 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     )
     
     hass.services.async_register(
-        DOMAIN, "update_config", handle_update_config,
+        DOMAIN, "register_zones", handle_register_zones,
         schema=vol.Schema({
-            vol.Required("admin_pin"): cv.string,
-            vol.Optional("entry_delay"): cv.positive_int,
-            vol.Optional("exit_delay"): cv.positive_int,
-            vol.Optional("alarm_duration"): cv.positive_int,
-            vol.Optional("trigger_doors"): cv.string,
-            vol.Optional("notification_mobile"): cv.boolean,
-            vol.Optional("notification_sms"): cv.boolean,
-            vol.Optional("sms_numbers"): cv.string,
-        })
+            vol.Required("zones"): vol.All(
+                cv.ensure_list, vol.Length(min=1), [ZONE_REGISTRATION_SCHEMA]
+            ),
+        }),
+        supports_response=SupportsResponse.OPTIONAL
+    )
+    
+    hass.services.async_register(
+        DOMAIN, "remove_zone", handle_remove_zone,
+        schema=vol.All(
+            vol.Schema({
+                vol.Required("zone_entity_id"): cv.entity_id,
+                **ADMIN_AUTH_SCHEMA,
+            }),
+            ADMIN_AUTH_REQUIRED
+        )
+    )
+    
+    hass.services.async_register(
+        DOMAIN, "update_config", handle_update_config,
+        schema=vol.All(
+            vol.Schema({
+                **ADMIN_AUTH_SCHEMA,
+                vol.Optional("entry_delay"): cv.positive_int,
+                vol.Optional("exit_delay"): cv.positive_int,
+                vol.Optional("alarm_duration"): cv.positive_int,
+                vol.Optional("trigger_doors"): cv.string,
+                vol.Optional("notification_mobile"): cv.boolean,
+                vol.Optional("notification_sms"): cv.boolean,
+                vol.Optional("sms_numbers"): cv.string,
+            }),
+            ADMIN_AUTH_REQUIRED
+        )
     )
     
     hass.services.async_register(
@@ -526,26 +1013,77 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         DOMAIN, "authenticate_admin", handle_authenticate_admin,
         schema=vol.Schema({
             vol.Required("pin"): cv.string,
-        })
+        }),
+        supports_response=SupportsResponse.ONLY
     )
 
     hass.services.async_register(
-        DOMAIN, "toggle_user_enabled", handle_toggle_user_enabled,
+        DOMAIN, "export_events", handle_export_events,
+        schema=vol.All(
+            vol.Schema({
+                **ADMIN_AUTH_SCHEMA,
+                vol.Optional("source", default=EXPORT_SOURCE_EVENTS): vol.In(
+                    [EXPORT_SOURCE_EVENTS, EXPORT_SOURCE_FAILED_ATTEMPTS]
+                ),
+                vol.Optional("format", default=EXPORT_FORMAT_CSV): vol.In(
+                    [EXPORT_FORMAT_CSV, EXPORT_FORMAT_JSONL]
+                ),
+                # A bare file name; exports always land in EXPORT_DIR
+                vol.Optional("filename"): vol.Match(r"^\w[\w.-]*$"),
+                vol.Optional("event_type"): vol.All(cv.ensure_list, [cv.string]),
+                vol.Optional("since"): cv.datetime,
+                vol.Optional("until"): cv.datetime,
+            }),
+            ADMIN_AUTH_REQUIRED
+        ),
+        supports_response=SupportsResponse.OPTIONAL
+    )
+    
+    hass.services.async_register(
+        DOMAIN, "batch", handle_batch,
+        schema=vol.All(
+            vol.Schema({
+                vol.Optional("pin"): cv.string,
+                vol.Optional("session_token"): cv.string,
+                vol.Required("operations"): vol.All(
+                    cv.ensure_list, vol.Length(min=1), [BATCH_OPERATION_SCHEMA]
+                ),
+            }),
+            cv.has_at_least_one_key("pin", "session_token")
+        ),
+        supports_response=SupportsResponse.OPTIONAL
+    )
+    
+    hass.services.async_register(
+        DOMAIN, "logout", handle_logout,
         schema=vol.Schema({
-            vol.Required("user_id"): cv.positive_int,
-            vol.Required("enabled"): cv.boolean,
-            vol.Required("admin_pin"): cv.string,
+            vol.Required("session_token"): cv.string,
         })
     )
 
+    hass.services.async_register(
+        DOMAIN, "toggle_user_enabled", handle_toggle_user_enabled,
+        schema=vol.All(
+            vol.Schema({
+                vol.Required("user_id"): cv.positive_int,
+                vol.Required("enabled"): cv.boolean,
+                **ADMIN_AUTH_SCHEMA,
+            }),
+            ADMIN_AUTH_REQUIRED
+        )
+    )
+
     hass.services.async_register(
         DOMAIN, "set_user_lock_access", handle_set_user_lock_access,
-        schema=vol.Schema({
-            vol.Required("user_id"): cv.positive_int,
-            vol.Required("lock_entity_id"): cv.entity_id,
-            vol.Required("can_access"): cv.boolean,
-            vol.Required("admin_pin"): cv.string,
-        })
+        schema=vol.All(
+            vol.Schema({
+                vol.Required("user_id"): cv.positive_int,
+                vol.Required("lock_entity_id"): cv.entity_id,
+                vol.Required("can_access"): cv.boolean,
+                **ADMIN_AUTH_SCHEMA,
+            }),
+            ADMIN_AUTH_REQUIRED
+        )
     )
     
     _LOGGER.info("All services registered successfully")
\ No newline at end of file
@@ -0,0 +1,218 @@
+"""Admission control in front of PIN checks for Secure Alarm System."""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .const import AUTH_BUCKET_LIMITS, AUTH_MAX_BUCKETS, AUTH_MAX_QUEUED, AUTH_MAX_WAIT
+
+
+@dataclass(frozen=True)
+class AuthCaller:
+    """Who is asking for a PIN check: service, entry point and HA user.
+
+    ``source`` is always a fixed entry point, never a value from the call
+    data, so a caller cannot get a fresh lockout window by changing it.
+    """
+
+    service: str
+    source: str
+    user_id: Optional[str] = None
+
+    @property
+    def lockout_source(self) -> str:
+        """Return the key failed attempts are counted under for lockouts."""
+        return f"user:{self.user_id}" if self.user_id is not None else self.source
+
+
+# Entry points, the lockout source of calls without a Home Assistant user
+SOURCE_SERVICE = "service"
+SOURCE_PANEL = "alarm_control_panel"
+SOURCE_UNKNOWN = "unknown"
+
+UNKNOWN_CALLER = AuthCaller(SOURCE_UNKNOWN, SOURCE_UNKNOWN)
+
+# Set by service handlers and the panel entity for the duration of a call
+AUTH_CALLER: ContextVar[Optional[AuthCaller]] = ContextVar(
+    "secure_alarm_auth_caller", default=None
+)
+
+
+@contextmanager
+def auth_caller(caller: AuthCaller) -> Iterator[None]:
+    """Attribute PIN checks made inside the block to ``caller``."""
+    token = AUTH_CALLER.set(caller)
+    try:
+        yield
+    finally:
+        AUTH_CALLER.reset(token)
+
+
+class RateLimited(Exception):
+    """A PIN check was refused by admission control before it ran."""
+
+
+class TokenBucket:
+    """Classic token bucket: ``burst`` tokens, refilled at ``rate`` per second."""
+
+    __slots__ = ("burst", "rate", "tokens", "updated")
+
+    def __init__(self, burst: float, rate: float, now: float):
+        """Initialize a full bucket."""
+        self.burst = burst
+        self.rate = rate
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        """Add the tokens earned since the last update."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Return the seconds until a token is available."""
+        self.refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """Token buckets per calling user and service.
+
+    A PIN check must take a token from each of its buckets before any
+    bcrypt work is done: its service, and the Home Assistant user if
+    there is one. Calls without a user (such as automations) are only
+    limited per service, so they do not share one bucket with every
+    other caller. A request that would wait up to
+    ``max_wait`` seconds is queued (at most ``max_queued`` at a time);
+    anything else is rejected straight away. Counters feed the admission
+    sensors.
+
+    Buckets are evicted once there are ``max_buckets``, so memory stays
+    bounded however many users call.
+
+    Only used from the event loop.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, float]] = AUTH_BUCKET_LIMITS,
+        max_wait: float = AUTH_MAX_WAIT,
+        max_queued: int = AUTH_MAX_QUEUED,
+        max_buckets: int = AUTH_MAX_BUCKETS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the controller."""
+        self._limits = limits
+        self._max_wait = max_wait
+        self._max_queued = max_queued
+        self._max_buckets = max_buckets
+        self._clock = clock
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.rejected_by: Dict[str, int] = {kind: 0 for kind in limits}
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of requests queued right now."""
+        return self._waiting
+
+    def _bucket(self, kind: str, key: str, now: float) -> TokenBucket:
+        """Return the bucket for one dimension of a caller."""
+        bucket = self._buckets.get((kind, key))
+        if bucket is None:
+            if len(self._buckets) >= self._max_buckets:
+                self._evict(now)
+            burst, rate = self._limits[kind]
+            bucket = self._buckets[(kind, key)] = TokenBucket(burst, rate, now)
+        return bucket
+
+    def _evict(self, now: float) -> None:
+        """Drop buckets that are full again (they behave like new ones).
+
+        If none are, drop the oldest user bucket; the service
+        buckets still cap the total rate of PIN checks.
+        """
+        for key, bucket in list(self._buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.burst:
+                del self._buckets[key]
+
+        if len(self._buckets) >= self._max_buckets:
+            oldest = next((key for key in self._buckets if key[0] != "service"), None)
+            if oldest is not None:
+                del self._buckets[oldest]
+
+    def _reserve(self, caller: AuthCaller, now: float) -> Tuple[float, Optional[str]]:
+        """Take a token from every bucket of ``caller`` if all have one.
+
+        Otherwise take nothing and return the longest wait and the bucket
+        kind that needs it.
+        """
+        buckets: List[Tuple[str, TokenBucket]] = [
+            ("service", self._bucket("service", caller.service, now)),
+        ]
+        if caller.user_id is not None:
+            buckets.append(("user", self._bucket("user", caller.user_id, now)))
+
+        wait, limiting = 0.0, None
+        for kind, bucket in buckets:
+            bucket_wait = bucket.wait_time(now)
+            if bucket_wait > wait:
+                wait, limiting = bucket_wait, kind
+
+        if limiting is None:
+            for _, bucket in buckets:
+                bucket.tokens -= 1
+
+        return wait, limiting
+
+    def _reject(self, limiting: str) -> bool:
+        """Count a rejection."""
+        self.rejected += 1
+        self.rejected_by[limiting] += 1
+        return False
+
+    async def admit(self, caller: AuthCaller) -> bool:
+        """Return True once ``caller`` may run a PIN check, False if rejected."""
+        start = self._clock()
+        wait, limiting = self._reserve(caller, start)
+
+        if limiting is None:
+            self.admitted += 1
+            return True
+
+        if wait > self._max_wait or self._waiting >= self._max_queued:
+            return self._reject(limiting)
+
+        self.queued += 1
+        self._waiting += 1
+        try:
+            while True:
+                await asyncio.sleep(wait)
+                now = self._clock()
+                wait, limiting = self._reserve(caller, now)
+                if limiting is None:
+                    self.admitted += 1
+                    return True
+                # Others may have taken the tokens; give up at the deadline
+                if now + wait - start > self._max_wait:
+                    return self._reject(limiting)
+        finally:
+            self._waiting -= 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters."""
+        return {
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "rejected_by": dict(self.rejected_by),
+            "waiting": self._waiting,
+            "buckets": len(self._buckets),
+        }
@@ -25,6 +25,8 @@ from .const import (
     ATTR_FAILED_ATTEMPTS,
 )
 
+from .admission import SOURCE_PANEL, AuthCaller, auth_caller
+
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(
@@ -59,48 +61,14 @@ class SecureAlarmPanel(AlarmControlPanelEntity):
             | AlarmControlPanelEntityFeature.ARM_AWAY
             | AlarmControlPanelEntityFeature.TRIGGER
         )
-        
-        # Register listener
-        self._coordinator.add_listener(self._handle_coordinator_update)
     
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
         await super().async_added_to_hass()
         
-        # Subscribe to zone state changes
-        await self._subscribe_to_zones()
-    
-    async def _subscribe_to_zones(self) -> None:
-        """Subscribe to all zone entity state changes."""
-        zones = await self.hass.async_add_executor_job(
-            self._database.get_zones
+        self.async_on_remove(
+            self._coordinator.add_listener(self._handle_coordinator_update)
         )
-        
-        for zone in zones:
-            entity_id = zone['entity_id']
-            
-            @callback
-            def zone_state_changed(event, zone_entity_id=entity_id, zone_name=zone['zone_name']):
-                """Handle zone state change."""
-                new_state = event.data.get('new_state')
-                old_state = event.data.get('old_state')
-                
-                if new_state is None:
-                    return
-                
-                # Check if zone went from off to on (closed to open)
-                if (old_state and old_state.state == 'off' and 
-                    new_state.state == 'on'):
-                    self.hass.async_create_task(
-                        self._coordinator.zone_triggered(zone_entity_id, zone_name)
-                    )
-            
-            # Track state changes
-            self.hass.bus.async_listen(
-                'state_changed',
-                zone_state_changed,
-                lambda event: event.data.get('entity_id') == entity_id
-            )
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -110,7 +78,7 @@ class SecureAlarmPanel(AlarmControlPanelEntity):
     @property
     def state(self) -> str:
         """Return the state of the alarm."""
-        coordinator_state = self._coordinator.state
+        coordinator_state = self._coordinator.snapshot.state
         
         # Map our custom ARMING state to HA's standard states
         if coordinator_state == STATE_ALARM_ARMING:
@@ -121,40 +89,38 @@ class SecureAlarmPanel(AlarmControlPanelEntity):
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
+        snapshot = self._coordinator.snapshot
         attrs = {
             ATTR_CODE_FORMAT: "number",
-            ATTR_CHANGED_BY: self._coordinator.changed_by,
+            ATTR_CHANGED_BY: snapshot.changed_by,
         }
         
         # Add triggered by if alarm is triggered or pending
-        if self._coordinator.state in [STATE_ALARM_TRIGGERED, STATE_ALARM_PENDING]:
-            attrs["triggered_by"] = self._coordinator.triggered_by
+        if snapshot.state in [STATE_ALARM_TRIGGERED, STATE_ALARM_PENDING]:
+            attrs["triggered_by"] = snapshot.triggered_by
         
         # Add failed attempts count
-        try:
-            failed_attempts = self._database.get_failed_attempts_count()
-            attrs[ATTR_FAILED_ATTEMPTS] = failed_attempts
-        except Exception as e:
-            _LOGGER.error(f"Error getting failed attempts: {e}")
+        attrs[ATTR_FAILED_ATTEMPTS] = snapshot.failed_attempts
         
         # Add bypassed zones
-        try:
-            zones = self._database.get_zones()
-            bypassed = [z['zone_name'] for z in zones if z['bypassed']]
-            if bypassed:
-                attrs[ATTR_ZONES_BYPASSED] = bypassed
-        except Exception as e:
-            _LOGGER.error(f"Error getting bypassed zones: {e}")
+        if snapshot.bypassed_zones:
+            attrs[ATTR_ZONES_BYPASSED] = list(snapshot.bypassed_zones)
         
         return attrs
     
+    def _auth_caller(self, service: str) -> AuthCaller:
+        """Describe a panel service call for admission control."""
+        user_id = self._context.user_id if self._context else None
+        return AuthCaller(service, SOURCE_PANEL, user_id)
+    
     async def async_alarm_disarm(self, code: Optional[str] = None) -> None:
         """Send disarm command."""
         if not code:
             _LOGGER.warning("Disarm called without code")
             return
         
-        result = await self._coordinator.disarm(code)
+        with auth_caller(self._auth_caller("alarm_disarm")):
+            result = await self._coordinator.disarm(code)
         
         if not result["success"]:
             _LOGGER.warning(f"Disarm failed: {result['message']}")
@@ -165,7 +131,8 @@ class SecureAlarmPanel(AlarmControlPanelEntity):
             _LOGGER.warning("Arm home called without code")
             return
         
-        result = await self._coordinator.arm_home(code)
+        with auth_caller(self._auth_caller("alarm_arm_home")):
+            result = await self._coordinator.arm_home(code)
         
         if not result["success"]:
             _LOGGER.warning(f"Arm home failed: {result['message']}")
@@ -176,7 +143,8 @@ class SecureAlarmPanel(AlarmControlPanelEntity):
             _LOGGER.warning("Arm away called without code")
             return
         
-        result = await self._coordinator.arm_away(code)
+        with auth_caller(self._auth_caller("alarm_arm_away")):
+            result = await self._coordinator.arm_away(code)
         
         if not result["success"]:
             _LOGGER.warning(f"Arm away failed: {result['message']}")
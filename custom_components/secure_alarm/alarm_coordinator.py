@@ -1,11 +1,17 @@
 """Alarm coordinator for managing alarm state and logic."""
-import asyncio
+import functools
+import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional, Dict, List, Any, Callable
 
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_point_in_time, async_call_later
+from homeassistant.const import STATE_OFF, STATE_ON
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_call_later,
+    async_track_state_change_event,
+)
 from homeassistant.util import dt as dt_util
 
 from .const import (
@@ -20,12 +26,33 @@ from .const import (
     EVENT_ALARM_DISARMED,
     EVENT_ALARM_TRIGGERED,
     EVENT_ALARM_DURESS,
+    EVENT_EXPORT_PROGRESS,
     ZONE_TYPE_ENTRY,
+    AUTH_SENSOR_UPDATE_DELAY,
 )
+from .admission import AUTH_CALLER, UNKNOWN_CALLER, AdmissionController, RateLimited
 from .database import AlarmDatabase
+from .models import AlarmConfig, AlarmSnapshot, AlarmStateRecord
+from .session import AdminSessionManager
+from .timestamps import now_ms
 
 _LOGGER = logging.getLogger(__name__)
 
+def _rate_limited_result(method):
+    """Turn a PIN check refused by admission control into a distinct result."""
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs) -> Dict[str, Any]:
+        try:
+            return await method(*args, **kwargs)
+        except RateLimited:
+            return {
+                "success": False,
+                "message": "Too many PIN attempts, try again later",
+                "rate_limited": True,
+            }
+    
+    return wrapper
+
 class AlarmCoordinator:
     """Coordinator for managing alarm system state and logic."""
     
@@ -33,15 +60,278 @@ class AlarmCoordinator:
         """Initialize the coordinator."""
         self.hass = hass
         self.database = database
-        self._state = STATE_ALARM_DISARMED
         self._previous_state = None
-        self._triggered_by = None
-        self._changed_by = None
         self._entry_timer = None
         self._exit_timer = None
         self._alarm_timer = None
+        self._entry_deadline: Optional[float] = None
+        self._exit_deadline: Optional[float] = None
+        self._alarm_deadline: Optional[float] = None
+        
+        # Pick up where we left off; timers are re-armed in async_start
+        restored = database.alarm_state
+        self._state = restored.state
+        self._changed_by = restored.changed_by
+        self._triggered_by = restored.triggered_by
+        self._triggered_entity_id = restored.triggered_entity_id
         self._listeners: List[Callable] = []
-        self._bypassed_zones: set = set()
+        self._config: AlarmConfig = database.config
+        self._remove_config_listener = database.add_config_listener(self._config_updated)
+        self._remove_zone_listener = database.zones.add_listener(self._zones_updated)
+        self._attempts_expiry_timer = None
+        self._bypass_expiry_timer = None
+        self._zone_subscriptions: Dict[str, Callable[[], None]] = {}
+        self._sessions = AdminSessionManager()
+        self._admission = AdmissionController()
+        self._admission_listeners: List[Callable] = []
+        self._admission_update = None
+        self._snapshot: AlarmSnapshot = self._build_snapshot()
+    
+    @property
+    def config(self) -> AlarmConfig:
+        """Return the cached alarm configuration."""
+        return self._config
+    
+    def _config_updated(self, config: AlarmConfig) -> None:
+        """Receive a new config from the database thread."""
+        self.hass.loop.call_soon_threadsafe(self._async_apply_config, config)
+    
+    @callback
+    def _async_apply_config(self, config: AlarmConfig) -> None:
+        """Use the updated config for all following delays and notifications."""
+        old_config = self._config
+        self._config = config
+        
+        changed = {
+            key: value for key, value in config.as_dict().items()
+            if getattr(old_config, key) != value and key != "updated_at"
+        }
+        _LOGGER.info(f"Alarm configuration updated: {changed}")
+    
+    @callback
+    def async_start(self) -> None:
+        """Resume restored timers and start watching every zone entity."""
+        self._async_restore_timers(self.database.alarm_state)
+        self._async_sync_zone_subscriptions(self.database.zones.entity_ids())
+        self._schedule_bypass_expiry()
+        _LOGGER.info(f"Watching {len(self._zone_subscriptions)} zone(s)")
+    
+    @callback
+    def _async_restore_timers(self, restored: AlarmStateRecord) -> None:
+        """Re-arm the timers that were running when the state was saved.
+        
+        Remaining delays come from the stored absolute deadlines; a deadline
+        that passed while Home Assistant was down fires right away.
+        """
+        now = dt_util.utcnow().timestamp()
+        
+        if self._state == STATE_ALARM_ARMING:
+            self._exit_deadline = restored.exit_deadline or now
+            self._exit_timer = self._track_deadline(
+                self._exit_deadline, self._complete_arming_away
+            )
+        elif self._state == STATE_ALARM_PENDING:
+            self._entry_deadline = restored.entry_deadline or now
+            self._entry_timer = self._track_deadline(
+                self._entry_deadline, self._entry_delay_expired
+            )
+        elif self._state == STATE_ALARM_TRIGGERED and (restored.alarm_deadline or 0) > now:
+            self._alarm_deadline = restored.alarm_deadline
+            self._alarm_timer = self._track_deadline(
+                self._alarm_deadline, self._alarm_timeout
+            )
+        
+        if self._state != STATE_ALARM_DISARMED:
+            _LOGGER.warning(f"Restored alarm state {self._state} (changed by {self._changed_by})")
+    
+    def _track_deadline(self, deadline: float, action: Callable) -> Callable[[], None]:
+        """Run ``action`` at an absolute UTC epoch deadline."""
+        return async_track_point_in_time(
+            self.hass, action, dt_util.utc_from_timestamp(deadline)
+        )
+    
+    def _state_record(self) -> AlarmStateRecord:
+        """Capture the state and timer deadlines to persist."""
+        return AlarmStateRecord(
+            state=self._state,
+            changed_by=self._changed_by,
+            triggered_by=self._triggered_by,
+            triggered_entity_id=self._triggered_entity_id,
+            exit_deadline=self._exit_deadline,
+            entry_deadline=self._entry_deadline,
+            alarm_deadline=self._alarm_deadline,
+        )
+    
+    def shutdown(self) -> None:
+        """Stop timers and config and zone updates (persisted state is kept)."""
+        self._cancel_timers()
+        self._remove_config_listener()
+        self._remove_zone_listener()
+        for unsubscribe in self._zone_subscriptions.values():
+            unsubscribe()
+        self._zone_subscriptions.clear()
+        if self._attempts_expiry_timer:
+            self._attempts_expiry_timer()
+            self._attempts_expiry_timer = None
+        if self._bypass_expiry_timer:
+            self._bypass_expiry_timer()
+            self._bypass_expiry_timer = None
+        if self._admission_update:
+            self._admission_update()
+            self._admission_update = None
+    
+    @property
+    def admission(self) -> AdmissionController:
+        """Return the admission controller in front of PIN checks."""
+        return self._admission
+    
+    def add_admission_listener(self, listener: Callable) -> Callable[[], None]:
+        """Add an admission counter listener and return a function removing it."""
+        self._admission_listeners.append(listener)
+        return functools.partial(self._admission_listeners.remove, listener)
+    
+    @callback
+    def _admission_changed(self) -> None:
+        """Push the admission counters, at most once per update delay.
+        
+        Coalesced so a flood of rejected PIN checks does not turn into a
+        flood of sensor state writes.
+        """
+        if self._admission_update is None:
+            self._admission_update = async_call_later(
+                self.hass, AUTH_SENSOR_UPDATE_DELAY, self._notify_admission_listeners
+            )
+    
+    @callback
+    def _notify_admission_listeners(self, _now=None) -> None:
+        """Notify all admission counter listeners."""
+        self._admission_update = None
+        for listener in list(self._admission_listeners):
+            listener()
+    
+    @property
+    def snapshot(self) -> AlarmSnapshot:
+        """Return the current immutable view of the alarm for entities."""
+        return self._snapshot
+    
+    def _build_snapshot(self) -> AlarmSnapshot:
+        """Build a snapshot from in-memory state only (no SQL)."""
+        zones = self.database.zones
+        now = now_ms()
+        monitored = zones.monitored(self._state)
+        attempts = self.database.failed_attempts
+        failed_count = attempts.count()
+        
+        return AlarmSnapshot(
+            state=self._state,
+            changed_by=self._changed_by,
+            triggered_by=self._triggered_by,
+            failed_attempts=failed_count,
+            locked_out=attempts.is_locked_out(),
+            failed_by_source=tuple(sorted(attempts.counts().items())),
+            locked_sources=tuple(sorted(
+                (source, int(until * 1000))
+                for source, until in attempts.locked_sources().items()
+            )),
+            total_zones=len(monitored),
+            active_zones=sum(1 for zone in monitored if not zone.is_bypassed(now)),
+            bypassed_zones=tuple(zone.zone_name for zone in zones.bypassed(now)),
+        )
+    
+    @callback
+    def _refresh_snapshot(self, _now: Optional[datetime] = None) -> None:
+        """Rebuild the snapshot and notify listeners if anything changed."""
+        snapshot = self._build_snapshot()
+        self._schedule_attempts_expiry()
+        self._schedule_bypass_expiry()
+        
+        if snapshot == self._snapshot:
+            return
+        
+        self._snapshot = snapshot
+        self._notify_listeners()
+    
+    @callback
+    def _schedule_attempts_expiry(self) -> None:
+        """Refresh again when the oldest failed attempt leaves the window."""
+        if self._attempts_expiry_timer:
+            self._attempts_expiry_timer()
+            self._attempts_expiry_timer = None
+        
+        expiry = self.database.failed_attempts.next_expiry()
+        if expiry is not None:
+            self._attempts_expiry_timer = async_track_point_in_time(
+                self.hass,
+                self._refresh_snapshot,
+                dt_util.utc_from_timestamp(expiry)
+            )
+    
+    @callback
+    def _schedule_bypass_expiry(self) -> None:
+        """Refresh again when the earliest timed zone bypass ends."""
+        if self._bypass_expiry_timer:
+            self._bypass_expiry_timer()
+            self._bypass_expiry_timer = None
+        
+        expiry = self.database.zones.next_bypass_expiry()
+        if expiry is not None:
+            self._bypass_expiry_timer = async_track_point_in_time(
+                self.hass,
+                self._refresh_snapshot,
+                dt_util.utc_from_timestamp(expiry / 1000)
+            )
+    
+    def _zones_updated(self, entity_ids: List[str]) -> None:
+        """Receive zone registry changes from any thread."""
+        self.hass.loop.call_soon_threadsafe(self._async_zones_updated, entity_ids)
+    
+    @callback
+    def _async_zones_updated(self, entity_ids: List[str]) -> None:
+        """Follow added or removed zones and refresh the snapshot."""
+        self._async_sync_zone_subscriptions(entity_ids)
+        self._refresh_snapshot()
+    
+    @callback
+    def _async_sync_zone_subscriptions(self, entity_ids: List[str]) -> None:
+        """Subscribe to new zones and drop subscriptions for deleted ones.
+        
+        Home Assistant dispatches tracked state changes through a dict keyed
+        by entity_id, so each state change costs a single lookup no matter
+        how many zones or entities exist.
+        """
+        zones = self.database.zones
+        
+        for entity_id in entity_ids:
+            tracked = entity_id in self._zone_subscriptions
+            registered = entity_id in zones
+            
+            if registered and not tracked:
+                self._zone_subscriptions[entity_id] = async_track_state_change_event(
+                    self.hass, [entity_id], self._async_zone_state_changed
+                )
+                _LOGGER.debug(f"Watching zone {entity_id}")
+            elif tracked and not registered:
+                self._zone_subscriptions.pop(entity_id)()
+                _LOGGER.debug(f"Stopped watching zone {entity_id}")
+    
+    @callback
+    def _async_zone_state_changed(self, event: Event) -> None:
+        """Handle a state change of a zone entity."""
+        new_state = event.data.get('new_state')
+        old_state = event.data.get('old_state')
+        
+        if new_state is None:
+            return
+        
+        # Check if zone went from off to on (closed to open)
+        if not (old_state and old_state.state == STATE_OFF and new_state.state == STATE_ON):
+            return
+        
+        entity_id = event.data['entity_id']
+        zone = self.database.zones.get(entity_id)
+        
+        if zone:
+            self.hass.async_create_task(self.zone_triggered(entity_id, zone.zone_name))
         
     @property
     def state(self) -> str:
@@ -58,19 +348,21 @@ class AlarmCoordinator:
         """Return what triggered the alarm."""
         return self._triggered_by
     
-    def add_listener(self, listener: Callable) -> None:
-        """Add a state change listener."""
+    def add_listener(self, listener: Callable) -> Callable[[], None]:
+        """Add a snapshot change listener and return a function removing it."""
         self._listeners.append(listener)
+        return lambda: self.remove_listener(listener)
     
     def remove_listener(self, listener: Callable) -> None:
         """Remove a state change listener."""
         if listener in self._listeners:
             self._listeners.remove(listener)
     
-    async def _notify_listeners(self) -> None:
-        """Notify all listeners of state change."""
-        for listener in self._listeners:
-            await listener()
+    @callback
+    def _notify_listeners(self) -> None:
+        """Notify all listeners of a new snapshot."""
+        for listener in list(self._listeners):
+            listener()
     
     async def _set_state(self, new_state: str, changed_by: Optional[str] = None) -> None:
         """Set alarm state and notify listeners."""
@@ -81,8 +373,14 @@ class AlarmCoordinator:
         if changed_by:
             self._changed_by = changed_by
         
+        # Persist before anything else so a restart resumes this state
+        await self.database.async_run_job(
+            self.database.save_alarm_state,
+            self._state_record()
+        )
+        
         # Log state change
-        await self.hass.async_add_executor_job(
+        await self.database.async_run_job(
             self.database.log_event,
             "state_change",
             None,
@@ -98,27 +396,50 @@ class AlarmCoordinator:
             "changed_by": changed_by,
         })
         
-        await self._notify_listeners()
+        self._refresh_snapshot()
         
         _LOGGER.info(f"Alarm state changed: {old_state} -> {new_state}")
     
     async def _authenticate(self, pin: str, user_code: Optional[str] = None) -> Optional[Dict]:
-        """Authenticate user with PIN."""
-        user = await self.hass.async_add_executor_job(
+        """Authenticate user with PIN.
+        
+        Raises ``RateLimited`` if admission control refuses the check;
+        public methods report that with ``_rate_limited_result``.
+        """
+        # Rate limit before any bcrypt work is queued
+        caller = AUTH_CALLER.get() or UNKNOWN_CALLER
+        admitted = await self._admission.admit(caller)
+        self._admission_changed()
+        if not admitted:
+            _LOGGER.debug(
+                f"PIN check rejected by admission control: {caller.service} "
+                f"from {caller.source} (user {caller.user_id})"
+            )
+            raise RateLimited
+        
+        user = await self.database.async_run_job(
             self.database.authenticate_user,
             pin,
-            user_code
+            user_code,
+            caller.lockout_source,
+            caller.service
         )
         
         if user:
-            # Clear failed attempts on successful auth
-            await self.hass.async_add_executor_job(
-                self.database.clear_failed_attempts
-            )
-            
             # Check for duress code
             if user['is_duress']:
                 _LOGGER.warning(f"DURESS CODE USED by {user['name']}")
+                await self.database.async_run_job(
+                    self.database.log_event,
+                    "duress_code_used",
+                    user['id'],
+                    user['name'],
+                    self._state,
+                    None,
+                    None,
+                    None,
+                    True
+                )
                 self.hass.bus.async_fire(EVENT_ALARM_DURESS, {
                     "user_name": user['name'],
                     "user_id": user['id'],
@@ -127,9 +448,72 @@ class AlarmCoordinator:
                 
                 # Send silent notification
                 await self._send_duress_notification(user['name'])
+        elif self.database.failed_attempts.is_locked_out():
+            ended = self._sessions.revoke_all()
+            if ended:
+                _LOGGER.warning(f"Locked out, ended {ended} admin session(s)")
+        
+        # Failed attempt count and lockout may have changed either way
+        self._refresh_snapshot()
+        
+        return user
+    
+    async def authenticate_admin(self, pin: str) -> Optional[Dict]:
+        """Authenticate a PIN and return the user only if they are an admin."""
+        user = await self._authenticate(pin)
+        
+        if not user or not user['is_admin']:
+            return None
         
         return user
     
+    @_rate_limited_result
+    async def start_admin_session(self, pin: str) -> Dict[str, Any]:
+        """Authenticate an admin PIN and issue a session token."""
+        user = await self.authenticate_admin(pin)
+        
+        if not user:
+            return {"success": False, "message": "Admin authentication required"}
+        
+        token = self._sessions.create(user['id'], user['name'])
+        
+        await self.database.async_run_job(
+            self.database.log_event,
+            "admin_session_started",
+            user['id'],
+            user['name']
+        )
+        
+        return {
+            "success": True,
+            "message": "Authenticated",
+            "user": user,
+            "session_token": token,
+            "expires_in": self._sessions.idle_timeout,
+        }
+    
+    @callback
+    def end_admin_session(self, session_token: str) -> bool:
+        """Log out of an admin session."""
+        return self._sessions.revoke(session_token)
+    
+    async def authorize_admin(self, admin_pin: Optional[str] = None,
+                              session_token: Optional[str] = None) -> Optional[Dict]:
+        """Return the admin behind a session token or, failing that, an admin PIN.
+        
+        A valid token skips PIN hashing entirely and extends the session.
+        """
+        if session_token:
+            session = self._sessions.verify(session_token)
+            if session is not None:
+                return {"id": session.user_id, "name": session.user_name, "is_admin": True}
+        
+        if admin_pin:
+            return await self.authenticate_admin(admin_pin)
+        
+        return None
+    
+    @_rate_limited_result
     async def arm_away(self, pin: str, user_code: Optional[str] = None) -> Dict[str, Any]:
         """Arm the system in away mode."""
         try:
@@ -142,21 +526,20 @@ class AlarmCoordinator:
                 return {"success": False, "message": "System already arming or armed"}
             
             # Start exit delay
-            config = await self.hass.async_add_executor_job(self.database.get_config)
-            exit_delay = config.get('exit_delay', 60)
-            
-            await self._set_state(STATE_ALARM_ARMING, user['name'])
+            exit_delay = self._config.exit_delay
             
             # Cancel any existing timers
             self._cancel_timers()
             
             # Set exit timer
-            self._exit_timer = async_call_later(
-                self.hass,
-                exit_delay,
+            self._exit_deadline = dt_util.utcnow().timestamp() + exit_delay
+            self._exit_timer = self._track_deadline(
+                self._exit_deadline,
                 self._complete_arming_away
             )
             
+            await self._set_state(STATE_ALARM_ARMING, user['name'])
+            
             # TODO: Re-enable arming actions when locks/covers are configured
             # self.hass.async_create_task(self._execute_arming_actions())
             
@@ -167,10 +550,13 @@ class AlarmCoordinator:
                 "message": f"Arming away in {exit_delay} seconds",
                 "delay": exit_delay
             }
+        except RateLimited:
+            raise
         except Exception as e:
             _LOGGER.error(f"Error in arm_away: {e}", exc_info=True)
             return {"success": False, "message": f"Error: {str(e)}"}
 
+    @_rate_limited_result
     async def arm_home(self, pin: str, user_code: Optional[str] = None) -> Dict[str, Any]:
         """Arm the system in home mode."""
         try:
@@ -197,10 +583,13 @@ class AlarmCoordinator:
             _LOGGER.info(f"Armed home by {user['name']}")
             
             return {"success": True, "message": "Armed home"}
+        except RateLimited:
+            raise
         except Exception as e:
             _LOGGER.error(f"Error in arm_home: {e}", exc_info=True)
             return {"success": False, "message": f"Error: {str(e)}"}
     
+    @_rate_limited_result
     async def disarm(self, pin: str, user_code: Optional[str] = None) -> Dict[str, Any]:
         """Disarm the system."""
         try:
@@ -212,6 +601,9 @@ class AlarmCoordinator:
             # Cancel all timers
             self._cancel_timers()
             
+            self._triggered_by = None
+            self._triggered_entity_id = None
+            
             # If duress code, appear to disarm but alert
             if user['is_duress']:
                 await self._set_state(STATE_ALARM_DISARMED, user['name'])
@@ -219,8 +611,8 @@ class AlarmCoordinator:
             else:
                 await self._set_state(STATE_ALARM_DISARMED, user['name'])
             
-            self._triggered_by = None
-            self._bypassed_zones.clear()
+            # Bypasses only last for one arming cycle
+            await self.database.async_run_job(self.database.clear_zone_bypasses)
             
             # Fire disarmed event
             self.hass.bus.async_fire(EVENT_ALARM_DISARMED, {
@@ -230,6 +622,8 @@ class AlarmCoordinator:
             _LOGGER.info(f"Disarmed by {user['name']}")
             
             return {"success": True, "message": "Disarmed"}
+        except RateLimited:
+            raise
         except Exception as e:
             _LOGGER.error(f"Error in disarm: {e}", exc_info=True)
             return {"success": False, "message": f"Error: {str(e)}"}
@@ -237,6 +631,8 @@ class AlarmCoordinator:
     async def _complete_arming_away(self, _now: datetime = None) -> None:
         """Complete the arming process after exit delay."""
         try:
+            self._exit_timer = None
+            self._exit_deadline = None
             await self._set_state(STATE_ALARM_ARMED_AWAY, self._changed_by)
             
             # Fire armed event
@@ -255,25 +651,23 @@ class AlarmCoordinator:
         if self._state in [STATE_ALARM_DISARMED, STATE_ALARM_TRIGGERED]:
             return
         
+        zone_info = self.database.zones.get(zone_entity_id)
+        
+        if not zone_info:
+            _LOGGER.warning(f"Unknown zone triggered: {zone_entity_id}")
+            return
+        
         # Check if zone is bypassed
-        if zone_entity_id in self._bypassed_zones:
+        if zone_info.is_bypassed():
             _LOGGER.info(f"Zone {zone_name} triggered but bypassed")
             return
         
-        # Get zone info
-        zones = await self.hass.async_add_executor_job(
-            self.database.get_zones,
-            self._state
-        )
-        
-        zone_info = next((z for z in zones if z['entity_id'] == zone_entity_id), None)
-        
-        if not zone_info:
-            _LOGGER.warning(f"Unknown zone triggered: {zone_entity_id}")
+        if not zone_info.monitored_in(self._state):
+            _LOGGER.debug(f"Zone {zone_name} is not monitored in {self._state}")
             return
         
         # If it's an entry zone and we're armed, start entry delay
-        if zone_info['zone_type'] == ZONE_TYPE_ENTRY and self._state in [STATE_ALARM_ARMED_AWAY, STATE_ALARM_ARMED_HOME]:
+        if zone_info.zone_type == ZONE_TYPE_ENTRY and self._state in [STATE_ALARM_ARMED_AWAY, STATE_ALARM_ARMED_HOME]:
             if self._state != STATE_ALARM_PENDING:
                 await self._start_entry_delay(zone_entity_id, zone_name)
         else:
@@ -282,35 +676,59 @@ class AlarmCoordinator:
     
     async def _start_entry_delay(self, zone_entity_id: str, zone_name: str) -> None:
         """Start entry delay timer."""
-        config = await self.hass.async_add_executor_job(self.database.get_config)
-        entry_delay = config.get('entry_delay', 30)
-        
-        await self._set_state(STATE_ALARM_PENDING, self._changed_by)
-        self._triggered_by = zone_name
+        entry_delay = self._config.entry_delay
         
         # Cancel existing entry timer if any
         if self._entry_timer:
             self._entry_timer()
         
         # Set new entry timer
-        self._entry_timer = async_call_later(
-            self.hass,
-            entry_delay,
-            lambda _: asyncio.create_task(self._trigger_alarm(zone_entity_id, zone_name))
+        self._triggered_by = zone_name
+        self._triggered_entity_id = zone_entity_id
+        self._entry_deadline = dt_util.utcnow().timestamp() + entry_delay
+        self._entry_timer = self._track_deadline(
+            self._entry_deadline,
+            self._entry_delay_expired
         )
         
+        await self._set_state(STATE_ALARM_PENDING, self._changed_by)
+        
         _LOGGER.warning(f"Entry delay started: {zone_name}, {entry_delay}s to disarm")
     
+    @callback
+    def _entry_delay_expired(self, _now: datetime = None) -> None:
+        """Trigger the alarm for the zone that started the entry delay."""
+        self._entry_timer = None
+        self._entry_deadline = None
+        self.hass.async_create_task(
+            self._trigger_alarm(self._triggered_entity_id, self._triggered_by)
+        )
+    
     async def _trigger_alarm(self, zone_entity_id: str, zone_name: str) -> None:
         """Trigger the alarm."""
         if self._state == STATE_ALARM_TRIGGERED:
             return
         
+        if self._entry_timer:
+            self._entry_timer()
+            self._entry_timer = None
+        self._entry_deadline = None
+        
+        # Set alarm duration timer
+        alarm_duration = self._config.alarm_duration
+        
+        self._alarm_deadline = dt_util.utcnow().timestamp() + alarm_duration
+        self._alarm_timer = self._track_deadline(
+            self._alarm_deadline,
+            self._alarm_timeout
+        )
+        
         self._triggered_by = zone_name
+        self._triggered_entity_id = zone_entity_id
         await self._set_state(STATE_ALARM_TRIGGERED, self._changed_by)
         
         # Log trigger
-        await self.hass.async_add_executor_job(
+        await self.database.async_run_job(
             self.database.log_event,
             "alarm_triggered",
             None,
@@ -329,20 +747,12 @@ class AlarmCoordinator:
         # Send notifications
         await self._send_alarm_notification(zone_name)
         
-        # Set alarm duration timer
-        config = await self.hass.async_add_executor_job(self.database.get_config)
-        alarm_duration = config.get('alarm_duration', 300)
-        
-        self._alarm_timer = async_call_later(
-            self.hass,
-            alarm_duration,
-            self._alarm_timeout
-        )
-        
         _LOGGER.critical(f"ALARM TRIGGERED by {zone_name}")
     
     async def _alarm_timeout(self, _now: datetime = None) -> None:
         """Handle alarm timeout (stays triggered but stops siren)."""
+        self._alarm_timer = None
+        self._alarm_deadline = None
         _LOGGER.info("Alarm timeout reached")
         # You could implement siren shutoff here
     
@@ -359,19 +769,23 @@ class AlarmCoordinator:
         if self._alarm_timer:
             self._alarm_timer()
             self._alarm_timer = None
+        
+        self._entry_deadline = None
+        self._exit_deadline = None
+        self._alarm_deadline = None
     
     async def _execute_arming_actions(self) -> None:
         """Execute actions when arming (lock doors, close garage)."""
         try:
-            config = await self.hass.async_add_executor_job(self.database.get_config)
+            config = self._config
             
             # Determine delays based on current state
             if self._state == STATE_ALARM_ARMED_HOME:
-                lock_delay = config.get('lock_delay_home', 0)
-                close_delay = config.get('close_delay_home', 0)
+                lock_delay = config.lock_delay_home
+                close_delay = config.close_delay_home
             else:
-                lock_delay = config.get('lock_delay_away', 60)
-                close_delay = config.get('close_delay_away', 60)
+                lock_delay = config.lock_delay_away
+                close_delay = config.close_delay_away
             
             # Schedule lock action
             if lock_delay > 0:
@@ -447,12 +861,12 @@ class AlarmCoordinator:
     
     async def _send_alarm_notification(self, zone_name: str) -> None:
         """Send alarm trigger notifications."""
-        config = await self.hass.async_add_executor_job(self.database.get_config)
+        config = self._config
         
         message = f"🚨 ALARM TRIGGERED: {zone_name}"
         
         # Mobile notification
-        if config.get('notification_mobile', True):
+        if config.notification_mobile:
             await self.hass.services.async_call(
                 'notify',
                 'mobile_app_all',
@@ -469,8 +883,8 @@ class AlarmCoordinator:
             )
         
         # SMS notification
-        if config.get('notification_sms', False):
-            sms_numbers = config.get('sms_numbers', '')
+        if config.notification_sms:
+            sms_numbers = config.sms_numbers or ''
             if sms_numbers:
                 for number in sms_numbers.split(','):
                     await self._send_sms(number.strip(), message)
@@ -510,15 +924,16 @@ class AlarmCoordinator:
         except Exception as e:
             _LOGGER.error(f"Failed to send SMS: {e}")
     
-    async def add_user(self, name: str, pin: str, admin_pin: str,
+    @_rate_limited_result
+    async def add_user(self, name: str, pin: str, admin_pin: Optional[str],
                   is_admin: bool = False, is_duress: bool = False,
                   phone: Optional[str] = None, email: Optional[str] = None,
-                  has_separate_lock_pin: bool = False, lock_pin: Optional[str] = None) -> Dict[str, Any]:
+                  has_separate_lock_pin: bool = False, lock_pin: Optional[str] = None,
+                  session_token: Optional[str] = None) -> Dict[str, Any]:
         """Add a new user."""
-        # Verify admin PIN
-        admin_user = await self._authenticate(admin_pin)
+        admin_user = await self.authorize_admin(admin_pin, session_token)
         
-        if not admin_user or not admin_user['is_admin']:
+        if not admin_user:
             return {"success": False, "message": "Admin authentication required"}
         
         # Validate PIN length
@@ -530,7 +945,7 @@ class AlarmCoordinator:
             return {"success": False, "message": "Lock PIN must be 6-8 characters"}
         
         # Add user
-        user_id = await self.hass.async_add_executor_job(
+        user_id = await self.database.async_run_job(
             self.database.add_user,
             name,
             pin,
@@ -547,24 +962,27 @@ class AlarmCoordinator:
         else:
             return {"success": False, "message": "Failed to add user"}
     
-    async def remove_user(self, user_id: int, admin_pin: str) -> Dict[str, Any]:
+    @_rate_limited_result
+    async def remove_user(self, user_id: int, admin_pin: Optional[str],
+                          session_token: Optional[str] = None) -> Dict[str, Any]:
         """Remove a user."""
-        # Verify admin PIN
-        admin_user = await self._authenticate(admin_pin)
+        admin_user = await self.authorize_admin(admin_pin, session_token)
         
-        if not admin_user or not admin_user['is_admin']:
+        if not admin_user:
             return {"success": False, "message": "Admin authentication required"}
         
-        success = await self.hass.async_add_executor_job(
+        success = await self.database.async_run_job(
             self.database.remove_user,
             user_id
         )
         
         if success:
+            self._sessions.revoke_user(user_id)
             return {"success": True, "message": "User removed"}
         else:
             return {"success": False, "message": "Failed to remove user"}
     
+    @_rate_limited_result
     async def bypass_zone(self, zone_entity_id: str, pin: str,
                          bypass: bool = True) -> Dict[str, Any]:
         """Bypass or unbypass a zone."""
@@ -573,12 +991,10 @@ class AlarmCoordinator:
         if not user:
             return {"success": False, "message": "Invalid PIN"}
         
-        if bypass:
-            self._bypassed_zones.add(zone_entity_id)
-        else:
-            self._bypassed_zones.discard(zone_entity_id)
+        if zone_entity_id not in self.database.zones:
+            return {"success": False, "message": f"Unknown zone: {zone_entity_id}"}
         
-        success = await self.hass.async_add_executor_job(
+        success = await self.database.async_run_job(
             self.database.set_zone_bypass,
             zone_entity_id,
             bypass
@@ -589,14 +1005,35 @@ class AlarmCoordinator:
         else:
             return {"success": False, "message": "Failed to update zone"}
     
-    async def update_config(self, admin_pin: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+    @_rate_limited_result
+    async def remove_zone(self, zone_entity_id: str, admin_pin: Optional[str],
+                          session_token: Optional[str] = None) -> Dict[str, Any]:
+        """Delete a zone and stop watching it."""
+        admin_user = await self.authorize_admin(admin_pin, session_token)
+        
+        if not admin_user:
+            return {"success": False, "message": "Admin authentication required"}
+        
+        success = await self.database.async_run_job(
+            self.database.remove_zone,
+            zone_entity_id
+        )
+        
+        if success:
+            return {"success": True, "message": "Zone removed"}
+        else:
+            return {"success": False, "message": f"Unknown zone: {zone_entity_id}"}
+    
+    @_rate_limited_result
+    async def update_config(self, admin_pin: Optional[str], updates: Dict[str, Any],
+                            session_token: Optional[str] = None) -> Dict[str, Any]:
         """Update alarm configuration."""
-        admin_user = await self._authenticate(admin_pin)
+        admin_user = await self.authorize_admin(admin_pin, session_token)
         
-        if not admin_user or not admin_user['is_admin']:
+        if not admin_user:
             return {"success": False, "message": "Admin authentication required"}
         
-        success = await self.hass.async_add_executor_job(
+        success = await self.database.async_run_job(
             self.database.update_config,
             updates
         )
@@ -606,15 +1043,94 @@ class AlarmCoordinator:
         else:
             return {"success": False, "message": "Failed to update configuration"}
         
+    @_rate_limited_result
+    async def set_audit_retention(self, event_type: str, days: Optional[int],
+                                  admin_pin: Optional[str],
+                                  session_token: Optional[str] = None) -> Dict[str, Any]:
+        """Set how many days audit rows of an event type are kept (None = forever)."""
+        admin_user = await self.authorize_admin(admin_pin, session_token)
+        
+        if not admin_user:
+            return {"success": False, "message": "Admin authentication required"}
+        
+        success = await self.database.async_run_job(
+            self.database.set_audit_retention,
+            event_type,
+            days
+        )
+        
+        if success:
+            return {"success": True, "message": "Audit retention updated"}
+        else:
+            return {"success": False, "message": "Failed to update audit retention"}
+        
+    @_rate_limited_result
+    async def export_events(self, path: str, source: str, export_format: str,
+                            since: Optional[str], until: Optional[str],
+                            event_types: Optional[List[str]], admin_pin: Optional[str],
+                            session_token: Optional[str] = None) -> Dict[str, Any]:
+        """Export audit history to a file, firing progress events while it runs."""
+        admin_user = await self.authorize_admin(admin_pin, session_token)
+        
+        if not admin_user:
+            return {"success": False, "message": "Admin authentication required"}
+        
+        progress = {"source": source, "path": path}
+        
+        def report_progress(rows: int) -> None:
+            """Fire a progress event from the export thread."""
+            self.hass.loop.call_soon_threadsafe(
+                self.hass.bus.async_fire, EVENT_EXPORT_PROGRESS,
+                {**progress, "rows": rows, "done": False}
+            )
+        
+        # Exports can take minutes, so they run on the Home Assistant
+        # executor instead of the database thread
+        try:
+            rows = await self.hass.async_add_executor_job(
+                self.database.export_events,
+                path,
+                source,
+                export_format,
+                since,
+                until,
+                event_types,
+                report_progress
+            )
+        except Exception as e:
+            _LOGGER.error(f"Export to {path} failed: {e}")
+            self.hass.bus.async_fire(EVENT_EXPORT_PROGRESS, {
+                **progress, "rows": 0, "done": True, "error": str(e)
+            })
+            return {"success": False, "message": f"Export failed: {e}"}
+        
+        self.hass.bus.async_fire(EVENT_EXPORT_PROGRESS, {
+            **progress, "rows": rows, "done": True
+        })
+        
+        await self.database.async_run_job(
+            self.database.log_event,
+            "audit_exported",
+            admin_user['id'],
+            admin_user['name'],
+            None,
+            None,
+            None,
+            json.dumps({"source": source, "path": path, "rows": rows})
+        )
+        
+        return {"success": True, "message": f"Exported {rows} rows", "path": path, "rows": rows}
+        
+    @_rate_limited_result
     async def update_user(self, user_id: int, name: Optional[str], pin: Optional[str],
-                     phone: Optional[str], email: Optional[str], is_admin: bool,
-                     has_separate_lock_pin: bool, lock_pin: Optional[str],
-                     admin_pin: str) -> Dict[str, Any]:
-        """Update a user."""
-        # Verify admin PIN
-        admin_user = await self._authenticate(admin_pin)
-        
-        if not admin_user or not admin_user['is_admin']:
+                     phone: Optional[str], email: Optional[str], is_admin: Optional[bool],
+                     has_separate_lock_pin: Optional[bool], lock_pin: Optional[str],
+                     admin_pin: Optional[str],
+                     session_token: Optional[str] = None) -> Dict[str, Any]:
+        """Update a user; fields left as None keep their current value."""
+        admin_user = await self.authorize_admin(admin_pin, session_token)
+        
+        if not admin_user:
             return {"success": False, "message": "Admin authentication required"}
         
         # Validate PIN if provided
@@ -626,7 +1142,7 @@ class AlarmCoordinator:
             return {"success": False, "message": "Lock PIN must be 6-8 characters"}
         
         # Update user
-        success = await self.hass.async_add_executor_job(
+        success = await self.database.async_run_job(
             self.database.update_user,
             user_id,
             name,
@@ -639,6 +1155,89 @@ class AlarmCoordinator:
         )
         
         if success:
-            return {"success": True, "message": f"User updated"}
+            # Only an explicit demotion ends the user's admin sessions
+            if is_admin is False:
+                self._sessions.revoke_user(user_id)
+            return {"success": True, "message": "User updated"}
+        else:
+            return {"success": False, "message": "Failed to update user"}
+    
+    @_rate_limited_result
+    async def set_user_enabled(self, user_id: int, enabled: bool,
+                               admin_pin: Optional[str],
+                               session_token: Optional[str] = None) -> Dict[str, Any]:
+        """Enable or disable a user."""
+        admin_user = await self.authorize_admin(admin_pin, session_token)
+        
+        if not admin_user:
+            return {"success": False, "message": "Admin authentication required"}
+        
+        success = await self.database.async_run_job(
+            self.database.set_user_enabled,
+            user_id,
+            enabled
+        )
+        
+        if success:
+            if not enabled:
+                self._sessions.revoke_user(user_id)
+            return {"success": True, "message": f"User {'enabled' if enabled else 'disabled'}"}
         else:
-            return {"success": False, "message": "Failed to update user"}
\ No newline at end of file
+            return {"success": False, "message": "Failed to update user"}
+    
+    @_rate_limited_result
+    async def set_user_lock_access(self, user_id: int, lock_entity_id: str,
+                                   can_access: bool, admin_pin: Optional[str],
+                                   session_token: Optional[str] = None) -> Dict[str, Any]:
+        """Grant or revoke a user's access to a lock."""
+        admin_user = await self.authorize_admin(admin_pin, session_token)
+        
+        if not admin_user:
+            return {"success": False, "message": "Admin authentication required"}
+        
+        success = await self.database.async_run_job(
+            self.database.set_user_lock_access,
+            user_id,
+            lock_entity_id,
+            can_access
+        )
+        
+        if success:
+            return {"success": True, "message": "Lock access updated"}
+        else:
+            return {"success": False, "message": "Failed to update lock access"}
+    
+    @_rate_limited_result
+    async def run_batch(self, operations: List[Dict[str, Any]], pin: Optional[str] = None,
+                        session_token: Optional[str] = None) -> Dict[str, Any]:
+        """Authenticate once and apply operations in a single transaction.
+        
+        Zone bypasses need any valid PIN; every other action needs an admin.
+        """
+        for op in operations:
+            for key in ("pin", "lock_pin"):
+                value = op.get(key)
+                if value and (len(value) < 6 or len(value) > 8):
+                    return {"success": False, "message": f"{op['action']}: PIN must be 6-8 characters"}
+        
+        if all(op['action'] == "bypass_zone" for op in operations) and not session_token:
+            user = await self._authenticate(pin)
+            if not user:
+                return {"success": False, "message": "Invalid PIN"}
+        else:
+            user = await self.authorize_admin(pin, session_token)
+            if not user:
+                return {"success": False, "message": "Admin authentication required"}
+        
+        result = await self.database.async_run_job(
+            self.database.run_batch,
+            operations,
+            user['name']
+        )
+        
+        if result["success"]:
+            for op in operations:
+                if op['action'] == "update_user" and op.get('is_admin') is False:
+                    self._sessions.revoke_user(op['user_id'])
+        
+        return result
@@ -0,0 +1,207 @@
+"""Compressed cold archive of audit events for Secure Alarm System."""
+
+import gzip
+import heapq
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional
+
+from .const import ARCHIVE_INDEX_FILE, ARCHIVE_READ_CHUNK
+from .timestamps import legacy_text_to_ms, ms_to_month
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _event_key(event: Dict[str, Any]) -> tuple:
+    """Return the (timestamp, id) sort key of an event."""
+    return event["timestamp"], event["id"]
+
+
+def unique_events(events: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Drop repeats from events sorted by (timestamp, id).
+
+    A prune that archives rows and then fails (or crashes) before deleting
+    them archives the same rows again next time, so the same id can be in
+    two members, or in a member and the live table. Copies sort next to
+    each other, so comparing with the previous key is enough.
+    """
+    previous = None
+    for event in events:
+        key = _event_key(event)
+        if key != previous:
+            previous = key
+            yield event
+
+
+def _epoch(value: Any) -> int:
+    """Return an archived timestamp as epoch milliseconds.
+
+    Segments written before timestamps became integers hold
+    ``YYYY-MM-DD HH:MM:SS`` UTC strings.
+    """
+    return legacy_text_to_ms(value) if isinstance(value, str) else value
+
+
+class AuditArchive:
+    """Append-only monthly segments of audit events as gzip JSON Lines.
+
+    Events are grouped by the month of their timestamp into
+    ``events-YYYY-MM.jsonl.gz``. Each ``append`` adds one gzip member per
+    month, sorted by (timestamp, id), and records its byte offset, length,
+    time range and row count in ``index.json``. Concatenated gzip members
+    are still a valid gzip file, so segments can also be read with zcat.
+
+    The member is fsynced before the index is replaced, and the index is
+    replaced atomically, so a crash leaves at most unindexed bytes at the
+    end of a segment that readers never see.
+    """
+
+    def __init__(self, directory: str):
+        """Initialize the archive in ``directory`` (created on first append)."""
+        self._directory = directory
+        self._index_path = os.path.join(directory, ARCHIVE_INDEX_FILE)
+        self._lock = threading.Lock()
+        self._index: Dict[str, List[Dict[str, Any]]] = self._load_index()
+
+    @property
+    def directory(self) -> str:
+        """Return the archive directory."""
+        return self._directory
+
+    def _load_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Load the segment index, or start empty."""
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as index_file:
+                index = json.load(index_file)["segments"]
+        except FileNotFoundError:
+            return {}
+
+        for members in index.values():
+            for member in members:
+                member["first"] = _epoch(member["first"])
+                member["last"] = _epoch(member["last"])
+        return index
+
+    def _write_index(self, index: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Replace the index file atomically."""
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump({"segments": index}, index_file, separators=(",", ":"))
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(tmp_path, self._index_path)
+
+    def _segment_path(self, month: str) -> str:
+        """Return the segment file path for a ``YYYY-MM`` month."""
+        return os.path.join(self._directory, f"events-{month}.jsonl.gz")
+
+    def count(self) -> int:
+        """Return the number of archived events."""
+        return sum(m["count"] for members in self._index.values() for m in members)
+
+    def append(self, events: List[Dict[str, Any]]) -> None:
+        """Append events to their monthly segments and index them."""
+        if not events:
+            return
+
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            by_month.setdefault(ms_to_month(event["timestamp"]), []).append(event)
+
+        with self._lock:
+            os.makedirs(self._directory, exist_ok=True)
+            index = {month: list(members) for month, members in self._index.items()}
+
+            for month, rows in sorted(by_month.items()):
+                rows.sort(key=_event_key)
+                blob = gzip.compress(
+                    "".join(
+                        json.dumps(row, separators=(",", ":")) + "\n" for row in rows
+                    ).encode()
+                )
+
+                with open(self._segment_path(month), "ab") as segment:
+                    offset = segment.tell()
+                    segment.write(blob)
+                    segment.flush()
+                    os.fsync(segment.fileno())
+
+                index.setdefault(month, []).append(
+                    {
+                        "offset": offset,
+                        "length": len(blob),
+                        "first": rows[0]["timestamp"],
+                        "last": rows[-1]["timestamp"],
+                        "count": len(rows),
+                    }
+                )
+
+            self._write_index(index)
+            self._index = index
+
+        _LOGGER.debug(f"Archived {len(events)} audit event(s)")
+
+    def _iter_member(
+        self, month: str, member: Dict[str, Any]
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream the events of one gzip member without reading it whole."""
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        remaining = member["length"]
+        pending = b""
+
+        with open(self._segment_path(month), "rb") as segment:
+            segment.seek(member["offset"])
+            while remaining > 0:
+                chunk = segment.read(min(ARCHIVE_READ_CHUNK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+
+                pending += decompressor.decompress(chunk)
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    yield self._decode(line)
+
+        if pending.strip():
+            yield self._decode(pending)
+
+    @staticmethod
+    def _decode(line: bytes) -> Dict[str, Any]:
+        """Decode one archived event."""
+        event = json.loads(line)
+        event["timestamp"] = _epoch(event["timestamp"])
+        return event
+
+    def iter_events(
+        self, since: Optional[int] = None, until: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield archived events in (timestamp, id) order.
+
+        ``since`` is inclusive and ``until`` exclusive. Members whose time
+        range lies outside the bounds are skipped using the index alone;
+        within a month the members are merged, holding one decoded chunk
+        per member in memory. Events archived twice are yielded once.
+        """
+        index = self._index
+
+        for month in sorted(index):
+            members = [
+                member
+                for member in index[month]
+                if (since is None or member["last"] >= since)
+                and (until is None or member["first"] < until)
+            ]
+            if not members:
+                continue
+
+            streams = [self._iter_member(month, member) for member in members]
+            for event in unique_events(heapq.merge(*streams, key=_event_key)):
+                timestamp = event["timestamp"]
+                if since is not None and timestamp < since:
+                    continue
+                if until is not None and timestamp >= until:
+                    break
+                yield event
@@ -0,0 +1,125 @@
+"""Write-behind audit log writer for Secure Alarm System."""
+
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from .const import (
+    AUDIT_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL,
+    AUDIT_MAX_BUFFER,
+    TABLE_EVENTS,
+)
+from .timestamps import now_ms
+from .write_behind import WriteBehindWriter
+
+_LOGGER = logging.getLogger(__name__)
+
+EventRow = Tuple[
+    str,
+    Optional[int],
+    Optional[str],
+    int,
+    Optional[str],
+    Optional[str],
+    Optional[str],
+    Optional[str],
+    int,
+]
+
+
+class AuditLogWriter(WriteBehindWriter):
+    """Buffer audit events in memory and insert them in batches.
+
+    Ordinary events are flushed in one transaction every
+    ``flush_interval`` seconds or once ``batch_size`` events are waiting,
+    whichever comes first. Critical events flush the whole buffer
+    immediately so they are durable before the caller moves on.
+    """
+
+    def __init__(
+        self,
+        connections,
+        submit: Optional[Callable] = None,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        batch_size: int = AUDIT_BATCH_SIZE,
+    ):
+        """Initialize the writer (see ``WriteBehindWriter``)."""
+        super().__init__(connections, flush_interval, submit)
+        self._batch_size = batch_size
+        self._buffer: Deque[EventRow] = deque()
+
+    @property
+    def pending(self) -> int:
+        """Return the number of events waiting to be written."""
+        return len(self._buffer)
+
+    def append(
+        self,
+        event_type: str,
+        user_id: Optional[int] = None,
+        user_name: Optional[str] = None,
+        state_from: Optional[str] = None,
+        state_to: Optional[str] = None,
+        zone_entity_id: Optional[str] = None,
+        details: Optional[str] = None,
+        is_duress: bool = False,
+        critical: bool = False,
+    ) -> None:
+        """Queue an event, flushing now if it is critical or the batch is full."""
+        row = (
+            event_type,
+            user_id,
+            user_name,
+            now_ms(),
+            state_from,
+            state_to,
+            zone_entity_id,
+            details,
+            int(is_duress),
+        )
+
+        with self._lock:
+            self._buffer.append(row)
+            flush_now = (
+                critical or len(self._buffer) >= self._batch_size or self._schedule()
+            )
+
+        if flush_now:
+            self.flush()
+
+    def _has_pending(self) -> bool:
+        """Return True if any event is buffered."""
+        return bool(self._buffer)
+
+    def _take(self) -> List[EventRow]:
+        """Remove and return every buffered event (lock must be held)."""
+        rows = list(self._buffer)
+        self._buffer.clear()
+        return rows
+
+    def _write(self, cursor, rows: List[EventRow]) -> None:
+        """Insert a batch of events."""
+        if rows:
+            cursor.executemany(
+                f"""
+                INSERT INTO {TABLE_EVENTS}
+                (event_type, user_id, user_name, timestamp, state_from,
+                 state_to, zone_entity_id, details, is_duress)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                rows,
+            )
+
+    def _restore(self, rows: List[EventRow]) -> None:
+        """Keep the events for the next flush, oldest first, within the cap."""
+        self._buffer.extendleft(reversed(rows))
+        dropped = len(self._buffer) - AUDIT_MAX_BUFFER
+        for _ in range(max(dropped, 0)):
+            self._buffer.popleft()
+        if dropped > 0:
+            _LOGGER.error(f"Audit buffer full, dropped {dropped} oldest event(s)")
+
+    def _describe(self, rows: Optional[List[EventRow]]) -> str:
+        """Describe a batch for log messages."""
+        return f"{len(rows or [])} audit event(s)"
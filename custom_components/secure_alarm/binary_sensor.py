@@ -1,5 +1,6 @@
 """Binary sensor platform for Secure Alarm System."""
 import logging
+from typing import Any
 
 from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
@@ -10,6 +11,7 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN, STATE_ALARM_DISARMED, STATE_ALARM_TRIGGERED
+from .timestamps import ms_to_iso
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,6 +36,7 @@ class AlarmArmedBinarySensor(BinarySensorEntity):
     """Binary sensor indicating if alarm is armed."""
     
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Alarm Armed"
     _attr_device_class = BinarySensorDeviceClass.SAFETY
     
@@ -45,7 +48,9 @@ class AlarmArmedBinarySensor(BinarySensorEntity):
     
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
-        self._coordinator.add_listener(self._handle_coordinator_update)
+        self.async_on_remove(
+            self._coordinator.add_listener(self._handle_coordinator_update)
+        )
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -55,7 +60,7 @@ class AlarmArmedBinarySensor(BinarySensorEntity):
     @property
     def is_on(self) -> bool:
         """Return true if alarm is armed."""
-        return self._coordinator.state != STATE_ALARM_DISARMED
+        return self._coordinator.snapshot.state != STATE_ALARM_DISARMED
     
     @property
     def icon(self) -> str:
@@ -66,6 +71,7 @@ class AlarmTriggeredBinarySensor(BinarySensorEntity):
     """Binary sensor indicating if alarm is triggered."""
     
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Alarm Triggered"
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
     
@@ -77,7 +83,9 @@ class AlarmTriggeredBinarySensor(BinarySensorEntity):
     
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
-        self._coordinator.add_listener(self._handle_coordinator_update)
+        self.async_on_remove(
+            self._coordinator.add_listener(self._handle_coordinator_update)
+        )
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -87,7 +95,7 @@ class AlarmTriggeredBinarySensor(BinarySensorEntity):
     @property
     def is_on(self) -> bool:
         """Return true if alarm is triggered."""
-        return self._coordinator.state == STATE_ALARM_TRIGGERED
+        return self._coordinator.snapshot.state == STATE_ALARM_TRIGGERED
     
     @property
     def icon(self) -> str:
@@ -98,6 +106,7 @@ class SystemLockedOutBinarySensor(BinarySensorEntity):
     """Binary sensor indicating if system is locked out."""
     
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "System Locked Out"
     _attr_device_class = BinarySensorDeviceClass.LOCK
     
@@ -109,7 +118,9 @@ class SystemLockedOutBinarySensor(BinarySensorEntity):
     
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
-        self._coordinator.add_listener(self._handle_coordinator_update)
+        self.async_on_remove(
+            self._coordinator.add_listener(self._handle_coordinator_update)
+        )
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -118,12 +129,20 @@ class SystemLockedOutBinarySensor(BinarySensorEntity):
     
     @property
     def is_on(self) -> bool:
-        """Return true if system is locked out."""
-        try:
-            return self._database.is_locked_out()
-        except Exception as e:
-            _LOGGER.error(f"Error checking lockout status: {e}")
-            return False
+        """Return true if the system or any source is locked out."""
+        snapshot = self._coordinator.snapshot
+        return snapshot.locked_out or bool(snapshot.locked_sources)
+    
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the global lockout and when each source lockout ends."""
+        snapshot = self._coordinator.snapshot
+        return {
+            "global_lockout": snapshot.locked_out,
+            "locked_sources": {
+                source: ms_to_iso(until) for source, until in snapshot.locked_sources
+            },
+        }
     
     @property
     def icon(self) -> str:
@@ -9,7 +9,7 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN
+from .const import DOMAIN, CONF_PIN_HASH_BUDGET, PIN_HASH_BUDGET_MS
 from .database import AlarmDatabase
 
 _LOGGER = logging.getLogger(__name__)
@@ -96,5 +96,11 @@ class SecureAlarmOptionsFlow(config_entries.OptionsFlow):
                     "alarm_duration",
                     default=self.config_entry.options.get("alarm_duration", 300)
                 ): cv.positive_int,
+                vol.Optional(
+                    CONF_PIN_HASH_BUDGET,
+                    default=self.config_entry.options.get(
+                        CONF_PIN_HASH_BUDGET, PIN_HASH_BUDGET_MS
+                    )
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=2000)),
             })
         )
\ No newline at end of file
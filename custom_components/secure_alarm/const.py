@@ -23,6 +23,7 @@ CONF_LOCK_DELAY_HOME = "lock_delay_home"
 CONF_LOCK_DELAY_AWAY = "lock_delay_away"
 CONF_CLOSE_DELAY_HOME = "close_delay_home"
 CONF_CLOSE_DELAY_AWAY = "close_delay_away"
+CONF_PIN_HASH_BUDGET = "pin_hash_budget_ms"
 
 # Defaults
 DEFAULT_ENTRY_DELAY = 30  # seconds
@@ -43,6 +44,7 @@ EVENT_ALARM_DISARMED = f"{DOMAIN}_disarmed"
 EVENT_ALARM_TRIGGERED = f"{DOMAIN}_triggered"
 EVENT_ALARM_DURESS = f"{DOMAIN}_duress_code_used"
 EVENT_FAILED_AUTH = f"{DOMAIN}_failed_auth"
+EVENT_EXPORT_PROGRESS = f"{DOMAIN}_export_progress"
 
 # Attributes
 ATTR_CHANGED_BY = "changed_by"
@@ -66,6 +68,10 @@ TABLE_CONFIG = "alarm_config"
 TABLE_EVENTS = "alarm_events"
 TABLE_FAILED_ATTEMPTS = "failed_attempts"
 TABLE_ZONES = "alarm_zones"
+TABLE_META = "alarm_meta"
+TABLE_STATE = "alarm_state"
+TABLE_RETENTION = "audit_retention"
+TABLE_DAILY_SUMMARY = "audit_daily_summary"
 
 # Zone types
 ZONE_TYPE_PERIMETER = "perimeter"
@@ -73,5 +79,97 @@ ZONE_TYPE_INTERIOR = "interior"
 ZONE_TYPE_ENTRY = "entry"
 
 # Maximum failed attempts before lockout
-MAX_FAILED_ATTEMPTS = 5
-LOCKOUT_DURATION = 300  # seconds (5 minutes)
\ No newline at end of file
+MAX_FAILED_ATTEMPTS = 5  # per source (HA user or entry point)
+MAX_FAILED_ATTEMPTS_GLOBAL = MAX_FAILED_ATTEMPTS  # across all sources; locks out everyone
+LOCKOUT_DURATION = 300  # seconds (5 minutes)
+FAILED_ATTEMPTS_WINDOW_SIZE = 1000  # most attempts kept in memory per window
+LOCKOUT_MAX_SOURCES = 100  # source windows kept in memory
+
+# Database connection tuning
+DB_SCHEMA_VERSION = 1  # PRAGMA user_version; 1 = epoch millisecond timestamps
+DB_BUSY_TIMEOUT = 5.0  # seconds to wait on a locked database
+DB_CACHE_SIZE_KIB = 4096  # page cache per connection
+DB_MAX_READERS = 4  # pooled read-only connections
+DB_QUEUE_WARN_DEPTH = 20  # log a warning when this many jobs are waiting
+
+# Secret key for PIN fingerprints, stored next to the database file
+PEPPER_FILE_SUFFIX = ".key"
+
+# bcrypt cost calibration (cost +1 doubles the time of a PIN check)
+PIN_HASH_BUDGET_MS = 100  # default target time for one PIN check
+BCRYPT_MIN_COST = 10  # never hash below this, however slow the host
+BCRYPT_MAX_COST = 14
+BCRYPT_PROBE_COST = 8  # cheap cost timed at startup to extrapolate from
+BCRYPT_PROBE_ROUNDS = 3  # probe hashes timed; the fastest is used
+BCRYPT_REHASH_TOLERANCE = 1  # stored costs this close to the chosen one are kept
+PIN_VERIFY_WORKERS = 4  # threads checking candidate hashes in parallel
+
+# Audit log write-behind buffering
+AUDIT_FLUSH_INTERVAL = 0.5  # seconds between batched flushes
+AUDIT_BATCH_SIZE = 50  # flush early once this many events are waiting
+AUDIT_MAX_BUFFER = 10000  # events kept in memory if the database is failing
+AUDIT_CRITICAL_EVENTS = ("alarm_triggered", "duress_code_used")
+
+# Write-behind for user usage counters and lockout resets after a login
+USAGE_FLUSH_INTERVAL = 5.0  # seconds between batched flushes
+
+# Query services (get_users, get_events, get_zones, get_failed_attempts)
+QUERY_DEFAULT_LIMIT = 50
+QUERY_MAX_LIMIT = 500
+USER_FIELDS = (
+    "id", "name", "is_admin", "is_duress", "enabled", "phone", "email",
+    "has_separate_lock_pin", "created_at", "last_used", "use_count",
+    "accessible_locks",
+)
+EVENT_FIELDS = (
+    "id", "event_type", "user_id", "user_name", "timestamp", "state_from",
+    "state_to", "zone_entity_id", "details", "is_duress",
+)
+ZONE_FIELDS = (
+    "id", "entity_id", "zone_name", "zone_type", "enabled_away",
+    "enabled_home", "bypassed", "bypass_until", "last_state_change",
+)
+FAILED_ATTEMPT_FIELDS = ("id", "timestamp", "ip_address", "user_code", "attempt_type")
+
+# Admission control before PIN checks (token buckets, see admission.py)
+AUTH_BUCKET_LIMITS = {  # kind: (burst, tokens refilled per second)
+    "user": (5, 0.5),  # per Home Assistant user (calls without one skip it)
+    "service": (10, 1.0),  # per service, across all callers
+}
+AUTH_MAX_WAIT = 2.0  # seconds a request may queue for a token (>= 1 / slowest rate)
+AUTH_MAX_QUEUED = 10  # requests queued at once; more are rejected
+AUTH_MAX_BUCKETS = 1000
+AUTH_SENSOR_UPDATE_DELAY = 1.0  # seconds; admission sensor updates are coalesced
+
+# Admin session tokens (issued by authenticate_admin)
+ADMIN_SESSION_IDLE_TIMEOUT = 300  # seconds without use before a session ends
+ADMIN_SESSION_MAX_AGE = 3600  # seconds after login before a session ends
+
+# Audit log retention (days per event type; None keeps rows forever)
+RETENTION_DEFAULT_TYPE = "*"  # applies to event types without their own rule
+RETENTION_FAILED_ATTEMPT = "failed_attempt"  # rule for the failed_attempts table
+# Only the high-volume types are pruned unless the user opts in
+DEFAULT_RETENTION_DAYS = {
+    RETENTION_DEFAULT_TYPE: None,
+    RETENTION_FAILED_ATTEMPT: 90,
+    "state_change": 90,
+    "alarm_triggered": None,
+    "duress_code_used": None,
+}
+RETENTION_BATCH_SIZE = 500  # rows rolled up and deleted per transaction
+RETENTION_MAX_BATCHES = 50  # batches per prune run
+RETENTION_PRUNE_INTERVAL = 3600  # seconds between prune runs
+
+# Cold archive of pruned audit events, stored next to the database file
+ARCHIVE_DIR_SUFFIX = ".archive"
+ARCHIVE_INDEX_FILE = "index.json"
+ARCHIVE_READ_CHUNK = 65536  # compressed bytes read at a time per segment member
+EVENT_STREAM_CHUNK = 500  # live rows fetched per query when streaming events
+
+# Audit history export (secure_alarm.export_events)
+EXPORT_DIR = "secure_alarm_exports"  # under the Home Assistant config directory
+EXPORT_SOURCE_EVENTS = "events"
+EXPORT_SOURCE_FAILED_ATTEMPTS = "failed_attempts"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_JSONL = "jsonl"
+EXPORT_PROGRESS_ROWS = 10000  # rows between progress events
@@ -1,45 +1,352 @@
 """Database management for Secure Alarm System."""
+import asyncio
 import sqlite3
 import logging
 import json
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
+import hashlib
+import heapq
+import hmac
+import os
+import queue
+import secrets
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Optional, Dict, List, Any, Callable, Iterator, Tuple
 import bcrypt
 
 from .const import (
+    DOMAIN,
     TABLE_USERS,
     TABLE_CONFIG,
     TABLE_EVENTS,
     TABLE_FAILED_ATTEMPTS,
     TABLE_ZONES,
+    TABLE_META,
+    TABLE_STATE,
+    TABLE_RETENTION,
+    TABLE_DAILY_SUMMARY,
     DEFAULT_ENTRY_DELAY,
     DEFAULT_EXIT_DELAY,
     DEFAULT_ALARM_DURATION,
-    MAX_FAILED_ATTEMPTS,
     LOCKOUT_DURATION,
+    DB_BUSY_TIMEOUT,
+    DB_CACHE_SIZE_KIB,
+    DB_MAX_READERS,
+    PEPPER_FILE_SUFFIX,
+    ARCHIVE_DIR_SUFFIX,
+    EVENT_STREAM_CHUNK,
+    EXPORT_SOURCE_EVENTS,
+    DB_QUEUE_WARN_DEPTH,
+    AUDIT_CRITICAL_EVENTS,
+    DB_SCHEMA_VERSION,
+    PIN_HASH_BUDGET_MS,
+    PIN_VERIFY_WORKERS,
+    QUERY_DEFAULT_LIMIT,
+    EVENT_FIELDS,
+    FAILED_ATTEMPT_FIELDS,
+    DEFAULT_RETENTION_DAYS,
 )
+from .archive import AuditArchive, unique_events
+from .audit_log import AuditLogWriter
+from .export import write_export
+from .failed_attempts import SourceLockouts
+from .models import AlarmConfig, AlarmStateRecord, User, Zone
+from .pin_hasher import PinHasher
+from .retention import AuditLogPruner
+from .timestamps import SQL_NOW_MS, now_ms, utc_timestamp
+from .usage import UsageWriter
+from .users import UserDirectory
+from .zones import ZoneRegistry
 
 _LOGGER = logging.getLogger(__name__)
 
+# Time columns stored as epoch milliseconds, and whether older versions
+# wrote them as local time instead of UTC text
+EPOCH_COLUMNS = {
+    TABLE_USERS: {"created_at": False, "last_used": False},
+    TABLE_EVENTS: {"timestamp": False},
+    TABLE_FAILED_ATTEMPTS: {"timestamp": False},
+    TABLE_ZONES: {"bypass_until": True, "last_state_change": False},
+}
+
+
+class ConnectionManager:
+    """Long-lived SQLite connections: one writer and a pool of readers.
+
+    The database runs in WAL mode so readers never block the writer and the
+    writer never blocks readers. All writes are serialized through a single
+    connection guarded by a re-entrant lock, which lets a write block nest
+    inside another one (e.g. ``set_zone_bypass`` logging an event) and share
+    its transaction instead of opening a second connection.
+    """
+
+    def __init__(self, db_path: str, max_readers: int = DB_MAX_READERS):
+        """Initialize the connection manager."""
+        self.db_path = db_path
+        self._max_readers = max_readers
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._writer: Optional[sqlite3.Connection] = None
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open and tune a new connection."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=DB_BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KIB}")
+        conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT * 1000)}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Cursor]:
+        """Run a block inside the writer's transaction.
+
+        Nested write blocks join the outermost transaction, which commits
+        when the outermost block exits and rolls back if anything raises.
+        """
+        with self._write_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Database is closed")
+            if self._writer is None:
+                self._writer = self._connect()
+
+            outermost = self._write_depth == 0
+            if outermost:
+                self._writer.execute("BEGIN IMMEDIATE")
+            self._write_depth += 1
+
+            try:
+                yield self._writer.cursor()
+            except BaseException:
+                self._write_depth -= 1
+                if outermost:
+                    self._writer.execute("ROLLBACK")
+                raise
+            else:
+                self._write_depth -= 1
+                if outermost:
+                    self._writer.execute("COMMIT")
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Cursor]:
+        """Borrow a pooled read-only connection."""
+        conn = self._acquire_reader()
+        try:
+            yield conn.cursor()
+        finally:
+            self._release_reader(conn)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        """Take an idle reader, opening a new one while under the pool limit."""
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._reader_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Database is closed")
+            if self._reader_count < self._max_readers:
+                self._reader_count += 1
+                open_new = True
+            else:
+                open_new = False
+
+        if open_new:
+            try:
+                return self._connect(read_only=True)
+            except Exception:
+                with self._reader_lock:
+                    self._reader_count -= 1
+                raise
+
+        return self._readers.get()
+
+    def _release_reader(self, conn: sqlite3.Connection) -> None:
+        """Return a reader to the pool, or close it after shutdown."""
+        if self._closed:
+            conn.close()
+            return
+        self._readers.put(conn)
+
+    def close(self) -> None:
+        """Close every connection held by the manager."""
+        with self._write_lock:
+            self._closed = True
+            if self._writer is not None:
+                try:
+                    self._writer.execute("PRAGMA optimize")
+                except sqlite3.Error as e:
+                    _LOGGER.debug(f"PRAGMA optimize failed: {e}")
+                self._writer.close()
+                self._writer = None
+
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
 class AlarmDatabase:
     """Database handler for alarm system."""
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, pepper: Optional[bytes] = None,
+                 hash_budget_ms: float = PIN_HASH_BUDGET_MS):
         """Initialize the database."""
         self.db_path = db_path
+        self._pepper = pepper or self._load_pepper(db_path + PEPPER_FILE_SUFFIX)
+        self._hasher = PinHasher(hash_budget_ms)
+        self._hasher.calibrate()
+        self._connections = ConnectionManager(db_path)
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{DOMAIN}_db")
+        self._pin_pool = ThreadPoolExecutor(
+            max_workers=PIN_VERIFY_WORKERS, thread_name_prefix=f"{DOMAIN}_pin"
+        )
+        self._queue_depth = 0
+        self._queue_lock = threading.Lock()
+        self._audit = AuditLogWriter(self._connections, self.submit_job)
+        self._usage = UsageWriter(self._connections, self.submit_job)
+        self._archive = AuditArchive(db_path + ARCHIVE_DIR_SUFFIX)
+        self._pruner = AuditLogPruner(self._connections, self._archive)
+        self._exports = 0
+        self._exports_lock = threading.Lock()
+        self._config = AlarmConfig()
+        self._alarm_state = AlarmStateRecord()
+        self._config_listeners: List[Callable[[AlarmConfig], None]] = []
+        self._zones = ZoneRegistry()
+        self._users = UserDirectory()
+        self._failed_attempts = SourceLockouts()
         self.init_database()
     
-    def get_connection(self) -> sqlite3.Connection:
-        """Get database connection."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of jobs queued or running on the database thread."""
+        return self._queue_depth
+    
+    async def async_run_job(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a database call on the dedicated database thread.
+        
+        All coordinator and service database work goes through this single
+        thread and its own queue, so a busy Home Assistant executor cannot
+        delay arming, disarming or audit logging.
+        """
+        return await asyncio.wrap_future(self.submit_job(func, *args))
+    
+    def submit_job(self, func: Callable[..., Any], *args: Any) -> Future:
+        """Queue a call on the database thread, counted in ``queue_depth``.
+        
+        Used by ``async_run_job`` and by the timed flushes of the
+        write-behind writers, which run on timer threads.
+        """
+        with self._queue_lock:
+            self._queue_depth += 1
+            depth = self._queue_depth
+        
+        if depth == DB_QUEUE_WARN_DEPTH:
+            _LOGGER.warning(f"Database queue depth reached {depth} jobs")
+        
+        try:
+            future = self._worker.submit(func, *args)
+        except BaseException:
+            self._job_done(None)
+            raise
+        
+        future.add_done_callback(self._job_done)
+        return future
+    
+    def _job_done(self, future: Optional[Future]) -> None:
+        """Count a database job as finished."""
+        with self._queue_lock:
+            self._queue_depth -= 1
+    
+    @staticmethod
+    def _load_pepper(path: str) -> bytes:
+        """Load the PIN fingerprint key, creating it on first run.
+        
+        The key lives in its own file next to the database so that a copy of
+        the database alone is not enough to brute-force PIN fingerprints.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as key_file:
+                return bytes.fromhex(key_file.read().strip())
+        except FileNotFoundError:
+            pass
+        
+        pepper = secrets.token_bytes(32)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as key_file:
+            key_file.write(pepper.hex())
+        _LOGGER.info(f"Created PIN fingerprint key at {path}")
+        return pepper
+    
+    def close(self) -> None:
+        """Drain the database thread, flush buffered writes and close connections."""
+        self._worker.shutdown(wait=True)
+        self._pin_pool.shutdown(wait=True, cancel_futures=True)
+        self._audit.close()
+        self._usage.close()
+        self._connections.close()
+        _LOGGER.debug("Database connections closed")
     
     def init_database(self) -> None:
         """Initialize database tables."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._connections.write() as cursor:
+            self._create_schema(cursor)
+            self._migrate_schema(cursor)
+            self._create_indexes(cursor)
+            
+            cursor.execute(f'''
+                SELECT COUNT(*) FROM {TABLE_USERS}
+                WHERE enabled = 1 AND pin_fingerprint IS NULL
+            ''')
+            legacy_users = cursor.fetchone()[0]
+            
+            cursor.execute(f"SELECT * FROM {TABLE_CONFIG} WHERE id = 1")
+            self._config = AlarmConfig.from_row(dict(cursor.fetchone()))
+            
+            cursor.execute(f"SELECT * FROM {TABLE_STATE} WHERE id = 1")
+            self._alarm_state = AlarmStateRecord.from_row(dict(cursor.fetchone()))
+            
+            cursor.execute(f"SELECT * FROM {TABLE_ZONES}")
+            self._zones.load(Zone.from_row(dict(row)) for row in cursor.fetchall())
+            
+            self._users.load(self._fetch_users(cursor))
+            self._pruner.load(cursor)
+            
+            cursor.execute(f'''
+                SELECT ip_address, timestamp FROM {TABLE_FAILED_ATTEMPTS}
+                WHERE timestamp > ?
+            ''', (now_ms() - LOCKOUT_DURATION * 1000,))
+            self._failed_attempts.load(
+                (row['ip_address'], row['timestamp'] / 1000) for row in cursor.fetchall()
+            )
+        
+        if legacy_users:
+            _LOGGER.info(
+                f"{legacy_users} user(s) have no PIN fingerprint yet; "
+                "each will be indexed on their next successful login"
+            )
         
+        _LOGGER.info("Database initialized successfully")
+    
+    def _create_schema(self, cursor: sqlite3.Cursor) -> None:
+        """Create tables if they do not exist."""
         # Users table
         cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS {TABLE_USERS} (
@@ -53,8 +360,10 @@ class AlarmDatabase:
                 email TEXT,
                 has_separate_lock_pin INTEGER DEFAULT 0,
                 lock_pin_hash TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_used TIMESTAMP,
+                pin_fingerprint TEXT,
+                lock_pin_fingerprint TEXT,
+                created_at INTEGER DEFAULT ({SQL_NOW_MS}),
+                last_used INTEGER,
                 use_count INTEGER DEFAULT 0
             )
         ''')
@@ -85,7 +394,7 @@ class AlarmDatabase:
                 event_type TEXT NOT NULL,
                 user_id INTEGER,
                 user_name TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp INTEGER NOT NULL DEFAULT ({SQL_NOW_MS}),
                 state_from TEXT,
                 state_to TEXT,
                 zone_entity_id TEXT,
@@ -98,7 +407,7 @@ class AlarmDatabase:
         cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS {TABLE_FAILED_ATTEMPTS} (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp INTEGER NOT NULL DEFAULT ({SQL_NOW_MS}),
                 ip_address TEXT,
                 user_code TEXT,
                 attempt_type TEXT
@@ -115,8 +424,8 @@ class AlarmDatabase:
                 enabled_away INTEGER DEFAULT 1,
                 enabled_home INTEGER DEFAULT 1,
                 bypassed INTEGER DEFAULT 0,
-                bypass_until TIMESTAMP,
-                last_state_change TIMESTAMP
+                bypass_until INTEGER,
+                last_state_change INTEGER
             )
         ''')
 
@@ -132,6 +441,21 @@ class AlarmDatabase:
             )
         ''')
         
+        # Current alarm state, restored on startup (deadlines in epoch seconds)
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {TABLE_STATE} (
+                id INTEGER PRIMARY KEY DEFAULT 1,
+                state TEXT NOT NULL DEFAULT 'disarmed',
+                changed_by TEXT,
+                triggered_by TEXT,
+                triggered_entity_id TEXT,
+                exit_deadline REAL,
+                entry_deadline REAL,
+                alarm_deadline REAL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         # Insert default config if not exists
         cursor.execute(f"SELECT COUNT(*) FROM {TABLE_CONFIG}")
         if cursor.fetchone()[0] == 0:
@@ -139,25 +463,198 @@ class AlarmDatabase:
                 INSERT INTO {TABLE_CONFIG} (id) VALUES (1)
             ''')
         
-        # Create indexes
+        cursor.execute(f"INSERT OR IGNORE INTO {TABLE_STATE} (id) VALUES (1)")
+        
+        # Audit retention in days per event type (NULL keeps rows forever)
         cursor.execute(f'''
-            CREATE INDEX IF NOT EXISTS idx_events_timestamp 
-            ON {TABLE_EVENTS}(timestamp DESC)
+            CREATE TABLE IF NOT EXISTS {TABLE_RETENTION} (
+                event_type TEXT PRIMARY KEY,
+                days INTEGER
+            )
         ''')
         
+        cursor.executemany(f'''
+            INSERT OR IGNORE INTO {TABLE_RETENTION} (event_type, days)
+            VALUES (?, ?)
+        ''', DEFAULT_RETENTION_DAYS.items())
+        
+        # Daily counts of pruned audit rows, kept forever
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {TABLE_DAILY_SUMMARY} (
+                day TEXT NOT NULL,
+                event_type TEXT NOT NULL,
+                zone_entity_id TEXT NOT NULL DEFAULT '',
+                user_name TEXT NOT NULL DEFAULT '',
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, event_type, zone_entity_id, user_name)
+            )
+        ''')
+    
+    def _create_indexes(self, cursor: sqlite3.Cursor) -> None:
+        """Create indexes if they do not exist (after migrations rebuild tables)."""
         cursor.execute(f'''
-            CREATE INDEX IF NOT EXISTS idx_failed_attempts_timestamp 
-            ON {TABLE_FAILED_ATTEMPTS}(timestamp DESC)
+            CREATE INDEX IF NOT EXISTS idx_users_pin_fingerprint
+            ON {TABLE_USERS}(pin_fingerprint)
         ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_users_lock_pin_fingerprint
+            ON {TABLE_USERS}(lock_pin_fingerprint)
+        ''')
         
-        _LOGGER.info("Database initialized successfully")
+        # Replaced by the (timestamp, id) indexes below, which match the
+        # keyset order; the old ones left a temp b-tree to sort on id
+        for old_index in ("idx_events_timestamp", "idx_failed_attempts_timestamp",
+                          "idx_failed_attempts_source_timestamp", "idx_events_type_timestamp",
+                          "idx_events_zone_timestamp", "idx_events_user_timestamp"):
+            cursor.execute(f"DROP INDEX IF EXISTS {old_index}")
+        
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_events_timestamp_id
+            ON {TABLE_EVENTS}(timestamp DESC, id DESC)
+        ''')
+        
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_failed_attempts_timestamp_id
+            ON {TABLE_FAILED_ATTEMPTS}(timestamp DESC, id DESC)
+        ''')
+        
+        # ip_address holds the lockout source of each attempt
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_failed_attempts_source_timestamp_id
+            ON {TABLE_FAILED_ATTEMPTS}(ip_address, timestamp DESC, id DESC)
+        ''')
+        
+        # Audit log filters; each index ends in the full keyset order, so
+        # an equality match on its column is read already sorted
+        for name, column in (("type", "event_type"),
+                             ("zone", "zone_entity_id"),
+                             ("user", "user_name")):
+            cursor.execute(f'''
+                CREATE INDEX IF NOT EXISTS idx_events_{name}_timestamp_id
+                ON {TABLE_EVENTS}({column}, timestamp DESC, id DESC)
+            ''')
+    
+    def _migrate_schema(self, cursor: sqlite3.Cursor) -> None:
+        """Bring databases created by older versions up to date."""
+        cursor.execute(f"PRAGMA table_info({TABLE_USERS})")
+        user_columns = {row['name'] for row in cursor.fetchall()}
+        
+        # PIN fingerprints (existing rows are filled in on next login)
+        for column in ("pin_fingerprint", "lock_pin_fingerprint"):
+            if column not in user_columns:
+                cursor.execute(f"ALTER TABLE {TABLE_USERS} ADD COLUMN {column} TEXT")
+                _LOGGER.info(f"Added {column} column to {TABLE_USERS}")
+        
+        # Fingerprints made with a different key can never match again, so
+        # reset them and let the legacy path re-index users as they log in
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {TABLE_META} (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        
+        key_check = self.pin_fingerprint(DOMAIN)
+        cursor.execute(f"SELECT value FROM {TABLE_META} WHERE key = 'pepper_check'")
+        row = cursor.fetchone()
+        
+        if row and row['value'] != key_check:
+            _LOGGER.warning("PIN fingerprint key changed, clearing stored fingerprints")
+            cursor.execute(f'''
+                UPDATE {TABLE_USERS}
+                SET pin_fingerprint = NULL, lock_pin_fingerprint = NULL
+            ''')
+        
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO {TABLE_META} (key, value)
+            VALUES ('pepper_check', ?)
+        ''', (key_check,))
+        
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] < DB_SCHEMA_VERSION:
+            self._migrate_epoch_timestamps(cursor)
+            cursor.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+    
+    def _migrate_epoch_timestamps(self, cursor: sqlite3.Cursor) -> None:
+        """Rebuild tables whose time columns still hold text timestamps.
+        
+        SQLite cannot change a column's type, so each such table is renamed,
+        recreated by ``_create_schema`` with integer epoch millisecond
+        columns and copied over. Legacy rename mode keeps foreign keys in
+        other tables pointing at the new table, and the AUTOINCREMENT
+        sequence is carried over so ids are never reused.
+        """
+        stale = []
+        for table, columns in EPOCH_COLUMNS.items():
+            cursor.execute(f"PRAGMA table_info({table})")
+            types = {row['name']: row['type'].upper() for row in cursor.fetchall()}
+            if any(types.get(column, "INTEGER") != "INTEGER" for column in columns):
+                stale.append((table, list(types)))
+        
+        if not stale:
+            return
+        
+        cursor.execute("PRAGMA legacy_alter_table = ON")
+        try:
+            for table, _ in stale:
+                cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+            
+            self._create_schema(cursor)
+            
+            for table, old_columns in stale:
+                cursor.execute(f"PRAGMA table_info({table})")
+                new_columns = {row['name']: row['notnull'] for row in cursor.fetchall()}
+                copy = [column for column in new_columns if column in old_columns]
+                select = []
+                for column in copy:
+                    if column not in EPOCH_COLUMNS[table]:
+                        select.append(column)
+                        continue
+                    # Older versions wrote UTC text, except bypass_until (local);
+                    # a missing time in a NOT NULL column becomes the epoch
+                    modifier = ", 'utc'" if EPOCH_COLUMNS[table][column] else ""
+                    fallback = f"COALESCE({column}, 0)" if new_columns[column] else column
+                    select.append(f'''
+                        CASE WHEN typeof({column}) = 'text'
+                        THEN CAST(ROUND((julianday({column}{modifier}) - 2440587.5) * 86400000) AS INTEGER)
+                        ELSE {fallback} END
+                    ''')
+                
+                cursor.execute(f'''
+                    INSERT INTO {table} ({", ".join(copy)})
+                    SELECT {", ".join(select)} FROM {table}_legacy
+                ''')
+                migrated = cursor.rowcount
+                
+                # The renamed table's sequence is at least the copied max id
+                cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+                cursor.execute(
+                    "UPDATE sqlite_sequence SET name = ? WHERE name = ?",
+                    (table, f"{table}_legacy")
+                )
+                cursor.execute(f"DROP TABLE {table}_legacy")
+                
+                _LOGGER.info(f"Migrated {migrated} {table} row(s) to epoch millisecond timestamps")
+        finally:
+            cursor.execute("PRAGMA legacy_alter_table = OFF")
+    
+    def pin_fingerprint(self, pin: str) -> str:
+        """Return the keyed lookup fingerprint for a PIN.
+        
+        This only narrows a PIN down to candidate rows; bcrypt still decides
+        whether the PIN is valid.
+        """
+        return hmac.new(self._pepper, pin.encode('utf-8'), hashlib.sha256).hexdigest()
+    
+    @property
+    def pin_hasher(self) -> PinHasher:
+        """Return the calibrated PIN hasher."""
+        return self._hasher
     
     def hash_pin(self, pin: str) -> str:
-        """Hash a PIN using bcrypt."""
-        return bcrypt.hashpw(pin.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        """Hash a PIN using bcrypt at the calibrated cost."""
+        return self._hasher.hash(pin)
     
     def verify_pin(self, pin: str, pin_hash: str) -> bool:
         """Verify a PIN against its hash."""
@@ -172,322 +669,828 @@ class AlarmDatabase:
                 email: Optional[str] = None, has_separate_lock_pin: bool = False,
                 lock_pin: Optional[str] = None) -> Optional[int]:
         """Add a new user to the database."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            pin_hash = self.hash_pin(pin)
-            lock_pin_hash = self.hash_pin(lock_pin) if lock_pin else None
-            
-            cursor.execute(f'''
-                INSERT INTO {TABLE_USERS} 
-                (name, pin_hash, is_admin, is_duress, phone, email, 
-                has_separate_lock_pin, lock_pin_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (name, pin_hash, int(is_admin), int(is_duress), phone, email,
-                int(has_separate_lock_pin), lock_pin_hash))
+            # Hash before taking the writer so bcrypt never holds the lock
+            columns = self._user_columns(
+                name, pin, is_admin, is_duress, phone, email,
+                has_separate_lock_pin, lock_pin or None
+            )
             
-            user_id = cursor.lastrowid
-            conn.commit()
+            with self._connections.write() as cursor:
+                user_id = self._apply_add_user(cursor, columns)
+                user = self._fetch_user(cursor, user_id)
             
+            self._users.upsert(user)
             self.log_event("user_added", user_id=user_id, user_name=name)
             _LOGGER.info(f"User {name} added with ID {user_id}")
             
             return user_id
         except Exception as e:
             _LOGGER.error(f"Error adding user: {e}")
-            conn.rollback()
             return None
-        finally:
-            conn.close()
     
-    def authenticate_user(self, pin: str, code: Optional[str] = None) -> Optional[Dict]:
-        """Authenticate a user by PIN."""
-        if self.is_locked_out():
+    def _user_columns(self, name: Optional[str] = None, pin: Optional[str] = None,
+                      is_admin: Optional[bool] = None, is_duress: Optional[bool] = None,
+                      phone: Optional[str] = None, email: Optional[str] = None,
+                      has_separate_lock_pin: Optional[bool] = None,
+                      lock_pin: Optional[str] = None) -> Dict[str, Any]:
+        """Map the given user fields to column values, hashing any PINs."""
+        columns: Dict[str, Any] = {}
+        
+        if name is not None:
+            columns['name'] = name
+        if pin is not None:
+            columns['pin_hash'] = self.hash_pin(pin)
+            columns['pin_fingerprint'] = self.pin_fingerprint(pin)
+        if is_admin is not None:
+            columns['is_admin'] = int(is_admin)
+        if is_duress is not None:
+            columns['is_duress'] = int(is_duress)
+        if phone is not None:
+            columns['phone'] = phone
+        if email is not None:
+            columns['email'] = email
+        if has_separate_lock_pin is not None:
+            columns['has_separate_lock_pin'] = int(has_separate_lock_pin)
+        if lock_pin is not None:
+            columns['lock_pin_hash'] = self.hash_pin(lock_pin)
+            columns['lock_pin_fingerprint'] = self.pin_fingerprint(lock_pin)
+        
+        return columns
+    
+    def _fetch_users(self, cursor: sqlite3.Cursor, user_id: Optional[int] = None) -> List[User]:
+        """Read users with their accessible locks in one aggregated query."""
+        where = "WHERE u.id = ?" if user_id is not None else ""
+        
+        cursor.execute(f'''
+            SELECT u.id, u.name, u.is_admin, u.is_duress, u.enabled, u.phone,
+                u.email, u.has_separate_lock_pin, u.created_at, u.last_used,
+                u.use_count, GROUP_CONCAT(a.lock_entity_id) AS accessible_locks
+            FROM {TABLE_USERS} u
+            LEFT JOIN user_lock_access a ON a.user_id = u.id
+            {where}
+            GROUP BY u.id
+        ''', () if user_id is None else (user_id,))
+        
+        return [User.from_row(dict(row)) for row in cursor.fetchall()]
+    
+    def _fetch_user(self, cursor: sqlite3.Cursor, user_id: int) -> User:
+        """Read one user for the directory."""
+        users = self._fetch_users(cursor, user_id)
+        if not users:
+            raise ValueError(f"Unknown user: {user_id}")
+        return self._usage.overlay(users[0])
+    
+    def _apply_add_user(self, cursor: sqlite3.Cursor, columns: Dict[str, Any]) -> int:
+        """Insert a user row inside the caller's transaction."""
+        cursor.execute(f'''
+            INSERT INTO {TABLE_USERS} ({", ".join(columns)})
+            VALUES ({", ".join("?" * len(columns))})
+        ''', list(columns.values()))
+        
+        return cursor.lastrowid
+    
+    def _apply_update_user(self, cursor: sqlite3.Cursor, user_id: int,
+                           columns: Dict[str, Any]) -> None:
+        """Update a user row inside the caller's transaction."""
+        cursor.execute(f'''
+            UPDATE {TABLE_USERS}
+            SET {", ".join(f"{column} = ?" for column in columns)}
+            WHERE id = ?
+        ''', list(columns.values()) + [user_id])
+        
+        if cursor.rowcount == 0:
+            raise ValueError(f"Unknown user: {user_id}")
+    
+    def _apply_lock_access(self, cursor: sqlite3.Cursor, user_id: int,
+                           lock_entity_id: str, can_access: bool) -> None:
+        """Grant or revoke lock access inside the caller's transaction."""
+        cursor.execute(f"SELECT 1 FROM {TABLE_USERS} WHERE id = ?", (user_id,))
+        if cursor.fetchone() is None:
+            raise ValueError(f"Unknown user: {user_id}")
+        
+        if can_access:
+            cursor.execute('''
+                INSERT OR IGNORE INTO user_lock_access (user_id, lock_entity_id)
+                VALUES (?, ?)
+            ''', (user_id, lock_entity_id))
+        else:
+            cursor.execute('''
+                DELETE FROM user_lock_access
+                WHERE user_id = ? AND lock_entity_id = ?
+            ''', (user_id, lock_entity_id))
+    
+    def _find_pin_match(self, pin: str, hash_column: str,
+                        fingerprint_column: str, extra_where: str = "") -> Optional[sqlite3.Row]:
+        """Find the enabled user whose PIN in ``hash_column`` matches.
+        
+        Rows are narrowed by their indexed fingerprint first, so a valid PIN
+        costs one bcrypt check and an unknown PIN costs none. Rows created
+        before fingerprints existed are still checked, in parallel, and get
+        their fingerprint filled in when they match.
+        """
+        fingerprint = self.pin_fingerprint(pin)
+        
+        with self._connections.read() as cursor:
+            cursor.execute(f'''
+                SELECT * FROM {TABLE_USERS}
+                WHERE {fingerprint_column} = ? AND enabled = 1 {extra_where}
+                ORDER BY id
+            ''', (fingerprint,))
+            candidates = cursor.fetchall()
+        
+        user = self._verify_candidates(
+            pin, [user for user in candidates if user[hash_column]], hash_column
+        )
+        if user is not None:
+            self._refresh_pin_columns(pin, user, hash_column, {})
+            return user
+        
+        # Legacy rows without a fingerprint
+        with self._connections.read() as cursor:
+            cursor.execute(f'''
+                SELECT * FROM {TABLE_USERS}
+                WHERE {fingerprint_column} IS NULL AND {hash_column} IS NOT NULL
+                    AND enabled = 1 {extra_where}
+                ORDER BY id
+            ''')
+            legacy = cursor.fetchall()
+        
+        user = self._verify_candidates(pin, legacy, hash_column)
+        if user is not None:
+            self._refresh_pin_columns(
+                pin, user, hash_column, {fingerprint_column: fingerprint}
+            )
+            _LOGGER.info(f"Queued {fingerprint_column} for user {user['id']}")
+        
+        return user
+    
+    def _verify_candidates(self, pin: str, candidates: List[sqlite3.Row],
+                           hash_column: str) -> Optional[sqlite3.Row]:
+        """Return the first candidate, in order, whose hash matches the PIN.
+        
+        Several candidates are checked on the PIN pool (bcrypt releases the
+        GIL), which has its own thread limit so a burst of wrong PINs never
+        takes over Home Assistant's shared executor. Once a candidate
+        matches, checks of later candidates that have not started are
+        cancelled and only earlier ones are waited for, so the result is
+        the same as checking them one by one.
+        """
+        if len(candidates) <= 1:
+            if candidates and self.verify_pin(pin, candidates[0][hash_column]):
+                return candidates[0]
+            return None
+        
+        futures = {
+            self._pin_pool.submit(self.verify_pin, pin, user[hash_column]): index
+            for index, user in enumerate(candidates)
+        }
+        pending = set(futures)
+        match = None
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if not future.cancelled() and future.result():
+                    match = futures[future] if match is None else min(match, futures[future])
+            
+            if match is not None:
+                for future in pending:
+                    if futures[future] > match:
+                        future.cancel()
+                pending = {future for future in pending if futures[future] < match}
+        
+        return candidates[match] if match is not None else None
+    
+    def _refresh_pin_columns(self, pin: str, user: sqlite3.Row, hash_column: str,
+                             columns: Dict[str, Any]) -> None:
+        """Queue ``columns`` for a matched user, and a rehash if its cost is stale.
+        
+        The PIN is only known right after a successful check, so this is
+        where hashes made at another cost (older versions or different
+        hardware) move to the calibrated one. Neither the rehash nor the
+        write holds up the login: the new hash is made on the PIN pool and
+        both go out with the next usage flush (see ``UsageWriter``).
+        """
+        user_id, matched_hash = user['id'], user[hash_column]
+        if columns:
+            self._usage.update_pin(user_id, hash_column, matched_hash, columns)
+        
+        if not self._hasher.needs_rehash(matched_hash):
+            return
+        
+        def rehash() -> None:
+            self._usage.update_pin(
+                user_id, hash_column, matched_hash, {hash_column: self._hasher.hash(pin)}
+            )
+            _LOGGER.info(
+                f"Rehashed {hash_column} for user {user_id} at bcrypt cost {self._hasher.cost}"
+            )
+        
+        try:
+            self._pin_pool.submit(rehash)
+        except RuntimeError:
+            # Shutting down; the next login rehashes instead
+            pass
+    
+    def pin_hash_costs(self) -> Dict[str, Dict[int, int]]:
+        """Return how many stored PIN hashes use each bcrypt cost."""
+        costs: Dict[str, Dict[int, int]] = {}
+        
+        with self._connections.read() as cursor:
+            for column in ("pin_hash", "lock_pin_hash"):
+                cursor.execute(f'''
+                    SELECT CAST(substr({column}, 5, 2) AS INTEGER) AS cost, COUNT(*) AS count
+                    FROM {TABLE_USERS}
+                    WHERE {column} IS NOT NULL
+                    GROUP BY 1
+                ''')
+                costs[column] = {row['cost']: row['count'] for row in cursor.fetchall()}
+        
+        return costs
+    
+    def authenticate_user(self, pin: str, code: Optional[str] = None,
+                          source: Optional[str] = None,
+                          attempt_type: str = "pin_auth") -> Optional[Dict]:
+        """Authenticate a user by PIN.
+        
+        ``source`` is the caller failed attempts are counted against (see
+        ``SourceLockouts``); ``attempt_type`` names the entry point. A match
+        clears the source's failed attempts; that and the usage counters
+        are written behind (see ``UsageWriter``).
+        """
+        if self._failed_attempts.is_locked_out():
             _LOGGER.warning("System is locked out due to failed attempts")
             return None
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        if self.is_locked_out(source):
+            _LOGGER.warning(f"{source} is locked out due to failed attempts")
+            return None
         
         try:
-            cursor.execute(f'''
-                SELECT id, name, pin_hash, is_admin, is_duress, enabled
-                FROM {TABLE_USERS}
-                WHERE enabled = 1
-            ''')
+            user = self._find_pin_match(pin, 'pin_hash', 'pin_fingerprint')
             
-            users = cursor.fetchall()
-            
-            for user in users:
-                if self.verify_pin(pin, user['pin_hash']):
-                    # Update last used
-                    cursor.execute(f'''
-                        UPDATE {TABLE_USERS}
-                        SET last_used = CURRENT_TIMESTAMP,
-                            use_count = use_count + 1
-                        WHERE id = ?
-                    ''', (user['id'],))
-                    conn.commit()
-                    
-                    return {
-                        'id': user['id'],
-                        'name': user['name'],
-                        'is_admin': bool(user['is_admin']),
-                        'is_duress': bool(user['is_duress']),
-                    }
+            if user:
+                # Usage and the lockout reset are written behind
+                now = now_ms()
+                self._users.record_use(user['id'], now)
+                self._usage.record_use(user['id'], now)
+                if source is not None:
+                    self.clear_failed_attempts(source)
+                
+                return {
+                    'id': user['id'],
+                    'name': user['name'],
+                    'is_admin': bool(user['is_admin']),
+                    'is_duress': bool(user['is_duress']),
+                }
             
             # Failed authentication
-            self.log_failed_attempt(code)
+            self.log_failed_attempt(code, source, attempt_type)
             return None
             
         except Exception as e:
             _LOGGER.error(f"Error authenticating user: {e}")
             return None
-        finally:
-            conn.close()
     
     def remove_user(self, user_id: int) -> bool:
         """Remove a user from the database."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(f'''
-                UPDATE {TABLE_USERS}
-                SET enabled = 0
-                WHERE id = ?
-            ''', (user_id,))
+            with self._connections.write() as cursor:
+                cursor.execute(f'''
+                    UPDATE {TABLE_USERS}
+                    SET enabled = 0
+                    WHERE id = ?
+                ''', (user_id,))
             
-            conn.commit()
+            self._users.update(user_id, enabled=False)
             self.log_event("user_removed", user_id=user_id)
             return True
         except Exception as e:
             _LOGGER.error(f"Error removing user: {e}")
             return False
-        finally:
-            conn.close()
     
-    def get_config(self) -> Dict[str, Any]:
-        """Get current configuration."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+    def set_user_enabled(self, user_id: int, enabled: bool) -> bool:
+        """Enable or disable a user."""
         try:
-            cursor.execute(f"SELECT * FROM {TABLE_CONFIG} WHERE id = 1")
-            row = cursor.fetchone()
+            with self._connections.write() as cursor:
+                cursor.execute(f'''
+                    UPDATE {TABLE_USERS}
+                    SET enabled = ?
+                    WHERE id = ?
+                ''', (int(enabled), user_id))
+                
+                if cursor.rowcount == 0:
+                    return False
             
-            if row:
-                return dict(row)
-            return {}
-        finally:
-            conn.close()
+            self._users.update(user_id, enabled=enabled)
+            self.log_event("user_enabled" if enabled else "user_disabled",
+                           user_id=user_id)
+            return True
+        except Exception as e:
+            _LOGGER.error(f"Error toggling user enabled: {e}")
+            return False
+    
+    @property
+    def config(self) -> AlarmConfig:
+        """Return the cached configuration."""
+        return self._config
+    
+    def add_config_listener(self, listener: Callable[[AlarmConfig], None]) -> Callable[[], None]:
+        """Call ``listener`` with the new config after each update.
+        
+        Listeners run on the thread that made the update. Returns a function
+        that removes the listener.
+        """
+        self._config_listeners.append(listener)
+        
+        def remove_listener() -> None:
+            if listener in self._config_listeners:
+                self._config_listeners.remove(listener)
+        
+        return remove_listener
+    
+    def get_config(self) -> Dict[str, Any]:
+        """Get current configuration."""
+        return self._config.as_dict()
     
     def update_config(self, updates: Dict[str, Any]) -> bool:
         """Update configuration."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        try:
+            with self._connections.write() as cursor:
+                config = self._apply_config(cursor, updates)
+        except Exception as e:
+            _LOGGER.error(f"Error updating config: {e}")
+            return False
+        
+        # Swap in the new snapshot only once the transaction has committed
+        self._set_config(config)
+        self.log_event("config_updated", details=json.dumps(updates))
+        
+        return True
+    
+    def _apply_config(self, cursor: sqlite3.Cursor, updates: Dict[str, Any]) -> AlarmConfig:
+        """Update the config row inside the caller's transaction."""
+        unknown = set(updates) - AlarmConfig.columns()
+        if unknown:
+            raise ValueError(f"unknown option(s) {sorted(unknown)}")
+        
+        set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
+        
+        cursor.execute(f'''
+            UPDATE {TABLE_CONFIG}
+            SET {set_clause}, updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1
+        ''', list(updates.values()))
+        
+        cursor.execute(f"SELECT * FROM {TABLE_CONFIG} WHERE id = 1")
+        return AlarmConfig.from_row(dict(cursor.fetchone()))
+    
+    def _set_config(self, config: AlarmConfig) -> None:
+        """Swap in a committed config and notify listeners."""
+        self._config = config
+        
+        for listener in list(self._config_listeners):
+            try:
+                listener(config)
+            except Exception as e:
+                _LOGGER.error(f"Error in config listener: {e}", exc_info=True)
+    
+    @property
+    def alarm_state(self) -> AlarmStateRecord:
+        """Return the last persisted alarm state."""
+        return self._alarm_state
+    
+    def save_alarm_state(self, record: AlarmStateRecord) -> bool:
+        """Persist the alarm state so it survives a restart."""
+        record = replace(record, updated_at=utc_timestamp())
         
         try:
-            set_clause = ", ".join([f"{k} = ?" for k in updates.keys()])
-            values = list(updates.values())
+            with self._connections.write() as cursor:
+                cursor.execute(f'''
+                    UPDATE {TABLE_STATE}
+                    SET state = ?, changed_by = ?, triggered_by = ?,
+                        triggered_entity_id = ?, exit_deadline = ?,
+                        entry_deadline = ?, alarm_deadline = ?, updated_at = ?
+                    WHERE id = 1
+                ''', (record.state, record.changed_by, record.triggered_by,
+                      record.triggered_entity_id, record.exit_deadline,
+                      record.entry_deadline, record.alarm_deadline,
+                      record.updated_at))
             
-            cursor.execute(f'''
-                UPDATE {TABLE_CONFIG}
-                SET {set_clause}, updated_at = CURRENT_TIMESTAMP
-                WHERE id = 1
-            ''', values)
-            
-            conn.commit()
-            self.log_event("config_updated", details=json.dumps(updates))
+            self._alarm_state = record
             return True
         except Exception as e:
-            _LOGGER.error(f"Error updating config: {e}")
+            _LOGGER.error(f"Error saving alarm state: {e}")
             return False
-        finally:
-            conn.close()
     
     def log_event(self, event_type: str, user_id: Optional[int] = None,
                   user_name: Optional[str] = None, state_from: Optional[str] = None,
                   state_to: Optional[str] = None, zone_entity_id: Optional[str] = None,
                   details: Optional[str] = None, is_duress: bool = False) -> None:
-        """Log an event to the audit log."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        """Log an event to the audit log.
         
+        Events are buffered and written in batches; triggers and duress
+        events are written before this returns.
+        """
         try:
-            cursor.execute(f'''
-                INSERT INTO {TABLE_EVENTS}
-                (event_type, user_id, user_name, state_from, state_to, 
-                 zone_entity_id, details, is_duress)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (event_type, user_id, user_name, state_from, state_to,
-                  zone_entity_id, details, int(is_duress)))
-            
-            conn.commit()
+            self._audit.append(
+                event_type, user_id, user_name, state_from, state_to,
+                zone_entity_id, details, is_duress,
+                critical=is_duress or event_type in AUDIT_CRITICAL_EVENTS,
+            )
         except Exception as e:
             _LOGGER.error(f"Error logging event: {e}")
-        finally:
-            conn.close()
     
-    def log_failed_attempt(self, user_code: Optional[str] = None) -> None:
-        """Log a failed authentication attempt."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def flush_events(self) -> None:
+        """Write any buffered audit events now."""
+        self._audit.flush()
+    
+    def log_failed_attempt(self, user_code: Optional[str] = None,
+                           source: Optional[str] = None,
+                           attempt_type: str = "pin_auth") -> None:
+        """Log a failed authentication attempt against its source."""
+        now = now_ms()
+        self._failed_attempts.record(source, now / 1000)
         
         try:
-            cursor.execute(f'''
-                INSERT INTO {TABLE_FAILED_ATTEMPTS}
-                (user_code, attempt_type)
-                VALUES (?, 'pin_auth')
-            ''', (user_code,))
-            
-            conn.commit()
+            with self._connections.write() as cursor:
+                cursor.execute(f'''
+                    INSERT INTO {TABLE_FAILED_ATTEMPTS}
+                    (timestamp, ip_address, user_code, attempt_type)
+                    VALUES (?, ?, ?, ?)
+                ''', (now, source, user_code, attempt_type))
         except Exception as e:
             _LOGGER.error(f"Error logging failed attempt: {e}")
-        finally:
-            conn.close()
     
-    def is_locked_out(self) -> bool:
-        """Check if system is locked out due to failed attempts."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            lockout_time = datetime.now() - timedelta(seconds=LOCKOUT_DURATION)
-            
-            cursor.execute(f'''
-                SELECT COUNT(*) as count
-                FROM {TABLE_FAILED_ATTEMPTS}
-                WHERE timestamp > ?
-            ''', (lockout_time,))
-            
-            count = cursor.fetchone()['count']
-            return count >= MAX_FAILED_ATTEMPTS
-        finally:
-            conn.close()
+    @property
+    def failed_attempts(self) -> SourceLockouts:
+        """Return the in-memory failed attempt windows."""
+        return self._failed_attempts
+    
+    def is_locked_out(self, source: Optional[str] = None) -> bool:
+        """Check if the system, or ``source``, is locked out due to failed attempts."""
+        return self._failed_attempts.is_locked_out(source)
+    
+    def get_failed_attempts_count(self, source: Optional[str] = None) -> int:
+        """Get recent failed attempts count (all sources if None)."""
+        return self._failed_attempts.count(source)
     
-    def get_failed_attempts_count(self) -> int:
-        """Get recent failed attempts count."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def clear_failed_attempts(self, source: str) -> None:
+        """Clear the failed attempts of a source (called on successful auth).
         
+        Other sources and the global window are left alone, so a correct PIN
+        from one keypad does not reset an attack from another. The rows are
+        deleted with the next usage flush.
+        """
+        self._failed_attempts.clear(source)
+        self._usage.clear_source(source, now_ms())
+    
+    def flush_usage(self) -> None:
+        """Write buffered usage counters and lockout resets now."""
+        self._usage.flush()
+    
+    @property
+    def zones(self) -> ZoneRegistry:
+        """Return the in-memory zone registry."""
+        return self._zones
+    
+    def add_zone(self, entity_id: str, zone_name: str, zone_type: str,
+                 enabled_away: bool = True, enabled_home: bool = True) -> bool:
+        """Add or update a zone."""
         try:
-            lockout_time = datetime.now() - timedelta(seconds=LOCKOUT_DURATION)
+            now = now_ms()
             
-            cursor.execute(f'''
-                SELECT COUNT(*) as count
-                FROM {TABLE_FAILED_ATTEMPTS}
-                WHERE timestamp > ?
-            ''', (lockout_time,))
+            with self._connections.write() as cursor:
+                cursor.execute(f'''
+                    INSERT OR REPLACE INTO {TABLE_ZONES}
+                    (entity_id, zone_name, zone_type, enabled_away, enabled_home, last_state_change)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (entity_id, zone_name, zone_type, int(enabled_away), int(enabled_home), now))
+                zone_id = cursor.lastrowid
             
-            return cursor.fetchone()['count']
-        finally:
-            conn.close()
+            self._zones.upsert(Zone(
+                entity_id=entity_id,
+                zone_name=zone_name,
+                zone_type=zone_type,
+                enabled_away=enabled_away,
+                enabled_home=enabled_home,
+                last_state_change=now,
+                id=zone_id,
+            ))
+            return True
+        except Exception as e:
+            _LOGGER.error(f"Error adding zone: {e}")
+            return False
     
-    def clear_failed_attempts(self) -> None:
-        """Clear failed attempts (called on successful auth)."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def register_zones(self, zones: List[Dict[str, Any]]) -> Optional[Dict[str, List[str]]]:
+        """Add or update many zones in one transaction.
+        
+        Each zone is a dict with entity_id, zone_name, zone_type,
+        enabled_away and enabled_home. Zones whose settings already match are
+        not touched, and updated zones keep their bypass and last state
+        change. Returns the entity IDs that were added, changed and unchanged.
+        """
+        result: Dict[str, List[str]] = {"added": [], "changed": [], "unchanged": []}
+        updated: List[Zone] = []
+        now = now_ms()
+        
+        # Last entry wins if an entity is listed twice
+        specs = {spec['entity_id']: spec for spec in zones}
         
         try:
-            cursor.execute(f"DELETE FROM {TABLE_FAILED_ATTEMPTS}")
-            conn.commit()
-        finally:
-            conn.close()
-    
-    def add_zone(self, entity_id: str, zone_name: str, zone_type: str,
-                 enabled_away: bool = True, enabled_home: bool = True) -> bool:
-        """Add or update a zone."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+            with self._connections.write() as cursor:
+                for entity_id, spec in specs.items():
+                    values = (
+                        spec['zone_name'],
+                        spec['zone_type'],
+                        bool(spec.get('enabled_away', True)),
+                        bool(spec.get('enabled_home', True)),
+                    )
+                    existing = self._zones.get(entity_id)
+                    
+                    if existing is None:
+                        cursor.execute(f'''
+                            INSERT INTO {TABLE_ZONES}
+                            (entity_id, zone_name, zone_type, enabled_away, enabled_home, last_state_change)
+                            VALUES (?, ?, ?, ?, ?, ?)
+                        ''', (entity_id, *values, now))
+                        updated.append(Zone(entity_id, *values, last_state_change=now,
+                                            id=cursor.lastrowid))
+                        result["added"].append(entity_id)
+                    elif values == (existing.zone_name, existing.zone_type,
+                                    existing.enabled_away, existing.enabled_home):
+                        result["unchanged"].append(entity_id)
+                    else:
+                        cursor.execute(f'''
+                            UPDATE {TABLE_ZONES}
+                            SET zone_name = ?, zone_type = ?, enabled_away = ?, enabled_home = ?
+                            WHERE entity_id = ?
+                        ''', (*values, entity_id))
+                        updated.append(replace(
+                            existing, zone_name=values[0], zone_type=values[1],
+                            enabled_away=values[2], enabled_home=values[3]
+                        ))
+                        result["changed"].append(entity_id)
+        except Exception as e:
+            _LOGGER.error(f"Error registering zones: {e}")
+            return None
+        
+        self._zones.upsert_many(updated)
+        
+        if updated:
+            self.log_event("zones_registered", details=json.dumps(
+                {key: len(ids) for key, ids in result.items()}
+            ))
         
+        return result
+    
+    def remove_zone(self, entity_id: str) -> bool:
+        """Delete a zone."""
         try:
-            cursor.execute(f'''
-                INSERT OR REPLACE INTO {TABLE_ZONES}
-                (entity_id, zone_name, zone_type, enabled_away, enabled_home, last_state_change)
-                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (entity_id, zone_name, zone_type, int(enabled_away), int(enabled_home)))
+            with self._connections.write() as cursor:
+                cursor.execute(f'''
+                    DELETE FROM {TABLE_ZONES}
+                    WHERE entity_id = ?
+                ''', (entity_id,))
+                
+                if cursor.rowcount == 0:
+                    return False
             
-            conn.commit()
+            self._zones.remove(entity_id)
+            self.log_event("zone_removed", zone_entity_id=entity_id)
             return True
         except Exception as e:
-            _LOGGER.error(f"Error adding zone: {e}")
+            _LOGGER.error(f"Error removing zone: {e}")
             return False
-        finally:
-            conn.close()
     
     def update_zone_state_change(self, entity_id: str) -> bool:
         """Update the last state change timestamp for a zone."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(f'''
-                UPDATE {TABLE_ZONES}
-                SET last_state_change = CURRENT_TIMESTAMP
-                WHERE entity_id = ?
-            ''', (entity_id,))
+            now = now_ms()
             
-            conn.commit()
+            with self._connections.write() as cursor:
+                cursor.execute(f'''
+                    UPDATE {TABLE_ZONES}
+                    SET last_state_change = ?
+                    WHERE entity_id = ?
+                ''', (now, entity_id))
+            
+            zone = self._zones.get(entity_id)
+            if zone:
+                self._zones.upsert(replace(zone, last_state_change=now))
             return True
         except Exception as e:
             _LOGGER.error(f"Error updating zone state change: {e}")
             return False
-        finally:
-            conn.close()
     
     def get_zones(self, mode: Optional[str] = None) -> List[Dict]:
         """Get all zones, optionally filtered by mode."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            query = f"SELECT * FROM {TABLE_ZONES}"
-            
-            if mode == "armed_away":
-                query += " WHERE enabled_away = 1"
-            elif mode == "armed_home":
-                query += " WHERE enabled_home = 1"
-            
-            cursor.execute(query)
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
+        return [zone.as_dict() for zone in self._zones.monitored(mode)]
     
     def set_zone_bypass(self, entity_id: str, bypassed: bool,
                         bypass_duration: Optional[int] = None) -> bool:
         """Set zone bypass status."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            bypass_until = None
-            if bypassed and bypass_duration:
-                bypass_until = datetime.now() + timedelta(seconds=bypass_duration)
-            
-            cursor.execute(f'''
-                UPDATE {TABLE_ZONES}
-                SET bypassed = ?, bypass_until = ?
-                WHERE entity_id = ?
-            ''', (int(bypassed), bypass_until, entity_id))
+            with self._connections.write() as cursor:
+                bypass_until = self._apply_zone_bypass(
+                    cursor, entity_id, bypassed, bypass_duration
+                )
             
-            conn.commit()
+            self._zones.set_bypass(entity_id, bypassed, bypass_until)
             self.log_event("zone_bypass", zone_entity_id=entity_id,
                           details=f"Bypassed: {bypassed}")
             return True
         except Exception as e:
             _LOGGER.error(f"Error setting zone bypass: {e}")
             return False
-        finally:
-            conn.close()
+    
+    def _apply_zone_bypass(self, cursor: sqlite3.Cursor, entity_id: str, bypassed: bool,
+                           bypass_duration: Optional[int] = None) -> Optional[int]:
+        """Update a zone's bypass inside the caller's transaction.
+        
+        Returns the bypass end time (epoch ms) for the registry update after commit.
+        """
+        bypass_until = None
+        if bypassed and bypass_duration:
+            bypass_until = now_ms() + bypass_duration * 1000
+        
+        cursor.execute(f'''
+            UPDATE {TABLE_ZONES}
+            SET bypassed = ?, bypass_until = ?
+            WHERE entity_id = ?
+        ''', (int(bypassed), bypass_until, entity_id))
+        
+        if cursor.rowcount == 0:
+            raise ValueError(f"Unknown zone: {entity_id}")
+        
+        return bypass_until
+    
+    def clear_zone_bypasses(self) -> bool:
+        """Remove the bypass from every zone (called on disarm)."""
+        if not any(zone.bypassed for zone in self._zones.all()):
+            return True
+        
+        try:
+            with self._connections.write() as cursor:
+                cursor.execute(f'''
+                    UPDATE {TABLE_ZONES}
+                    SET bypassed = 0, bypass_until = NULL
+                    WHERE bypassed = 1
+                ''')
+                cleared = cursor.rowcount
+            
+            self._zones.clear_bypasses()
+            self.log_event("zone_bypass_cleared",
+                          details=f"Cleared {cleared} bypass(es)")
+            return True
+        except Exception as e:
+            _LOGGER.error(f"Error clearing zone bypasses: {e}")
+            return False
+    
+    def run_batch(self, operations: List[Dict[str, Any]],
+                  actor: Optional[str] = None) -> Dict[str, Any]:
+        """Apply a list of operations in one transaction, all or nothing.
+        
+        Each operation is a dict with an ``action`` key (bypass_zone,
+        add_user, update_user, set_user_lock_access or update_config) and
+        that action's fields. PINs are hashed before the writer is taken;
+        caches are updated and one audit entry per operation is queued only
+        after the transaction commits.
+        """
+        try:
+            prepared = [self._prepare_batch_operation(op) for op in operations]
+        except Exception as e:
+            _LOGGER.error(f"Error preparing batch: {e}")
+            return {"success": False, "message": f"Invalid batch: {e}"}
+        
+        results = []
+        after_commit = []
+        index = 0
+        
+        try:
+            with self._connections.write() as cursor:
+                for index, op in enumerate(prepared):
+                    apply = getattr(self, f"_batch_{op['action']}")
+                    result, on_commit = apply(cursor, op, actor)
+                    results.append(result)
+                    after_commit.append(on_commit)
+        except Exception as e:
+            action = prepared[index]['action']
+            _LOGGER.error(f"Batch rolled back at operation {index + 1} ({action}): {e}")
+            return {
+                "success": False,
+                "message": f"Operation {index + 1} ({action}) failed: {e}",
+                "failed_index": index,
+            }
+        
+        for on_commit in after_commit:
+            on_commit()
+        
+        return {
+            "success": True,
+            "message": f"Applied {len(results)} operation(s)",
+            "results": results,
+        }
+    
+    def _prepare_batch_operation(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        """Hash any PINs in an operation ahead of the transaction."""
+        action = op['action']
+        
+        if not hasattr(self, f"_batch_{action}"):
+            raise ValueError(f"unknown action {action}")
+        
+        if action == "add_user":
+            return {**op, "columns": self._user_columns(
+                op['name'], op['pin'], op.get('is_admin', False),
+                op.get('is_duress', False), op.get('phone'), op.get('email'),
+                op.get('has_separate_lock_pin', False), op.get('lock_pin') or None
+            )}
+        
+        if action == "update_user":
+            return {**op, "columns": self._user_columns(
+                op.get('name'), op.get('pin'), op.get('is_admin'), None,
+                op.get('phone'), op.get('email'),
+                op.get('has_separate_lock_pin'), op.get('lock_pin')
+            )}
+        
+        return op
+    
+    def _batch_bypass_zone(self, cursor: sqlite3.Cursor, op: Dict[str, Any],
+                           actor: Optional[str]) -> tuple:
+        """Batch step: bypass or unbypass a zone."""
+        entity_id = op['zone_entity_id']
+        bypassed = op.get('bypass', True)
+        bypass_until = self._apply_zone_bypass(cursor, entity_id, bypassed)
+        
+        def on_commit() -> None:
+            self._zones.set_bypass(entity_id, bypassed, bypass_until)
+            self.log_event("zone_bypass", user_name=actor, zone_entity_id=entity_id,
+                           details=f"Bypassed: {bypassed}")
+        
+        return {"zone_entity_id": entity_id, "bypassed": bypassed}, on_commit
+    
+    def _batch_add_user(self, cursor: sqlite3.Cursor, op: Dict[str, Any],
+                        actor: Optional[str]) -> tuple:
+        """Batch step: add a user."""
+        user_id = self._apply_add_user(cursor, op['columns'])
+        user = self._fetch_user(cursor, user_id)
+        
+        def on_commit() -> None:
+            self._users.upsert(user)
+            self.log_event("user_added", user_id=user_id, user_name=op['name'],
+                           details=f"By: {actor}")
+        
+        return {"user_id": user_id}, on_commit
+    
+    def _batch_update_user(self, cursor: sqlite3.Cursor, op: Dict[str, Any],
+                           actor: Optional[str]) -> tuple:
+        """Batch step: update a user."""
+        user_id = op['user_id']
+        if op['columns']:
+            self._apply_update_user(cursor, user_id, op['columns'])
+        user = self._fetch_user(cursor, user_id)
+        
+        def on_commit() -> None:
+            self._users.upsert(user)
+            self.log_event("user_updated", user_id=user_id, details=f"By: {actor}")
+        
+        return {"user_id": user_id}, on_commit
+    
+    def _batch_set_user_lock_access(self, cursor: sqlite3.Cursor, op: Dict[str, Any],
+                                    actor: Optional[str]) -> tuple:
+        """Batch step: grant or revoke a user's access to a lock."""
+        user_id = op['user_id']
+        self._apply_lock_access(cursor, user_id, op['lock_entity_id'], op['can_access'])
+        
+        def on_commit() -> None:
+            self._users.set_lock_access(user_id, op['lock_entity_id'], op['can_access'])
+            self.log_event("lock_access_updated", user_id=user_id,
+                           details=json.dumps({
+                               "lock_entity_id": op['lock_entity_id'],
+                               "can_access": op['can_access'],
+                               "by": actor,
+                           }))
+        
+        return {"user_id": user_id, "lock_entity_id": op['lock_entity_id']}, on_commit
+    
+    def _batch_update_config(self, cursor: sqlite3.Cursor, op: Dict[str, Any],
+                             actor: Optional[str]) -> tuple:
+        """Batch step: update configuration options."""
+        updates = {key: value for key, value in op.items() if key != 'action'}
+        config = self._apply_config(cursor, updates)
+        
+        def on_commit() -> None:
+            self._set_config(config)
+            self.log_event("config_updated", user_name=actor, details=json.dumps(updates))
+        
+        return {"updated": sorted(updates)}, on_commit
     
     def get_recent_events(self, limit: int = 100) -> List[Dict]:
         """Get recent events from audit log."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        self._audit.flush()
         
-        try:
+        with self._connections.read() as cursor:
             cursor.execute(f'''
                 SELECT * FROM {TABLE_EVENTS}
                 ORDER BY timestamp DESC
@@ -495,35 +1498,302 @@ class AlarmDatabase:
             ''', (limit,))
             
             return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
 
-    def get_users(self) -> List[Dict]:
-        """Get all users from database."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def _query_page(self, table: str, allowed_fields: tuple,
+                    fields: Optional[List[str]], filters: List[tuple],
+                    limit: int, offset: int = 0,
+                    after: Optional[Tuple[int, int]] = None,
+                    one_of: Optional[Tuple[str, List[str]]] = None) -> Dict[str, Any]:
+        """Return one page of rows, newest first, and the total match count.
+        
+        ``filters`` is a list of ``(sql, params)`` pairs joined with AND.
+        ``one_of`` is a ``(column, values)`` pair matching any of the values.
+        ``after`` is the ``(timestamp, id)`` key of the last row of the
+        previous page; when given, the page starts after it by an index
+        seek instead of ``offset``. ``next_key`` is the key to pass for the
+        following page, or None on the last page. The total is only counted
+        for the first page since counting is the expensive part of a deep
+        page; it is None when ``after`` is given.
+        """
+        columns = [f for f in (fields or allowed_fields) if f in allowed_fields]
+        select = columns + [key for key in ("timestamp", "id") if key not in columns]
+        count_filters = filters
+        if one_of is not None:
+            column, values = one_of
+            count_filters = filters + [(f"{column} IN ({', '.join('?' * len(values))})", values)]
+        where = " AND ".join(sql for sql, _ in count_filters) or "1"
+        params = [p for _, values in count_filters for p in values]
+        
+        page_filters = filters
+        if after is not None:
+            page_filters = filters + [("(timestamp, id) < (?, ?)", list(after))]
+            offset = 0
+        page_sql, page_params = self._keyset_select(
+            ", ".join(select), table, page_filters, one_of, "timestamp DESC, id DESC"
+        )
+        
+        with self._connections.read() as cursor:
+            total = None
+            if after is None:
+                cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params)
+                total = cursor.fetchone()[0]
+            
+            # One extra row tells whether another page follows
+            cursor.execute(f"{page_sql} LIMIT ? OFFSET ?", page_params + [limit + 1, offset])
+            rows = cursor.fetchall()
+        
+        more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return {
+            "total": total,
+            "items": [{column: row[column] for column in columns} for row in rows],
+            "next_key": (rows[-1]["timestamp"], rows[-1]["id"]) if more else None,
+        }
+    
+    @staticmethod
+    def _keyset_select(select: str, table: str, filters: List[tuple],
+                       one_of: Optional[Tuple[str, List[str]]],
+                       order: str) -> Tuple[str, list]:
+        """Build an ordered SELECT and its params from ``(sql, params)`` filters.
+        
+        With ``one_of``, each value gets its own branch of a UNION ALL:
+        SQLite then merges the branches, each read in order from a
+        ``(column, timestamp, id)`` index, where a single ``IN`` would have
+        to sort every match in a temp b-tree.
+        """
+        branches = [filters]
+        if one_of is not None:
+            column, values = one_of
+            branches = [filters + [(f"{column} = ?", [value])] for value in dict.fromkeys(values)]
+        
+        parts, params = [], []
+        for branch in branches:
+            where = " AND ".join(sql for sql, _ in branch) or "1"
+            parts.append(f"SELECT {select} FROM {table} WHERE {where}")
+            params.extend(p for _, values in branch for p in values)
+        
+        return f"{' UNION ALL '.join(parts)} ORDER BY {order}", params
+    
+    def query_events(self, limit: int = QUERY_DEFAULT_LIMIT, offset: int = 0,
+                     fields: Optional[List[str]] = None,
+                     event_types: Optional[List[str]] = None,
+                     user_name: Optional[str] = None,
+                     zone_entity_id: Optional[str] = None,
+                     since: Optional[int] = None,
+                     until: Optional[int] = None,
+                     after: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """Query the audit log with filters and pagination.
+        
+        ``since`` and ``until`` are epoch milliseconds (until exclusive).
+        Each filter column has an index ending in ``(timestamp, id)``, so a
+        filtered, time-bounded page is read from an index in page order.
+        """
+        self._audit.flush()
+        
+        filters = []
+        if user_name:
+            filters.append(("user_name = ?", [user_name]))
+        if zone_entity_id:
+            filters.append(("zone_entity_id = ?", [zone_entity_id]))
+        if since is not None:
+            filters.append(("timestamp >= ?", [since]))
+        if until is not None:
+            filters.append(("timestamp < ?", [until]))
         
+        return self._query_page(
+            TABLE_EVENTS, EVENT_FIELDS, fields, filters, limit, offset, after,
+            ("event_type", event_types) if event_types else None
+        )
+    
+    def query_failed_attempts(self, limit: int = QUERY_DEFAULT_LIMIT, offset: int = 0,
+                              fields: Optional[List[str]] = None,
+                              since: Optional[int] = None,
+                              until: Optional[int] = None,
+                              after: Optional[Tuple[int, int]] = None,
+                              source: Optional[str] = None) -> Dict[str, Any]:
+        """Query failed authentication attempts with pagination."""
+        self._usage.flush()
+        
+        filters = []
+        if source:
+            filters.append(("ip_address = ?", [source]))
+        if since is not None:
+            filters.append(("timestamp >= ?", [since]))
+        if until is not None:
+            filters.append(("timestamp < ?", [until]))
+        
+        return self._query_page(
+            TABLE_FAILED_ATTEMPTS, FAILED_ATTEMPT_FIELDS, fields, filters, limit, offset, after
+        )
+
+    @property
+    def audit_retention(self) -> Dict[str, Optional[int]]:
+        """Return the audit retention policy in days per event type."""
+        return self._pruner.policy
+    
+    def set_audit_retention(self, event_type: str, days: Optional[int]) -> bool:
+        """Keep audit rows of an event type for ``days`` days (None = forever)."""
         try:
-            cursor.execute(f'''
-                SELECT id, name, is_admin, is_duress, enabled, phone, email,
-                    has_separate_lock_pin, created_at, last_used, use_count
-                FROM {TABLE_USERS}
-                ORDER BY name
-            ''')
+            self._pruner.set_rule(event_type, days)
+        except Exception as e:
+            _LOGGER.error(f"Error setting audit retention: {e}")
+            return False
+        
+        self.log_event(
+            "retention_updated",
+            details=json.dumps({"event_type": event_type, "days": days})
+        )
+        return True
+    
+    def prune_audit_log(self) -> int:
+        """Roll up and delete one batch of expired audit rows.
+        
+        Returns the number of rows deleted, 0 once nothing is left to prune.
+        Callers run one batch per database job so other work can interleave.
+        Nothing is pruned while an export is running, so rows cannot move
+        from the live table to the archive under it.
+        """
+        if self._exports:
+            return 0
+        
+        try:
+            return self._pruner.prune_batch()
+        except Exception as e:
+            _LOGGER.error(f"Error pruning audit log: {e}")
+            return 0
+    
+    @property
+    def archive(self) -> AuditArchive:
+        """Return the cold archive of pruned audit events."""
+        return self._archive
+    
+    def iter_events(self, since: Optional[int] = None, until: Optional[int] = None,
+                    event_types: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield archived and live audit events together, oldest first.
+        
+        Both sources are streamed and merged by (timestamp, id): archive
+        segments a member at a time and the live table in keyset chunks
+        of ``EVENT_STREAM_CHUNK`` rows, so neither is loaded whole and no
+        reader connection is held between chunks. Rows that are both
+        archived and still live (an interrupted prune) are yielded once.
+        """
+        self._audit.flush()
+        wanted = set(event_types) if event_types else None
+        
+        archived = self._archive.iter_events(since, until)
+        if wanted is not None:
+            archived = (event for event in archived if event['event_type'] in wanted)
+        
+        return unique_events(heapq.merge(
+            archived,
+            self._iter_live_rows(
+                TABLE_EVENTS, self._time_filters(since, until),
+                ("event_type", event_types) if event_types else None
+            ),
+            key=lambda event: (event['timestamp'], event['id'])
+        ))
+    
+    @staticmethod
+    def _time_filters(since: Optional[int], until: Optional[int]) -> List[tuple]:
+        """Return ``(sql, params)`` filters for a time range."""
+        filters = []
+        if since is not None:
+            filters.append(("timestamp >= ?", [since]))
+        if until is not None:
+            filters.append(("timestamp < ?", [until]))
+        return filters
+    
+    def _iter_live_rows(self, table: str, filters: List[tuple],
+                        one_of: Optional[Tuple[str, List[str]]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield rows oldest first, one keyset chunk at a time."""
+        key = None
+        while True:
+            page_filters = filters + ([("(timestamp, id) > (?, ?)", list(key))] if key else [])
+            sql, params = self._keyset_select("*", table, page_filters, one_of, "timestamp, id")
             
-            users = [dict(row) for row in cursor.fetchall()]
+            with self._connections.read() as cursor:
+                cursor.execute(f"{sql} LIMIT ?", params + [EVENT_STREAM_CHUNK])
+                rows = [dict(row) for row in cursor.fetchall()]
             
-            # Get lock access for each user
-            for user in users:
-                cursor.execute('''
-                    SELECT lock_entity_id FROM user_lock_access
-                    WHERE user_id = ?
-                ''', (user['id'],))
-                user['accessible_locks'] = [row['lock_entity_id'] for row in cursor.fetchall()]
+            yield from rows
             
-            return users
+            if len(rows) < EVENT_STREAM_CHUNK:
+                return
+            key = (rows[-1]['timestamp'], rows[-1]['id'])
+    
+    def export_events(self, path: str, source: str, export_format: str,
+                      since: Optional[int] = None, until: Optional[int] = None,
+                      event_types: Optional[List[str]] = None,
+                      progress: Optional[Callable[[int], None]] = None) -> int:
+        """Stream audit events (archived and live) or failed attempts to a file.
+        
+        Runs on a worker thread rather than the database thread, since a
+        large export would otherwise hold up every other database job.
+        Returns the number of rows written.
+        """
+        with self._exports_lock:
+            self._exports += 1
+        
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            
+            if source == EXPORT_SOURCE_EVENTS:
+                rows = self.iter_events(since, until, event_types)
+                fields = EVENT_FIELDS
+            else:
+                self._usage.flush()
+                rows = self._iter_live_rows(
+                    TABLE_FAILED_ATTEMPTS, self._time_filters(since, until)
+                )
+                fields = FAILED_ATTEMPT_FIELDS
+            
+            return write_export(rows, path, export_format, fields, ("timestamp",), progress)
         finally:
-            conn.close()
+            with self._exports_lock:
+                self._exports -= 1
+    
+    def query_event_summary(self, limit: int = QUERY_DEFAULT_LIMIT, offset: int = 0,
+                            event_types: Optional[List[str]] = None,
+                            since: Optional[str] = None,
+                            until: Optional[str] = None) -> Dict[str, Any]:
+        """Query the daily counts of pruned audit rows, newest day first.
+        
+        ``since`` and ``until`` are ``YYYY-MM-DD`` days (until exclusive).
+        """
+        filters = []
+        if event_types:
+            filters.append((f"event_type IN ({', '.join('?' * len(event_types))})", event_types))
+        if since:
+            filters.append(("day >= ?", [since]))
+        if until:
+            filters.append(("day < ?", [until]))
+        
+        where = " AND ".join(sql for sql, _ in filters) or "1"
+        params = [p for _, values in filters for p in values]
+        
+        with self._connections.read() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {TABLE_DAILY_SUMMARY} WHERE {where}", params)
+            total = cursor.fetchone()[0]
+            
+            cursor.execute(f'''
+                SELECT day, event_type, zone_entity_id, user_name, count
+                FROM {TABLE_DAILY_SUMMARY}
+                WHERE {where}
+                ORDER BY day DESC, event_type, zone_entity_id, user_name
+                LIMIT ? OFFSET ?
+            ''', params + [limit, offset])
+            
+            return {"total": total, "items": [dict(row) for row in cursor.fetchall()]}
+
+    @property
+    def users(self) -> UserDirectory:
+        """Return the in-memory user directory."""
+        return self._users
+    
+    def get_users(self) -> List[Dict]:
+        """Get all users with their accessible locks, sorted by name."""
+        return [user.as_dict() for user in self._users.all()]
 
     def update_user(self, user_id: int, name: Optional[str] = None,
                 pin: Optional[str] = None, is_admin: Optional[bool] = None,
@@ -531,68 +1801,29 @@ class AlarmDatabase:
                 has_separate_lock_pin: Optional[bool] = None,
                 lock_pin: Optional[str] = None) -> bool:
         """Update user information."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            updates = []
-            values = []
-            
-            if name is not None:
-                updates.append("name = ?")
-                values.append(name)
-            
-            if pin is not None:
-                updates.append("pin_hash = ?")
-                values.append(self.hash_pin(pin))
-            
-            if is_admin is not None:
-                updates.append("is_admin = ?")
-                values.append(int(is_admin))
-            
-            if phone is not None:
-                updates.append("phone = ?")
-                values.append(phone)
-            
-            if email is not None:
-                updates.append("email = ?")
-                values.append(email)
-            
-            if has_separate_lock_pin is not None:
-                updates.append("has_separate_lock_pin = ?")
-                values.append(int(has_separate_lock_pin))
-            
-            if lock_pin is not None:
-                updates.append("lock_pin_hash = ?")
-                values.append(self.hash_pin(lock_pin))
+            columns = self._user_columns(
+                name, pin, is_admin, None, phone, email,
+                has_separate_lock_pin, lock_pin
+            )
             
-            if not updates:
+            if not columns:
                 return False
             
-            values.append(user_id)
-            
-            cursor.execute(f'''
-                UPDATE {TABLE_USERS}
-                SET {", ".join(updates)}
-                WHERE id = ?
-            ''', values)
-            
-            conn.commit()
+            with self._connections.write() as cursor:
+                self._apply_update_user(cursor, user_id, columns)
+                user = self._fetch_user(cursor, user_id)
             
+            self._users.upsert(user)
             self.log_event("user_updated", user_id=user_id)
-            return cursor.rowcount > 0
+            return True
         except Exception as e:
             _LOGGER.error(f"Error updating user: {e}")
             return False
-        finally:
-            conn.close()
 
     def get_user_lock_pin(self, user_id: int) -> Optional[str]:
         """Get user's lock PIN hash if they have a separate one."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
+        with self._connections.read() as cursor:
             cursor.execute(f'''
                 SELECT lock_pin_hash, has_separate_lock_pin
                 FROM {TABLE_USERS}
@@ -603,76 +1834,39 @@ class AlarmDatabase:
             if row and row['has_separate_lock_pin']:
                 return row['lock_pin_hash']
             return None
-        finally:
-            conn.close()
 
     def authenticate_lock_pin(self, pin: str) -> Optional[Dict]:
         """Authenticate a user by their lock PIN."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute(f'''
-                SELECT id, name, lock_pin_hash
-                FROM {TABLE_USERS}
-                WHERE enabled = 1 AND has_separate_lock_pin = 1
-            ''')
-            
-            users = cursor.fetchall()
+            user = self._find_pin_match(
+                pin, 'lock_pin_hash', 'lock_pin_fingerprint',
+                "AND has_separate_lock_pin = 1"
+            )
             
-            for user in users:
-                if user['lock_pin_hash'] and self.verify_pin(pin, user['lock_pin_hash']):
-                    return {
-                        'id': user['id'],
-                        'name': user['name'],
-                    }
+            if user:
+                return {
+                    'id': user['id'],
+                    'name': user['name'],
+                }
             
             return None
         except Exception as e:
             _LOGGER.error(f"Error authenticating lock PIN: {e}")
             return None
-        finally:
-            conn.close()
 
     def set_user_lock_access(self, user_id: int, lock_entity_id: str, can_access: bool) -> bool:
         """Set whether a user can access a specific lock."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            if can_access:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO user_lock_access (user_id, lock_entity_id)
-                    VALUES (?, ?)
-                ''', (user_id, lock_entity_id))
-            else:
-                cursor.execute('''
-                    DELETE FROM user_lock_access
-                    WHERE user_id = ? AND lock_entity_id = ?
-                ''', (user_id, lock_entity_id))
+            with self._connections.write() as cursor:
+                self._apply_lock_access(cursor, user_id, lock_entity_id, can_access)
             
-            conn.commit()
+            self._users.set_lock_access(user_id, lock_entity_id, can_access)
             return True
         except Exception as e:
             _LOGGER.error(f"Error setting user lock access: {e}")
             return False
-        finally:
-            conn.close()
 
     def get_user_lock_access(self, user_id: int) -> List[str]:
         """Get list of lock entity IDs the user can access."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                SELECT lock_entity_id FROM user_lock_access
-                WHERE user_id = ?
-            ''', (user_id,))
-            
-            return [row['lock_entity_id'] for row in cursor.fetchall()]
-        except Exception as e:
-            _LOGGER.error(f"Error getting user lock access: {e}")
-            return []
-        finally:
-            conn.close()
\ No newline at end of file
+        user = self._users.get(user_id)
+        return list(user.accessible_locks) if user else []
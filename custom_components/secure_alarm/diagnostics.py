@@ -0,0 +1,25 @@
+"""Diagnostics support for Secure Alarm System."""
+
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry (no PINs or hashes)."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    database = data["database"]
+
+    return {
+        "options": dict(entry.options),
+        "pin_hashing": {
+            **database.pin_hasher.as_dict(),
+            "stored_costs": await database.async_run_job(database.pin_hash_costs),
+        },
+        "admission": data["coordinator"].admission.as_dict(),
+    }
@@ -0,0 +1,69 @@
+"""Streaming export of audit history for Secure Alarm System."""
+
+import csv
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+from .const import EXPORT_FORMAT_CSV, EXPORT_PROGRESS_ROWS
+from .timestamps import ms_to_iso
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def write_export(
+    rows: Iterable[Dict[str, Any]],
+    path: str,
+    export_format: str,
+    fields: Sequence[str],
+    time_fields: Sequence[str] = (),
+    progress: Optional[Callable[[int], None]] = None,
+    progress_every: int = EXPORT_PROGRESS_ROWS,
+) -> int:
+    """Stream rows to a CSV or JSON Lines file and return how many were written.
+
+    Rows are written as they are pulled from ``rows``, so memory does not
+    grow with the size of the export. The file is written under a ``.part``
+    name and renamed once complete; a failed export leaves no file behind.
+    Epoch millisecond ``time_fields`` are written as ISO 8601 UTC strings.
+    ``progress`` is called with the running row count every
+    ``progress_every`` rows.
+    """
+    tmp_path = f"{path}.part"
+    count = 0
+
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as out:
+            if export_format == EXPORT_FORMAT_CSV:
+                writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+                writer.writeheader()
+                write = writer.writerow
+            else:
+
+                def write(row: Dict[str, Any]) -> None:
+                    out.write(
+                        json.dumps(
+                            {f: row.get(f) for f in fields}, separators=(",", ":")
+                        )
+                        + "\n"
+                    )
+
+            for row in rows:
+                if time_fields:
+                    row = dict(row)
+                    for field in time_fields:
+                        row[field] = ms_to_iso(row.get(field))
+                write(row)
+                count += 1
+                if progress is not None and count % progress_every == 0:
+                    progress(count)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    _LOGGER.info(f"Exported {count} row(s) to {path}")
+    return count
@@ -0,0 +1,225 @@
+"""Sliding-window tracker for failed authentication attempts."""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from .const import (
+    FAILED_ATTEMPTS_WINDOW_SIZE,
+    LOCKOUT_DURATION,
+    LOCKOUT_MAX_SOURCES,
+    MAX_FAILED_ATTEMPTS,
+    MAX_FAILED_ATTEMPTS_GLOBAL,
+)
+
+
+class FailedAttemptTracker:
+    """Failed attempt times inside the lockout window, oldest first.
+
+    The failed_attempts table stays the durable record; this keeps the
+    recent window in memory so lockout checks and sensor counts need no
+    SQL. Expired entries are dropped from the left as they age out, which
+    keeps every check amortized O(1).
+    """
+
+    def __init__(
+        self,
+        window: float = LOCKOUT_DURATION,
+        max_attempts: int = MAX_FAILED_ATTEMPTS,
+        size: int = FAILED_ATTEMPTS_WINDOW_SIZE,
+    ):
+        """Initialize the tracker."""
+        self._window = window
+        self._max_attempts = max_attempts
+        self._attempts: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        """Drop attempts older than the window (lock must be held)."""
+        cutoff = now - self._window
+        while self._attempts and self._attempts[0] <= cutoff:
+            self._attempts.popleft()
+
+    def load(self, timestamps: Iterable[float]) -> None:
+        """Replace the window with attempts read from the database."""
+        with self._lock:
+            self._attempts.clear()
+            self._attempts.extend(sorted(timestamps))
+            self._expire(time.time())
+
+    def record(self, timestamp: Optional[float] = None) -> int:
+        """Add a failed attempt and return the count in the window."""
+        now = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            self._attempts.append(now)
+            self._expire(now)
+            return len(self._attempts)
+
+    def clear(self) -> None:
+        """Forget all attempts (called on successful auth)."""
+        with self._lock:
+            self._attempts.clear()
+
+    def count(self, now: Optional[float] = None) -> int:
+        """Return the number of attempts inside the window."""
+        with self._lock:
+            self._expire(now if now is not None else time.time())
+            return len(self._attempts)
+
+    def is_locked_out(self, now: Optional[float] = None) -> bool:
+        """Return True if the window holds too many failed attempts."""
+        return self.count(now) >= self._max_attempts
+
+    def locked_until(self, now: Optional[float] = None) -> Optional[float]:
+        """Return when a current lockout ends, or None if not locked out."""
+        with self._lock:
+            self._expire(now if now is not None else time.time())
+            if len(self._attempts) < self._max_attempts:
+                return None
+            return self._attempts[-self._max_attempts] + self._window
+
+    def next_expiry(self) -> Optional[float]:
+        """Return when the oldest attempt leaves the window, if any."""
+        with self._lock:
+            if not self._attempts:
+                return None
+            return self._attempts[0] + self._window
+
+
+class SourceLockouts:
+    """Failed attempt windows per source, with a global fallback window.
+
+    A source (Home Assistant user or entry point) is locked
+    out after ``max_attempts`` failures inside the window without locking
+    out anyone else. Every failure also counts towards the global window,
+    which locks out all sources after ``global_max_attempts``, so guesses
+    spread over many sources are still stopped.
+
+    At most ``max_sources`` source windows are kept; the least recently
+    failing one is dropped first, and the global window still holds its
+    attempts.
+    """
+
+    def __init__(
+        self,
+        window: float = LOCKOUT_DURATION,
+        max_attempts: int = MAX_FAILED_ATTEMPTS,
+        global_max_attempts: int = MAX_FAILED_ATTEMPTS_GLOBAL,
+        max_sources: int = LOCKOUT_MAX_SOURCES,
+    ):
+        """Initialize the index."""
+        self._window = window
+        self._max_attempts = max_attempts
+        self._max_sources = max_sources
+        self._global = FailedAttemptTracker(window, global_max_attempts)
+        self._sources: Dict[str, FailedAttemptTracker] = {}
+        self._lock = threading.Lock()
+
+    def _tracker(self, source: str, now: float) -> FailedAttemptTracker:
+        """Return the window of ``source``, most recent last (lock must be held)."""
+        tracker = self._sources.pop(source, None)
+        if tracker is None:
+            if len(self._sources) >= self._max_sources:
+                self._prune(now)
+            if len(self._sources) >= self._max_sources:
+                del self._sources[next(iter(self._sources))]
+            tracker = FailedAttemptTracker(self._window, self._max_attempts)
+        self._sources[source] = tracker
+        return tracker
+
+    def _prune(self, now: float) -> None:
+        """Drop source windows with no attempts left (lock must be held)."""
+        for source, tracker in list(self._sources.items()):
+            if not tracker.count(now):
+                del self._sources[source]
+
+    def load(self, attempts: Iterable[Tuple[Optional[str], float]]) -> None:
+        """Replace all windows with ``(source, timestamp)`` rows from the database.
+
+        Rows without a source (written by older versions) only count
+        towards the global window.
+        """
+        attempts = sorted(attempts, key=lambda attempt: attempt[1])
+        by_source: Dict[str, List[float]] = {}
+        for source, timestamp in attempts:
+            if source is not None:
+                by_source.setdefault(source, []).append(timestamp)
+
+        self._global.load(timestamp for _, timestamp in attempts)
+        with self._lock:
+            self._sources.clear()
+            for source, timestamps in by_source.items():
+                self._tracker(source, timestamps[-1]).load(timestamps)
+            self._prune(time.time())
+
+    def record(self, source: Optional[str], timestamp: Optional[float] = None) -> int:
+        """Add a failed attempt and return the count in the source's window."""
+        now = timestamp if timestamp is not None else time.time()
+        count = self._global.record(now)
+        if source is None:
+            return count
+
+        with self._lock:
+            return self._tracker(source, now).record(now)
+
+    def clear(self, source: str) -> None:
+        """Forget the attempts of one source (called on successful auth)."""
+        with self._lock:
+            self._sources.pop(source, None)
+
+    def count(self, source: Optional[str] = None, now: Optional[float] = None) -> int:
+        """Return the attempts in the window of ``source``, or in the global window."""
+        if source is None:
+            return self._global.count(now)
+
+        with self._lock:
+            tracker = self._sources.get(source)
+        return tracker.count(now) if tracker else 0
+
+    def is_locked_out(
+        self, source: Optional[str] = None, now: Optional[float] = None
+    ) -> bool:
+        """Return True if everyone, or ``source`` in particular, is locked out."""
+        if self._global.is_locked_out(now):
+            return True
+        if source is None:
+            return False
+
+        with self._lock:
+            tracker = self._sources.get(source)
+        return tracker is not None and tracker.is_locked_out(now)
+
+    def counts(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Return the attempt count of every source with attempts in its window."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._prune(now)
+            return {
+                source: tracker.count(now) for source, tracker in self._sources.items()
+            }
+
+    def locked_sources(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Return when the lockout of each locked out source ends."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            trackers = list(self._sources.items())
+
+        locked = {}
+        for source, tracker in trackers:
+            until = tracker.locked_until(now)
+            if until is not None:
+                locked[source] = until
+        return locked
+
+    def next_expiry(self) -> Optional[float]:
+        """Return when the next attempt leaves any window, if any."""
+        with self._lock:
+            trackers = [self._global, *self._sources.values()]
+
+        expiries = [
+            expiry
+            for expiry in (tracker.next_expiry() for tracker in trackers)
+            if expiry is not None
+        ]
+        return min(expiries, default=None)
@@ -0,0 +1,208 @@
+"""Data models for Secure Alarm System."""
+
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Optional, Tuple
+
+from .const import (
+    DEFAULT_ALARM_DURATION,
+    DEFAULT_ENTRY_DELAY,
+    DEFAULT_EXIT_DELAY,
+    STATE_ALARM_ARMED_AWAY,
+    STATE_ALARM_ARMED_HOME,
+    STATE_ALARM_DISARMED,
+)
+from .timestamps import now_ms
+
+
+@dataclass(frozen=True)
+class AlarmConfig:
+    """Immutable snapshot of the alarm_config row."""
+
+    entry_delay: int = DEFAULT_ENTRY_DELAY
+    exit_delay: int = DEFAULT_EXIT_DELAY
+    alarm_duration: int = DEFAULT_ALARM_DURATION
+    trigger_doors: Optional[str] = None
+    notification_mobile: bool = True
+    notification_sms: bool = False
+    sms_numbers: Optional[str] = None
+    lock_delay_home: int = 0
+    lock_delay_away: int = 60
+    close_delay_home: int = 0
+    close_delay_away: int = 60
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "AlarmConfig":
+        """Build a config from a database row, ignoring unknown columns."""
+        values = {}
+        for field in fields(cls):
+            if field.name not in row or row[field.name] is None:
+                continue
+            value = row[field.name]
+            if field.type is bool or field.type == "bool":
+                value = bool(value)
+            values[field.name] = value
+        return cls(**values)
+
+    @classmethod
+    def columns(cls) -> frozenset:
+        """Return the column names that can be updated."""
+        return frozenset(f.name for f in fields(cls) if f.name != "updated_at")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the config as a plain dictionary."""
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class Zone:
+    """Immutable snapshot of an alarm_zones row."""
+
+    entity_id: str
+    zone_name: str
+    zone_type: str
+    enabled_away: bool = True
+    enabled_home: bool = True
+    bypassed: bool = False
+    bypass_until: Optional[int] = None
+    last_state_change: Optional[int] = None
+    id: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Zone":
+        """Build a zone from a database row."""
+        return cls(
+            entity_id=row["entity_id"],
+            zone_name=row["zone_name"],
+            zone_type=row["zone_type"],
+            enabled_away=bool(row.get("enabled_away", 1)),
+            enabled_home=bool(row.get("enabled_home", 1)),
+            bypassed=bool(row.get("bypassed", 0)),
+            bypass_until=row.get("bypass_until"),
+            last_state_change=row.get("last_state_change"),
+            id=row.get("id"),
+        )
+
+    def monitored_in(self, mode: Optional[str]) -> bool:
+        """Return True if the zone is part of the given alarm mode.
+
+        Modes other than armed away/home (arming, pending, ...) include
+        every zone, matching ``AlarmDatabase.get_zones``.
+        """
+        if mode == STATE_ALARM_ARMED_AWAY:
+            return self.enabled_away
+        if mode == STATE_ALARM_ARMED_HOME:
+            return self.enabled_home
+        return True
+
+    def is_bypassed(self, now: Optional[int] = None) -> bool:
+        """Return True if the zone is bypassed and the bypass has not expired."""
+        if not self.bypassed:
+            return False
+        if self.bypass_until is None:
+            return True
+        return (now or now_ms()) < self.bypass_until
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the zone in the same shape as a database row."""
+        data = asdict(self)
+        data["enabled_away"] = int(self.enabled_away)
+        data["enabled_home"] = int(self.enabled_home)
+        data["bypassed"] = int(self.bypassed)
+        return data
+
+
+@dataclass(frozen=True)
+class User:
+    """Immutable directory entry for an alarm_users row (no PIN hashes)."""
+
+    id: int
+    name: str
+    is_admin: bool = False
+    is_duress: bool = False
+    enabled: bool = True
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    has_separate_lock_pin: bool = False
+    created_at: Optional[int] = None
+    last_used: Optional[int] = None
+    use_count: int = 0
+    accessible_locks: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "User":
+        """Build a user from a row with comma-separated accessible_locks."""
+        locks = row.get("accessible_locks")
+        return cls(
+            id=row["id"],
+            name=row["name"],
+            is_admin=bool(row["is_admin"]),
+            is_duress=bool(row["is_duress"]),
+            enabled=bool(row["enabled"]),
+            phone=row.get("phone"),
+            email=row.get("email"),
+            has_separate_lock_pin=bool(row["has_separate_lock_pin"]),
+            created_at=row.get("created_at"),
+            last_used=row.get("last_used"),
+            use_count=row.get("use_count") or 0,
+            accessible_locks=tuple(sorted(locks.split(","))) if locks else (),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the user in the shape ``AlarmDatabase.get_users`` returns."""
+        # Built by hand: dataclasses.asdict deep-copies and is ~10x slower
+        return {
+            "id": self.id,
+            "name": self.name,
+            "is_admin": int(self.is_admin),
+            "is_duress": int(self.is_duress),
+            "enabled": int(self.enabled),
+            "phone": self.phone,
+            "email": self.email,
+            "has_separate_lock_pin": int(self.has_separate_lock_pin),
+            "created_at": self.created_at,
+            "last_used": self.last_used,
+            "use_count": self.use_count,
+            "accessible_locks": list(self.accessible_locks),
+        }
+
+
+@dataclass(frozen=True)
+class AlarmSnapshot:
+    """Everything the entities display, captured at one point in time."""
+
+    state: str
+    changed_by: Optional[str] = None
+    triggered_by: Optional[str] = None
+    failed_attempts: int = 0
+    locked_out: bool = False
+    failed_by_source: Tuple[Tuple[str, int], ...] = ()
+    locked_sources: Tuple[
+        Tuple[str, int], ...
+    ] = ()  # (source, lockout end in epoch ms)
+    total_zones: int = 0
+    active_zones: int = 0
+    bypassed_zones: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class AlarmStateRecord:
+    """Persisted alarm state and the deadlines of its running timers.
+
+    Deadlines are absolute UTC epoch seconds so the remaining delay can be
+    recomputed after a restart.
+    """
+
+    state: str = STATE_ALARM_DISARMED
+    changed_by: Optional[str] = None
+    triggered_by: Optional[str] = None
+    triggered_entity_id: Optional[str] = None
+    exit_deadline: Optional[float] = None
+    entry_deadline: Optional[float] = None
+    alarm_deadline: Optional[float] = None
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "AlarmStateRecord":
+        """Build a record from the alarm_state row, ignoring unknown columns."""
+        return cls(**{f.name: row[f.name] for f in fields(cls) if f.name in row})
@@ -0,0 +1,133 @@
+"""bcrypt PIN hashing with a cost calibrated to this host."""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import bcrypt
+
+from .const import (
+    BCRYPT_MAX_COST,
+    BCRYPT_MIN_COST,
+    BCRYPT_PROBE_COST,
+    BCRYPT_PROBE_ROUNDS,
+    BCRYPT_REHASH_TOLERANCE,
+    PIN_HASH_BUDGET_MS,
+)
+from .timestamps import ms_to_iso, now_ms
+
+_LOGGER = logging.getLogger(__name__)
+
+_PROBE_PIN = b"000000"
+
+
+def hash_cost(pin_hash: str) -> Optional[int]:
+    """Return the cost factor of a ``$2b$NN$...`` bcrypt hash."""
+    try:
+        return int(pin_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PinHasher:
+    """Hash PINs at the highest bcrypt cost that fits a latency budget.
+
+    bcrypt time doubles with each cost step, so ``calibrate`` times a few
+    hashes at a cheap probe cost and extrapolates to the highest cost whose
+    check stays within ``budget_ms`` on this host, clamped to
+    ``BCRYPT_MIN_COST``..``BCRYPT_MAX_COST``. The chosen cost is then timed
+    once for real. Hashes stored below the minimum cost, or more than
+    ``tolerance`` steps from the chosen one, report ``needs_rehash`` so
+    they can be replaced after the next successful login. The tolerance
+    keeps a host whose timing sits near a cost boundary from rehashing
+    every PIN each time a restart picks the neighbouring cost.
+    """
+
+    def __init__(
+        self,
+        budget_ms: float = PIN_HASH_BUDGET_MS,
+        min_cost: int = BCRYPT_MIN_COST,
+        max_cost: int = BCRYPT_MAX_COST,
+        tolerance: int = BCRYPT_REHASH_TOLERANCE,
+    ):
+        """Initialize the hasher (at the minimum cost until calibrated)."""
+        self._budget_ms = budget_ms
+        self._min_cost = min_cost
+        self._max_cost = max_cost
+        self._tolerance = tolerance
+        self._cost = min_cost
+        self._probe_ms: Optional[float] = None
+        self._hash_ms: Optional[float] = None
+        self._calibrated_at: Optional[int] = None
+
+    @property
+    def cost(self) -> int:
+        """Return the cost new hashes are made with."""
+        return self._cost
+
+    @staticmethod
+    def _time_hash(cost: int, rounds: int = 1) -> float:
+        """Return the fastest of ``rounds`` hashes at ``cost``, in ms."""
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            bcrypt.hashpw(_PROBE_PIN, bcrypt.gensalt(cost))
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def calibrate(self) -> int:
+        """Measure bcrypt on this host and choose the cost; return it."""
+        # The fastest probe is the least disturbed by other load
+        probe_ms = self._time_hash(BCRYPT_PROBE_COST, BCRYPT_PROBE_ROUNDS)
+
+        cost = self._min_cost
+        while (
+            cost < self._max_cost
+            and probe_ms * 2 ** (cost + 1 - BCRYPT_PROBE_COST) <= self._budget_ms
+        ):
+            cost += 1
+
+        self._cost = cost
+        self._probe_ms = round(probe_ms, 1)
+        self._hash_ms = round(self._time_hash(cost), 1)
+        self._calibrated_at = now_ms()
+
+        if cost == self._min_cost and self._hash_ms > self._budget_ms:
+            _LOGGER.warning(
+                f"bcrypt cost {cost} takes {self._hash_ms:.0f} ms, over the "
+                f"{self._budget_ms:.0f} ms budget; not going below the minimum cost"
+            )
+        else:
+            _LOGGER.info(
+                f"bcrypt cost {cost} selected ({self._hash_ms:.0f} ms per PIN check)"
+            )
+
+        return cost
+
+    def hash(self, pin: str) -> str:
+        """Hash a PIN at the calibrated cost."""
+        return bcrypt.hashpw(pin.encode("utf-8"), bcrypt.gensalt(self._cost)).decode(
+            "utf-8"
+        )
+
+    def needs_rehash(self, pin_hash: str) -> bool:
+        """Return True if a stored hash is too weak or too far from the chosen cost."""
+        cost = hash_cost(pin_hash)
+        if cost is None or cost < self._min_cost:
+            return True
+        return abs(cost - self._cost) > self._tolerance
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the calibration for diagnostics."""
+        return {
+            "cost": self._cost,
+            "budget_ms": self._budget_ms,
+            "min_cost": self._min_cost,
+            "max_cost": self._max_cost,
+            "rehash_tolerance": self._tolerance,
+            "probe_cost": BCRYPT_PROBE_COST,
+            "probe_ms": self._probe_ms,
+            "hash_ms": self._hash_ms,
+            "calibrated_at": ms_to_iso(self._calibrated_at),
+        }
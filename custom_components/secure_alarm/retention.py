@@ -0,0 +1,202 @@
+"""Audit log retention and daily rollups for Secure Alarm System."""
+
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from .const import (
+    RETENTION_BATCH_SIZE,
+    RETENTION_DEFAULT_TYPE,
+    RETENTION_FAILED_ATTEMPT,
+    TABLE_DAILY_SUMMARY,
+    TABLE_EVENTS,
+    TABLE_FAILED_ATTEMPTS,
+    TABLE_RETENTION,
+)
+from .timestamps import MS_PER_DAY, ms_to_iso, now_ms
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AuditLogPruner:
+    """Delete expired audit rows in small batches, rolling them up first.
+
+    The policy maps an event type to the number of days its rows are kept
+    (None keeps them forever). ``RETENTION_DEFAULT_TYPE`` covers event types
+    without their own rule and ``RETENTION_FAILED_ATTEMPT`` covers the
+    failed_attempts table.
+
+    Each ``prune_batch`` call finds at most ``batch_size`` expired rows of
+    one rule with a read connection, then adds them to the daily summary
+    (counts per day, type, zone and user) and deletes them in one short
+    write transaction, so the writer is never held for long. With an
+    ``archive``, expired alarm_events rows are appended to it before they
+    are deleted; if archiving fails nothing is deleted. Ids archived but
+    not yet deleted are remembered so a retry does not archive them again;
+    after a crash in between, readers drop the copies (``unique_events``).
+    """
+
+    def __init__(
+        self, connections, archive=None, batch_size: int = RETENTION_BATCH_SIZE
+    ):
+        """Initialize the pruner."""
+        self._connections = connections
+        self._archive = archive
+        self._batch_size = batch_size
+        self._policy: Dict[str, Optional[int]] = {}
+        self._archived: Set[int] = set()  # archived ids not yet deleted
+
+    @property
+    def policy(self) -> Dict[str, Optional[int]]:
+        """Return a copy of the retention policy."""
+        return dict(self._policy)
+
+    def load(self, cursor) -> None:
+        """Load the retention policy."""
+        cursor.execute(f"SELECT event_type, days FROM {TABLE_RETENTION}")
+        self._policy = {row["event_type"]: row["days"] for row in cursor.fetchall()}
+
+    def set_rule(self, event_type: str, days: Optional[int]) -> None:
+        """Keep rows of an event type for ``days`` days, or forever if None."""
+        with self._connections.write() as cursor:
+            cursor.execute(
+                f"""
+                INSERT OR REPLACE INTO {TABLE_RETENTION} (event_type, days)
+                VALUES (?, ?)
+            """,
+                (event_type, days),
+            )
+
+        policy = dict(self._policy)
+        policy[event_type] = days
+        self._policy = policy
+
+    def prune_batch(self, now: Optional[int] = None) -> int:
+        """Roll up and delete one batch of expired rows; return how many."""
+        now = now or now_ms()
+        policy = self._policy
+
+        for rule, days in sorted(policy.items()):
+            if days is None:
+                continue
+
+            cutoff = now - days * MS_PER_DAY
+            if rule == RETENTION_FAILED_ATTEMPT:
+                count = self._prune_failed_attempts(cutoff)
+            else:
+                count = self._prune_events(rule, cutoff, policy)
+
+            if count:
+                _LOGGER.debug(
+                    f"Pruned {count} {rule} audit row(s) older than {ms_to_iso(cutoff)}"
+                )
+                return count
+
+        return 0
+
+    def _expired_rows(self, sql: str, params: List) -> List[Dict[str, Any]]:
+        """Return up to one batch of rows selected by ``sql``."""
+        with self._connections.read() as cursor:
+            cursor.execute(f"{sql} LIMIT ?", params + [self._batch_size])
+            return [dict(row) for row in cursor.fetchall()]
+
+    def _prune_events(
+        self, rule: str, cutoff: int, policy: Dict[str, Optional[int]]
+    ) -> int:
+        """Roll up and delete expired alarm_events rows of one rule."""
+        if rule == RETENTION_DEFAULT_TYPE:
+            # Every type that has its own rule is handled by that rule
+            others = [
+                t
+                for t in policy
+                if t not in (RETENTION_DEFAULT_TYPE, RETENTION_FAILED_ATTEMPT)
+            ]
+            exclude = (
+                f"event_type NOT IN ({', '.join('?' * len(others))})" if others else "1"
+            )
+            rows = self._expired_rows(
+                f"""
+                SELECT * FROM {TABLE_EVENTS}
+                WHERE timestamp < ? AND {exclude}
+            """,
+                [cutoff] + others,
+            )
+        else:
+            rows = self._expired_rows(
+                f"""
+                SELECT * FROM {TABLE_EVENTS}
+                WHERE event_type = ? AND timestamp < ?
+            """,
+                [rule, cutoff],
+            )
+
+        if not rows:
+            return 0
+
+        ids = [row["id"] for row in rows]
+
+        if self._archive is not None:
+            # Rows archived by a batch whose delete failed are not added twice
+            self._archive.append(
+                [row for row in rows if row["id"] not in self._archived]
+            )
+            self._archived.update(ids)
+
+        placeholders = ", ".join("?" * len(ids))
+        with self._connections.write() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {TABLE_DAILY_SUMMARY}
+                (day, event_type, zone_entity_id, user_name, count)
+                SELECT date(timestamp / 1000, 'unixepoch'), event_type,
+                       COALESCE(zone_entity_id, ''), COALESCE(user_name, ''), COUNT(*)
+                FROM {TABLE_EVENTS}
+                WHERE id IN ({placeholders})
+                GROUP BY 1, 2, 3, 4
+                ON CONFLICT (day, event_type, zone_entity_id, user_name)
+                DO UPDATE SET count = count + excluded.count
+            """,
+                ids,
+            )
+            cursor.execute(
+                f"DELETE FROM {TABLE_EVENTS} WHERE id IN ({placeholders})", ids
+            )
+            deleted = cursor.rowcount
+
+        self._archived.difference_update(ids)
+        return deleted
+
+    def _prune_failed_attempts(self, cutoff: int) -> int:
+        """Roll up and delete expired failed_attempts rows."""
+        ids = [
+            row["id"]
+            for row in self._expired_rows(
+                f"""
+            SELECT id FROM {TABLE_FAILED_ATTEMPTS}
+            WHERE timestamp < ?
+        """,
+                [cutoff],
+            )
+        ]
+
+        if not ids:
+            return 0
+
+        placeholders = ", ".join("?" * len(ids))
+        with self._connections.write() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {TABLE_DAILY_SUMMARY}
+                (day, event_type, zone_entity_id, user_name, count)
+                SELECT date(timestamp / 1000, 'unixepoch'), ?, '', '', COUNT(*)
+                FROM {TABLE_FAILED_ATTEMPTS}
+                WHERE id IN ({placeholders})
+                GROUP BY 1
+                ON CONFLICT (day, event_type, zone_entity_id, user_name)
+                DO UPDATE SET count = count + excluded.count
+            """,
+                [RETENTION_FAILED_ATTEMPT] + ids,
+            )
+            cursor.execute(
+                f"DELETE FROM {TABLE_FAILED_ATTEMPTS} WHERE id IN ({placeholders})", ids
+            )
+            return cursor.rowcount
@@ -2,8 +2,9 @@
 import logging
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
@@ -25,6 +26,13 @@ async def async_setup_entry(
         FailedAttemptsSensor(coordinator, database),
         LastChangedBySensor(coordinator, database),
         ActiveZonesSensor(coordinator, database),
+        DatabaseQueueSensor(coordinator, database),
+        AuthAdmissionSensor(coordinator, database, "admitted",
+                            "PIN Checks Admitted", "mdi:shield-check-outline"),
+        AuthAdmissionSensor(coordinator, database, "queued",
+                            "PIN Checks Queued", "mdi:timer-sand"),
+        AuthAdmissionSensor(coordinator, database, "rejected",
+                            "PIN Checks Rejected", "mdi:shield-off-outline"),
     ]
     
     async_add_entities(sensors, True)
@@ -33,6 +41,7 @@ class AlarmStatusSensor(SensorEntity):
     """Sensor for alarm status information."""
     
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Alarm Status"
     _attr_icon = "mdi:information"
     
@@ -44,7 +53,9 @@ class AlarmStatusSensor(SensorEntity):
     
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
-        self._coordinator.add_listener(self._handle_coordinator_update)
+        self.async_on_remove(
+            self._coordinator.add_listener(self._handle_coordinator_update)
+        )
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -54,22 +65,24 @@ class AlarmStatusSensor(SensorEntity):
     @property
     def native_value(self) -> str:
         """Return the state of the sensor."""
-        state = self._coordinator.state
+        state = self._coordinator.snapshot.state
         return state.replace('_', ' ').title()
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
+        snapshot = self._coordinator.snapshot
         return {
-            "state_raw": self._coordinator.state,
-            "changed_by": self._coordinator.changed_by,
-            "triggered_by": self._coordinator.triggered_by,
+            "state_raw": snapshot.state,
+            "changed_by": snapshot.changed_by,
+            "triggered_by": snapshot.triggered_by,
         }
 
 class FailedAttemptsSensor(SensorEntity):
     """Sensor for failed authentication attempts."""
     
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Failed Login Attempts"
     _attr_icon = "mdi:lock-alert"
     _attr_native_unit_of_measurement = "attempts"
@@ -82,7 +95,9 @@ class FailedAttemptsSensor(SensorEntity):
     
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
-        self._coordinator.add_listener(self._handle_coordinator_update)
+        self.async_on_remove(
+            self._coordinator.add_listener(self._handle_coordinator_update)
+        )
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -92,16 +107,18 @@ class FailedAttemptsSensor(SensorEntity):
     @property
     def native_value(self) -> int:
         """Return the number of failed attempts."""
-        try:
-            return self._database.get_failed_attempts_count()
-        except Exception as e:
-            _LOGGER.error(f"Error getting failed attempts: {e}")
-            return 0
+        return self._coordinator.snapshot.failed_attempts
+    
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the failed attempts of each source in the window."""
+        return {"by_source": dict(self._coordinator.snapshot.failed_by_source)}
 
 class LastChangedBySensor(SensorEntity):
     """Sensor for who last changed the alarm state."""
     
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Last Changed By"
     _attr_icon = "mdi:account"
     
@@ -113,7 +130,9 @@ class LastChangedBySensor(SensorEntity):
     
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
-        self._coordinator.add_listener(self._handle_coordinator_update)
+        self.async_on_remove(
+            self._coordinator.add_listener(self._handle_coordinator_update)
+        )
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -123,12 +142,13 @@ class LastChangedBySensor(SensorEntity):
     @property
     def native_value(self) -> str:
         """Return who last changed the alarm."""
-        return self._coordinator.changed_by or "Unknown"
+        return self._coordinator.snapshot.changed_by or "Unknown"
 
 class ActiveZonesSensor(SensorEntity):
     """Sensor for active/monitored zones count."""
     
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Active Zones"
     _attr_icon = "mdi:shield-check"
     _attr_native_unit_of_measurement = "zones"
@@ -141,7 +161,9 @@ class ActiveZonesSensor(SensorEntity):
     
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
-        self._coordinator.add_listener(self._handle_coordinator_update)
+        self.async_on_remove(
+            self._coordinator.add_listener(self._handle_coordinator_update)
+        )
     
     @callback
     def _handle_coordinator_update(self) -> None:
@@ -151,23 +173,83 @@ class ActiveZonesSensor(SensorEntity):
     @property
     def native_value(self) -> int:
         """Return the number of active zones."""
-        try:
-            zones = self._database.get_zones(self._coordinator.state)
-            active = [z for z in zones if not z['bypassed']]
-            return len(active)
-        except Exception as e:
-            _LOGGER.error(f"Error getting active zones: {e}")
-            return 0
+        return self._coordinator.snapshot.active_zones
     
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
-        try:
-            zones = self._database.get_zones(self._coordinator.state)
-            return {
-                "total_zones": len(zones),
-                "bypassed_zones": [z['zone_name'] for z in zones if z['bypassed']],
-            }
-        except Exception as e:
-            _LOGGER.error(f"Error getting zones: {e}")
-            return {}
\ No newline at end of file
+        snapshot = self._coordinator.snapshot
+        return {
+            "total_zones": snapshot.total_zones,
+            "bypassed_zones": list(snapshot.bypassed_zones),
+        }
+
+class DatabaseQueueSensor(SensorEntity):
+    """Diagnostic sensor for jobs waiting on the database thread.
+    
+    Polled on purpose: the depth changes on every database job, off the
+    event loop, so it is sampled rather than pushed.
+    """
+    
+    _attr_has_entity_name = True
+    _attr_should_poll = True
+    _attr_name = "Database Queue Depth"
+    _attr_icon = "mdi:database-clock"
+    _attr_native_unit_of_measurement = "jobs"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    
+    def __init__(self, coordinator, database):
+        """Initialize the sensor."""
+        self._coordinator = coordinator
+        self._database = database
+        self._attr_unique_id = f"{DOMAIN}_database_queue_depth"
+    
+    @property
+    def native_value(self) -> int:
+        """Return the number of queued database jobs."""
+        return self._database.queue_depth
+
+class AuthAdmissionSensor(SensorEntity):
+    """Diagnostic counter of PIN checks seen by admission control."""
+    
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_native_unit_of_measurement = "requests"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    
+    def __init__(self, coordinator, database, counter: str, name: str, icon: str):
+        """Initialize the sensor."""
+        self._coordinator = coordinator
+        self._database = database
+        self._counter = counter
+        self._attr_name = name
+        self._attr_icon = icon
+        self._attr_unique_id = f"{DOMAIN}_auth_{counter}"
+    
+    async def async_added_to_hass(self) -> None:
+        """Run when entity is added to hass."""
+        self.async_on_remove(
+            self._coordinator.add_admission_listener(self._handle_admission_update)
+        )
+    
+    @callback
+    def _handle_admission_update(self) -> None:
+        """Handle updated counters from admission control."""
+        self.async_write_ha_state()
+    
+    @property
+    def native_value(self) -> int:
+        """Return the counter since startup."""
+        return getattr(self._coordinator.admission, self._counter)
+    
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return which bucket kind caused rejections and the current queue."""
+        if self._counter != "rejected":
+            return None
+        admission = self._coordinator.admission
+        return {
+            **{f"by_{kind}": count for kind, count in admission.rejected_by.items()},
+            "waiting": admission.waiting,
+        }
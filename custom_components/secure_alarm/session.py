@@ -0,0 +1,130 @@
+"""Short-lived admin session tokens for Secure Alarm System."""
+
+import hashlib
+import hmac
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .const import ADMIN_SESSION_IDLE_TIMEOUT, ADMIN_SESSION_MAX_AGE
+
+
+@dataclass
+class AdminSession:
+    """An authenticated admin and when the session was last used."""
+
+    user_id: int
+    user_name: str
+    created: float
+    last_used: float
+
+
+class AdminSessionManager:
+    """Issue and verify admin session tokens.
+
+    A token is ``<session id>.<HMAC-SHA256 of the id>`` signed with a key
+    that only lives in memory, so tokens never survive a restart. Verifying
+    one is a constant-time signature check and a dict lookup instead of a
+    bcrypt scan over all users. Sessions end after ``idle_timeout`` seconds
+    without use, ``max_age`` seconds after login, or when revoked.
+
+    Only used from the event loop.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = ADMIN_SESSION_IDLE_TIMEOUT,
+        max_age: float = ADMIN_SESSION_MAX_AGE,
+        key: Optional[bytes] = None,
+    ):
+        """Initialize the manager."""
+        self._idle_timeout = idle_timeout
+        self._max_age = max_age
+        self._key = key or secrets.token_bytes(32)
+        self._sessions: Dict[str, AdminSession] = {}
+
+    def __len__(self) -> int:
+        """Return the number of sessions that have not been pruned yet."""
+        return len(self._sessions)
+
+    @property
+    def idle_timeout(self) -> float:
+        """Return the idle timeout in seconds."""
+        return self._idle_timeout
+
+    def _sign(self, session_id: str) -> str:
+        """Return the signature for a session id."""
+        return hmac.new(self._key, session_id.encode(), hashlib.sha256).hexdigest()
+
+    def _session_id(self, token: Optional[str]) -> Optional[str]:
+        """Return the session id of a correctly signed token, else None."""
+        # Issued tokens are ASCII; compare_digest raises TypeError on other str
+        if not token or not token.isascii() or "." not in token:
+            return None
+
+        session_id, signature = token.rsplit(".", 1)
+        if not hmac.compare_digest(signature, self._sign(session_id)):
+            return None
+        return session_id
+
+    def _expired(self, session: AdminSession, now: float) -> bool:
+        """Return True if the session timed out."""
+        return (
+            now - session.last_used > self._idle_timeout
+            or now - session.created > self._max_age
+        )
+
+    def _prune(self, now: float) -> None:
+        """Forget expired sessions."""
+        for session_id, session in list(self._sessions.items()):
+            if self._expired(session, now):
+                del self._sessions[session_id]
+
+    def create(self, user_id: int, user_name: str) -> str:
+        """Start a session for an authenticated admin and return its token."""
+        now = time.monotonic()
+        self._prune(now)
+
+        session_id = secrets.token_urlsafe(16)
+        self._sessions[session_id] = AdminSession(user_id, user_name, now, now)
+        return f"{session_id}.{self._sign(session_id)}"
+
+    def verify(self, token: Optional[str]) -> Optional[AdminSession]:
+        """Return the session for a valid token and reset its idle timer."""
+        session_id = self._session_id(token)
+        if session_id is None:
+            return None
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+
+        now = time.monotonic()
+        if self._expired(session, now):
+            del self._sessions[session_id]
+            return None
+
+        session.last_used = now
+        return session
+
+    def revoke(self, token: Optional[str]) -> bool:
+        """End the session for a token; return True if it existed."""
+        session_id = self._session_id(token)
+        if session_id is None:
+            return False
+
+        return self._sessions.pop(session_id, None) is not None
+
+    def revoke_user(self, user_id: int) -> int:
+        """End every session of a user and return how many were ended."""
+        ended = [sid for sid, s in self._sessions.items() if s.user_id == user_id]
+        for session_id in ended:
+            del self._sessions[session_id]
+        return len(ended)
+
+    def revoke_all(self) -> int:
+        """End every session and return how many were ended."""
+        count = len(self._sessions)
+        self._sessions.clear()
+        return count
@@ -0,0 +1,51 @@
+"""Timestamp helpers for Secure Alarm System.
+
+Time columns are stored as integer milliseconds since the Unix epoch (UTC),
+so they compare, index and do arithmetic as plain integers with no timezone
+ambiguity. They are only turned into text at the edges (service responses
+and exports).
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+# SQL for the current time in epoch milliseconds (column defaults)
+SQL_NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+MS_PER_DAY = 86400000
+
+
+def now_ms() -> int:
+    """Return the current time in epoch milliseconds."""
+    return time.time_ns() // 1000000
+
+
+def to_ms(value: datetime) -> int:
+    """Convert a datetime to epoch milliseconds (naive means local time)."""
+    return int(value.timestamp() * 1000)
+
+
+def ms_to_iso(value: Optional[int]) -> Optional[str]:
+    """Format epoch milliseconds as an ISO 8601 UTC string."""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value / 1000, timezone.utc).isoformat(
+        timespec="milliseconds"
+    )
+
+
+def ms_to_month(value: int) -> str:
+    """Return the ``YYYY-MM`` UTC month of epoch milliseconds."""
+    return datetime.fromtimestamp(value / 1000, timezone.utc).strftime("%Y-%m")
+
+
+def legacy_text_to_ms(value: str) -> int:
+    """Convert a ``YYYY-MM-DD HH:MM:SS`` UTC string from older versions."""
+    parsed = datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S")
+    return to_ms(parsed.replace(tzinfo=timezone.utc))
+
+
+def utc_timestamp() -> str:
+    """Return the current time in SQLite's CURRENT_TIMESTAMP format."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,160 @@
+"""Write-behind usage counters for Secure Alarm System."""
+
+from dataclasses import replace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .const import TABLE_FAILED_ATTEMPTS, TABLE_USERS, USAGE_FLUSH_INTERVAL
+from .models import User
+from .write_behind import WriteBehindWriter
+
+# (uses, cleared sources, PIN updates), as held by UsageWriter
+UsageBatch = Tuple[
+    Dict[int, Tuple[int, int]],
+    Dict[str, int],
+    Dict[Tuple[int, str], Tuple[str, Dict[str, Any]]],
+]
+
+
+class UsageWriter(WriteBehindWriter):
+    """Buffer what a successful login writes and store it in batches.
+
+    A login only changes memory: ``record_use`` adds to the user's
+    pending ``last_used``/``use_count`` and ``clear_source`` remembers
+    that a source's failed attempts up to now are to be deleted.
+    ``update_pin`` queues PIN column upkeep found during the check (a
+    rehash or a missing fingerprint). All are written in one transaction
+    every ``flush_interval`` seconds, on close, or before those rows are
+    read back. A crash loses at most one interval of usage statistics and
+    of lockout resets; lost PIN upkeep is redone on the next login.
+    """
+
+    def __init__(
+        self,
+        connections,
+        submit: Optional[Callable] = None,
+        flush_interval: float = USAGE_FLUSH_INTERVAL,
+    ):
+        """Initialize the writer (see ``WriteBehindWriter``)."""
+        super().__init__(connections, flush_interval, submit)
+        self._uses: Dict[int, Tuple[int, int]] = {}  # user id: (last_used, count)
+        self._cleared: Dict[str, int] = {}  # source: cleared up to (epoch ms)
+        # (user id, hash column): (hash the PIN matched, columns to set)
+        self._pins: Dict[Tuple[int, str], Tuple[str, Dict[str, Any]]] = {}
+
+    @property
+    def pending(self) -> int:
+        """Return the number of users and sources waiting to be written."""
+        return len(self._uses) + len(self._cleared) + len(self._pins)
+
+    def record_use(self, user_id: int, timestamp: int) -> None:
+        """Queue a successful authentication of a user."""
+        with self._lock:
+            _, count = self._uses.get(user_id, (timestamp, 0))
+            self._uses[user_id] = (timestamp, count + 1)
+            flush_now = self._schedule()
+
+        if flush_now:
+            self.flush()
+
+    def clear_source(self, source: str, timestamp: int) -> None:
+        """Queue the deletion of a source's failed attempts up to ``timestamp``."""
+        with self._lock:
+            self._cleared[source] = timestamp
+            flush_now = self._schedule()
+
+        if flush_now:
+            self.flush()
+
+    def update_pin(
+        self, user_id: int, hash_column: str, matched_hash: str, columns: Dict[str, Any]
+    ) -> None:
+        """Queue ``columns`` for a user whose PIN matched ``matched_hash``.
+
+        The update is skipped if the PIN has been changed in the meantime.
+        """
+        with self._lock:
+            _, pending = self._pins.get((user_id, hash_column), (matched_hash, {}))
+            self._pins[(user_id, hash_column)] = (matched_hash, {**pending, **columns})
+            flush_now = self._schedule()
+
+        if flush_now:
+            self.flush()
+
+    def overlay(self, user: User) -> User:
+        """Return ``user`` (read from the table) with its pending uses added."""
+        with self._lock:
+            pending = self._uses.get(user.id)
+
+        if pending is None:
+            return user
+        last_used, count = pending
+        return replace(user, last_used=last_used, use_count=user.use_count + count)
+
+    def _has_pending(self) -> bool:
+        """Return True if any counter, reset or PIN update is waiting."""
+        return bool(self._uses or self._cleared or self._pins)
+
+    def _take(self) -> UsageBatch:
+        """Remove and return everything pending (lock must be held)."""
+        batch = (self._uses, self._cleared, self._pins)
+        self._uses, self._cleared, self._pins = {}, {}, {}
+        return batch
+
+    def _write(self, cursor, batch: UsageBatch) -> None:
+        """Write counters, lockout resets and PIN updates."""
+        uses, cleared, pins = batch
+
+        if uses:
+            cursor.executemany(
+                f"""
+                UPDATE {TABLE_USERS}
+                SET last_used = ?,
+                    use_count = use_count + ?
+                WHERE id = ?
+            """,
+                [
+                    (last_used, count, user_id)
+                    for user_id, (last_used, count) in uses.items()
+                ],
+            )
+
+        # Attempts made after the reset stay counted
+        if cleared:
+            cursor.executemany(
+                f"""
+                DELETE FROM {TABLE_FAILED_ATTEMPTS}
+                WHERE ip_address = ? AND timestamp <= ?
+            """,
+                list(cleared.items()),
+            )
+
+        for (user_id, hash_column), (matched_hash, columns) in pins.items():
+            cursor.execute(
+                f"""
+                UPDATE {TABLE_USERS}
+                SET {", ".join(f"{column} = ?" for column in columns)}
+                WHERE id = ? AND {hash_column} = ?
+            """,
+                list(columns.values()) + [user_id, matched_hash],
+            )
+
+    def _restore(self, batch: UsageBatch) -> None:
+        """Keep a failed batch for the next flush, merged with newer writes."""
+        uses, cleared, pins = batch
+        for user_id, (last_used, count) in uses.items():
+            newer_last_used, newer = self._uses.get(user_id, (last_used, 0))
+            self._uses[user_id] = (max(last_used, newer_last_used), count + newer)
+        for source, timestamp in cleared.items():
+            self._cleared[source] = max(timestamp, self._cleared.get(source, timestamp))
+        for key, pending in pins.items():
+            self._pins.setdefault(key, pending)
+
+    def _describe(self, batch: Optional[UsageBatch]) -> str:
+        """Describe a batch for log messages."""
+        if batch is None:
+            return "usage"
+        uses, cleared, pins = batch
+        return (
+            f"usage of {len(uses)} user(s), {len(cleared)} lockout reset(s), "
+            f"{len(pins)} PIN update(s)"
+        )
@@ -0,0 +1,88 @@
+"""In-memory user directory for Secure Alarm System."""
+
+import logging
+import threading
+from dataclasses import replace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .models import User
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UserDirectory:
+    """Users and their accessible locks keyed by user id.
+
+    Loaded with one aggregated query at startup and then kept current by
+    the database after each committed user change, so listing users needs
+    no SQL at all. Updates replace the whole mapping (copy on write) like
+    the zone registry.
+    """
+
+    def __init__(self):
+        """Initialize an empty directory."""
+        self._users: Dict[int, User] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of users."""
+        return len(self._users)
+
+    def get(self, user_id: int) -> Optional[User]:
+        """Return a user by id, or None."""
+        return self._users.get(user_id)
+
+    def all(self) -> List[User]:
+        """Return every user sorted by name."""
+        return sorted(self._users.values(), key=lambda user: (user.name, user.id))
+
+    def load(self, users: Iterable[User]) -> None:
+        """Replace the directory contents."""
+        with self._lock:
+            self._users = {user.id: user for user in users}
+        _LOGGER.debug(f"User directory loaded with {len(self._users)} users")
+
+    def upsert(self, user: User) -> None:
+        """Add or replace a user."""
+        with self._lock:
+            users = dict(self._users)
+            users[user.id] = user
+            self._users = users
+
+    def _change(self, user_id: int, change: Callable[[User], User]) -> None:
+        """Replace a user with ``change(user)``, if present."""
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return
+            users = dict(self._users)
+            users[user_id] = change(user)
+            self._users = users
+
+    def update(self, user_id: int, **changes: Any) -> None:
+        """Change fields of a user, if present."""
+        self._change(user_id, lambda user: replace(user, **changes))
+
+    def set_lock_access(
+        self, user_id: int, lock_entity_id: str, can_access: bool
+    ) -> None:
+        """Grant or revoke a lock in a user's accessible locks."""
+
+        def change(user: User) -> User:
+            locks = set(user.accessible_locks)
+            if can_access:
+                locks.add(lock_entity_id)
+            else:
+                locks.discard(lock_entity_id)
+            return replace(user, accessible_locks=tuple(sorted(locks)))
+
+        self._change(user_id, change)
+
+    def record_use(self, user_id: int, timestamp: int) -> None:
+        """Record a successful authentication."""
+        self._change(
+            user_id,
+            lambda user: replace(
+                user, last_used=timestamp, use_count=user.use_count + 1
+            ),
+        )
@@ -0,0 +1,122 @@
+"""Shared write-behind machinery for Secure Alarm System writers."""
+
+import logging
+import threading
+from typing import Any, Callable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WriteBehindWriter:
+    """Buffer writes in memory and store them in one transaction per batch.
+
+    Subclasses keep their pending data under ``self._lock`` and call
+    ``_schedule`` (with the lock held) after queuing something. A timer
+    then flushes ``flush_interval`` seconds later, on the database thread
+    when ``submit`` is given. ``flush`` takes the whole batch while holding
+    the writer, so batches are written in order, and puts it back if the
+    write fails. After ``close`` every write is flushed straight away.
+
+    Subclasses implement ``_has_pending``, ``_take``, ``_write``,
+    ``_restore`` and ``_describe``.
+    """
+
+    def __init__(
+        self,
+        connections,
+        flush_interval: float,
+        submit: Optional[Callable] = None,
+    ):
+        """Initialize the writer.
+
+        ``submit`` schedules a background flush (normally onto the database
+        thread); without it, timed flushes run on the timer thread.
+        """
+        self._connections = connections
+        self._submit = submit
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+
+    def _has_pending(self) -> bool:
+        """Return True if anything is waiting to be written."""
+        raise NotImplementedError
+
+    def _take(self) -> Any:
+        """Remove and return everything pending (lock must be held)."""
+        raise NotImplementedError
+
+    def _write(self, cursor, batch: Any) -> None:
+        """Write a batch inside the writer's transaction."""
+        raise NotImplementedError
+
+    def _restore(self, batch: Any) -> None:
+        """Put back a batch that failed to write (lock must be held)."""
+        raise NotImplementedError
+
+    def _describe(self, batch: Any) -> str:
+        """Describe a batch for log messages."""
+        raise NotImplementedError
+
+    def _schedule(self) -> bool:
+        """Start the flush timer; return True to flush now (lock must be held)."""
+        if self._closed:
+            return True
+        if self._timer is None:
+            self._timer = threading.Timer(self._flush_interval, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+        return False
+
+    def _cancel_timer(self) -> None:
+        """Stop a pending timed flush (lock must be held)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self) -> None:
+        """Hand the timed flush to the database thread."""
+        with self._lock:
+            self._timer = None
+
+        if self._submit is not None:
+            try:
+                self._submit(self.flush)
+                return
+            except RuntimeError:
+                # Database thread already shut down
+                pass
+
+        self.flush()
+
+    def flush(self) -> None:
+        """Write everything pending in a single transaction."""
+        if not self._has_pending():
+            return
+
+        batch = None
+        try:
+            # Take the batch while holding the writer so batches stay in order
+            with self._connections.write() as cursor:
+                with self._lock:
+                    batch = self._take()
+                    self._cancel_timer()
+
+                self._write(cursor, batch)
+        except Exception as e:
+            _LOGGER.error(f"Error writing {self._describe(batch)}: {e}")
+            if batch is not None:
+                with self._lock:
+                    self._restore(batch)
+            return
+
+        _LOGGER.debug(f"Flushed {self._describe(batch)}")
+
+    def close(self) -> None:
+        """Flush pending writes; later ones are written synchronously."""
+        with self._lock:
+            self._closed = True
+            self._cancel_timer()
+
+        self.flush()
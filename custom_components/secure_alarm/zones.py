@@ -0,0 +1,157 @@
+"""In-memory zone registry for Secure Alarm System."""
+
+import logging
+import threading
+from dataclasses import replace
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .models import Zone
+from .timestamps import now_ms
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ZoneRegistry:
+    """Zones keyed by entity_id for constant-time lookups.
+
+    The database updates the registry after each committed zone change.
+    Updates replace the whole mapping (copy on write), so readers on the
+    event loop never need a lock and never see a half-applied change.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._zones: Dict[str, Zone] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[str]], None]] = []
+
+    def add_listener(self, listener: Callable[[List[str]], None]) -> Callable[[], None]:
+        """Call ``listener`` with the changed entity IDs after each update.
+
+        Listeners run on the thread that made the change. Returns a function
+        that removes the listener.
+        """
+        self._listeners.append(listener)
+
+        def remove_listener() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return remove_listener
+
+    def _notify(self, entity_ids: List[str]) -> None:
+        """Tell listeners which zones changed."""
+        if not entity_ids:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(entity_ids)
+            except Exception as e:
+                _LOGGER.error(f"Error in zone registry listener: {e}", exc_info=True)
+
+    def __len__(self) -> int:
+        """Return the number of registered zones."""
+        return len(self._zones)
+
+    def __contains__(self, entity_id: str) -> bool:
+        """Return True if the entity is a registered zone."""
+        return entity_id in self._zones
+
+    def get(self, entity_id: str) -> Optional[Zone]:
+        """Return the zone for an entity, or None."""
+        return self._zones.get(entity_id)
+
+    def all(self) -> List[Zone]:
+        """Return every zone."""
+        return list(self._zones.values())
+
+    def entity_ids(self) -> List[str]:
+        """Return the entity IDs of every zone."""
+        return list(self._zones)
+
+    def monitored(self, mode: Optional[str] = None) -> List[Zone]:
+        """Return the zones that are part of the given alarm mode."""
+        return [zone for zone in self._zones.values() if zone.monitored_in(mode)]
+
+    def bypassed(self, now: Optional[int] = None) -> List[Zone]:
+        """Return the zones with an active bypass."""
+        now = now or now_ms()
+        return [zone for zone in self._zones.values() if zone.is_bypassed(now)]
+
+    def next_bypass_expiry(self, now: Optional[int] = None) -> Optional[int]:
+        """Return when the earliest active timed bypass ends (epoch ms), or None."""
+        now = now or now_ms()
+        ends = [
+            zone.bypass_until
+            for zone in self._zones.values()
+            if zone.bypass_until is not None and zone.is_bypassed(now)
+        ]
+        return min(ends, default=None)
+
+    def load(self, zones: Iterable[Zone]) -> None:
+        """Replace the registry contents."""
+        with self._lock:
+            old_ids = list(self._zones)
+            self._zones = {zone.entity_id: zone for zone in zones}
+        _LOGGER.debug(f"Zone registry loaded with {len(self._zones)} zones")
+        self._notify(list(set(old_ids) | set(self._zones)))
+
+    def upsert(self, zone: Zone) -> None:
+        """Add or replace a zone."""
+        with self._lock:
+            zones = dict(self._zones)
+            zones[zone.entity_id] = zone
+            self._zones = zones
+        self._notify([zone.entity_id])
+
+    def upsert_many(self, zones: Iterable[Zone]) -> None:
+        """Add or replace several zones with a single notification."""
+        zones = list(zones)
+        if not zones:
+            return
+        with self._lock:
+            updated = dict(self._zones)
+            updated.update((zone.entity_id, zone) for zone in zones)
+            self._zones = updated
+        self._notify([zone.entity_id for zone in zones])
+
+    def remove(self, entity_id: str) -> None:
+        """Remove a zone."""
+        with self._lock:
+            if entity_id not in self._zones:
+                return
+            zones = dict(self._zones)
+            del zones[entity_id]
+            self._zones = zones
+        self._notify([entity_id])
+
+    def set_bypass(
+        self, entity_id: str, bypassed: bool, bypass_until: Optional[int] = None
+    ) -> None:
+        """Update a zone's bypass state."""
+        with self._lock:
+            zone = self._zones.get(entity_id)
+            if zone is None:
+                return
+            zones = dict(self._zones)
+            zones[entity_id] = replace(
+                zone, bypassed=bypassed, bypass_until=bypass_until
+            )
+            self._zones = zones
+        self._notify([entity_id])
+
+    def clear_bypasses(self) -> None:
+        """Remove the bypass from every zone."""
+        with self._lock:
+            changed = [
+                entity_id for entity_id, zone in self._zones.items() if zone.bypassed
+            ]
+            self._zones = {
+                entity_id: (
+                    replace(zone, bypassed=False, bypass_until=None)
+                    if zone.bypassed
+                    else zone
+                )
+                for entity_id, zone in self._zones.items()
+            }
+        self._notify(changed)
@@ -4,6 +4,10 @@ Place in: config/python_scripts/register_alarm_zone.py
 
 Requires python_script integration to be enabled in configuration.yaml:
 python_script:
+
+Deprecated: call the secure_alarm.register_zones service directly. It can
+register any number of zones in one call. This script is kept for existing
+automations and simply forwards to that service.
 """
 
 # Get the secure_alarm integration
@@ -17,34 +21,18 @@ enabled_home = data.get('enabled_home', True)
 
 if not entity_id:
     logger.error("No entity_id provided to register_alarm_zone")
+elif not hass.services.has_service(domain, 'register_zones'):
+    logger.error(f"Integration {domain} is not loaded")
 else:
-    # Get the database from the integration
-    integration_data = hass.data.get(domain, {})
-    
-    if integration_data:
-        # Get the first config entry
-        entry_id = list(integration_data.keys())[0]
-        database = integration_data[entry_id].get('database')
-        
-        if database:
-            # Get entity state to determine zone name
-            state = hass.states.get(entity_id)
-            zone_name = state.attributes.get('friendly_name', entity_id) if state else entity_id
-            
-            # Add zone to database
-            success = database.add_zone(
-                entity_id=entity_id,
-                zone_name=zone_name,
-                zone_type=zone_type,
-                enabled_away=enabled_away,
-                enabled_home=enabled_home
-            )
-            
-            if success:
-                logger.info(f"Registered zone: {zone_name} ({entity_id}) as {zone_type}")
-            else:
-                logger.error(f"Failed to register zone: {entity_id}")
-        else:
-            logger.error("Could not find database in secure_alarm integration")
-    else:
-        logger.error(f"Integration {domain} not found in hass.data")
\ No newline at end of file
+    zone = {
+        'entity_id': entity_id,
+        'zone_type': zone_type,
+        'enabled_away': enabled_away,
+        'enabled_home': enabled_home,
+    }
+
+    if data.get('zone_name'):
+        zone['zone_name'] = data.get('zone_name')
+
+    hass.services.call(domain, 'register_zones', {'zones': [zone]}, False)
+    logger.info(f"Registering zone: {entity_id} as {zone_type}")
@@ -0,0 +1,137 @@
+"""Benchmark lockout and time-range queries before and after the epoch migration.
+
+Builds a database in the legacy schema (text timestamps), times the
+queries on it, opens it with ``AlarmDatabase`` (which migrates it to
+integer epoch milliseconds) and times the same queries again. Run from
+the repository root:
+
+    python tests/benchmarks/bench_timestamps.py [--events 200000] [--attempts 20000]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+TESTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(TESTS))
+sys.path.insert(0, TESTS)
+
+from legacy import LEGACY_NOW, create_legacy_database, legacy_text  # noqa: E402
+
+from custom_components.secure_alarm.const import LOCKOUT_DURATION  # noqa: E402
+from custom_components.secure_alarm.database import AlarmDatabase  # noqa: E402
+from custom_components.secure_alarm.timestamps import to_ms  # noqa: E402
+
+QUERIES = {
+    "lockout window load": """
+        SELECT ip_address, timestamp FROM failed_attempts
+        WHERE timestamp > :lockout
+    """,
+    "lockout count of one source": """
+        SELECT COUNT(*) FROM failed_attempts
+        WHERE ip_address = 'keypad1' AND timestamp > :lockout
+    """,
+    "events in one day (count)": """
+        SELECT COUNT(*) FROM alarm_events
+        WHERE timestamp >= :since AND timestamp < :until
+    """,
+    "zone events in one day (page)": """
+        SELECT * FROM alarm_events
+        WHERE zone_entity_id = 'binary_sensor.zone3'
+            AND timestamp >= :since AND timestamp < :until
+        ORDER BY timestamp DESC, id DESC
+        LIMIT 50
+    """,
+}
+
+BOUNDS = {
+    "lockout": LEGACY_NOW - timedelta(seconds=LOCKOUT_DURATION),
+    "since": LEGACY_NOW - timedelta(days=2),
+    "until": LEGACY_NOW - timedelta(days=1),
+}
+
+
+def run(path, params, rounds):
+    """Return {query: (best ms, row count, plan)} on the database at ``path``."""
+    conn = sqlite3.connect(path)
+    results = {}
+    try:
+        for name, sql in QUERIES.items():
+            plan = " | ".join(
+                row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            )
+            best = None
+            for _ in range(rounds):
+                start = time.perf_counter()
+                rows = conn.execute(sql, params).fetchall()
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            count = rows[0][0] if sql.lstrip().startswith("SELECT COUNT") else len(rows)
+            results[name] = (best, count, plan)
+    finally:
+        conn.close()
+    return results
+
+
+def vacuumed_size(path):
+    """Return the database size in MiB after VACUUM."""
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path) / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--attempts", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "secure_alarm.db")
+        create_legacy_database(
+            path, events=args.events, attempts=args.attempts, zones=11
+        )
+
+        before = run(
+            path,
+            {key: legacy_text(value) for key, value in BOUNDS.items()},
+            args.rounds,
+        )
+        size_before = vacuumed_size(path)
+
+        start = time.perf_counter()
+        AlarmDatabase(path).close()
+        migrate_s = time.perf_counter() - start
+
+        after = run(
+            path, {key: to_ms(value) for key, value in BOUNDS.items()}, args.rounds
+        )
+        size_after = vacuumed_size(path)
+
+    print(
+        f"{args.events} events, {args.attempts} failed attempts, best of {args.rounds}"
+    )
+    print(f"migration (incl. startup)  {migrate_s:.2f} s")
+    # The migrated file also holds the indexes added since the legacy schema
+    print(f"file size after VACUUM     {size_before:.1f} MiB -> {size_after:.1f} MiB")
+    for name in QUERIES:
+        (ms_before, rows_before, plan_before), (ms_after, rows_after, plan_after) = (
+            before[name],
+            after[name],
+        )
+        assert rows_before == rows_after, f"{name}: {rows_before} != {rows_after} rows"
+        print(
+            f"{name:30} {ms_before:8.2f} ms -> {ms_after:8.2f} ms  ({rows_after} rows)"
+        )
+        print(f"    before: {plan_before}")
+        print(f"    after:  {plan_after}")
+
+
+if __name__ == "__main__":
+    main()
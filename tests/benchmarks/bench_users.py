@@ -0,0 +1,136 @@
+"""Benchmark get_users with many users and locks.
+
+Compares the old per-user lock query (N+1), the single aggregated query
+that loads the user directory, and ``get_users`` served from the
+directory. Run from the repository root:
+
+    python tests/benchmarks/bench_users.py [--users 500] [--locks 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from custom_components.secure_alarm.const import TABLE_USERS  # noqa: E402
+from custom_components.secure_alarm.database import AlarmDatabase  # noqa: E402
+
+
+def n_plus_one(db):
+    """Return users the way get_users did before the directory: one query per user."""
+    with db._connections.read() as cursor:
+        cursor.execute(f"""
+            SELECT id, name, is_admin, is_duress, enabled, phone, email,
+                has_separate_lock_pin, created_at, last_used, use_count
+            FROM {TABLE_USERS}
+            ORDER BY name
+        """)
+        users = [dict(row) for row in cursor.fetchall()]
+
+        for user in users:
+            cursor.execute(
+                """
+                SELECT lock_entity_id FROM user_lock_access
+                WHERE user_id = ?
+            """,
+                (user["id"],),
+            )
+            user["accessible_locks"] = [
+                row["lock_entity_id"] for row in cursor.fetchall()
+            ]
+
+    return users
+
+
+def aggregated(db):
+    """Return users from the one LEFT JOIN / GROUP_CONCAT query loading the directory."""
+    with db._connections.read() as cursor:
+        users = db._fetch_users(cursor)
+    return [user.as_dict() for user in sorted(users, key=lambda user: user.name)]
+
+
+def normalized(users):
+    """Return users with their locks sorted (GROUP_CONCAT order is unspecified)."""
+    return [
+        {**user, "accessible_locks": sorted(user["accessible_locks"])} for user in users
+    ]
+
+
+def best_ms(func, rounds):
+    """Return the fastest of ``rounds`` calls of ``func``, in ms."""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def fill(path, users, locks):
+    """Create a database with ``users`` users that can each open ``locks`` locks."""
+    db = AlarmDatabase(path)
+    with db._connections.write() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {TABLE_USERS} (name, pin_hash) VALUES (?, ?)",
+            [(f"User {i:04d}", "$2b$10$" + "x" * 53) for i in range(users)],
+        )
+        cursor.execute(f"SELECT id FROM {TABLE_USERS}")
+        ids = [row["id"] for row in cursor.fetchall()]
+        cursor.executemany(
+            "INSERT INTO user_lock_access (user_id, lock_entity_id) VALUES (?, ?)",
+            [
+                (user_id, f"lock.door_{lock:02d}")
+                for user_id in ids
+                for lock in range(locks)
+            ],
+        )
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--locks", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "secure_alarm.db")
+        fill(path, args.users, args.locks)
+
+        # Reopen so the directory is loaded the way it is at startup
+        start = time.perf_counter()
+        db = AlarmDatabase(path)
+        startup_ms = (time.perf_counter() - start) * 1000
+        try:
+            assert (
+                normalized(n_plus_one(db))
+                == normalized(aggregated(db))
+                == normalized(db.get_users())
+            ), "implementations disagree"
+
+            print(f"{args.users} users x {args.locks} locks, best of {args.rounds}")
+            print(
+                f"  N+1 queries (before)   {best_ms(lambda: n_plus_one(db), args.rounds):8.2f} ms"
+            )
+            print(
+                f"  aggregated query       {best_ms(lambda: aggregated(db), args.rounds):8.2f} ms"
+            )
+            print(
+                f"  directory (get_users)  {best_ms(db.get_users, args.rounds):8.2f} ms"
+            )
+            print(
+                f"  startup incl. load     {startup_ms:8.2f} ms (includes bcrypt calibration)"
+            )
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
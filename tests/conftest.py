@@ -0,0 +1,18 @@
+"""Shared fixtures for the Secure Alarm System tests."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.secure_alarm.database import AlarmDatabase  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Return an empty database in a temporary directory."""
+    db = AlarmDatabase(str(tmp_path / "secure_alarm.db"), pepper=b"test-pepper")
+    yield db
+    db.close()
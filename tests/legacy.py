@@ -0,0 +1,135 @@
+"""Build databases in the schema of versions before epoch millisecond timestamps."""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+LEGACY_SCHEMA = """
+    CREATE TABLE alarm_users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        pin_hash TEXT NOT NULL,
+        is_admin INTEGER DEFAULT 0,
+        is_duress INTEGER DEFAULT 0,
+        enabled INTEGER DEFAULT 1,
+        phone TEXT,
+        email TEXT,
+        has_separate_lock_pin INTEGER DEFAULT 0,
+        lock_pin_hash TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_used TIMESTAMP,
+        use_count INTEGER DEFAULT 0
+    );
+    CREATE TABLE alarm_config (
+        id INTEGER PRIMARY KEY DEFAULT 1,
+        entry_delay INTEGER DEFAULT 30,
+        exit_delay INTEGER DEFAULT 60,
+        alarm_duration INTEGER DEFAULT 300,
+        trigger_doors TEXT,
+        notification_mobile INTEGER DEFAULT 1,
+        notification_sms INTEGER DEFAULT 0,
+        sms_numbers TEXT,
+        lock_delay_home INTEGER DEFAULT 0,
+        lock_delay_away INTEGER DEFAULT 60,
+        close_delay_home INTEGER DEFAULT 0,
+        close_delay_away INTEGER DEFAULT 60,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE alarm_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_type TEXT NOT NULL,
+        user_id INTEGER,
+        user_name TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        state_from TEXT,
+        state_to TEXT,
+        zone_entity_id TEXT,
+        details TEXT,
+        is_duress INTEGER DEFAULT 0
+    );
+    CREATE TABLE failed_attempts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        ip_address TEXT,
+        user_code TEXT,
+        attempt_type TEXT
+    );
+    CREATE TABLE alarm_zones (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entity_id TEXT UNIQUE NOT NULL,
+        zone_name TEXT NOT NULL,
+        zone_type TEXT NOT NULL,
+        enabled_away INTEGER DEFAULT 1,
+        enabled_home INTEGER DEFAULT 1,
+        bypassed INTEGER DEFAULT 0,
+        bypass_until TIMESTAMP,
+        last_state_change TIMESTAMP
+    );
+    CREATE TABLE user_lock_access (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        lock_entity_id TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(user_id, lock_entity_id),
+        FOREIGN KEY (user_id) REFERENCES alarm_users(id) ON DELETE CASCADE
+    );
+    INSERT INTO alarm_config (id) VALUES (1);
+    CREATE INDEX idx_events_timestamp ON alarm_events(timestamp DESC);
+    CREATE INDEX idx_failed_attempts_timestamp ON failed_attempts(timestamp DESC);
+"""
+
+# Rows are spread backwards from here, one event a minute
+LEGACY_NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def legacy_text(value: datetime) -> str:
+    """Format a UTC time the way CURRENT_TIMESTAMP did."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def create_legacy_database(
+    path: str, events: int = 100, attempts: int = 20, zones: int = 5
+) -> None:
+    """Create a legacy database with text timestamps and some rows in it."""
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute(
+        "INSERT INTO alarm_users (name, pin_hash, created_at, last_used) VALUES (?, ?, ?, ?)",
+        ("Alice", "$2b$10$" + "x" * 53, "2024-01-02 03:04:05", "2024-05-31 22:00:00"),
+    )
+    conn.execute(
+        "INSERT INTO user_lock_access (user_id, lock_entity_id) VALUES (1, 'lock.front_door')"
+    )
+    conn.executemany(
+        "INSERT INTO alarm_events (event_type, user_name, zone_entity_id, timestamp) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            (
+                "state_change",
+                "Alice",
+                f"binary_sensor.zone{i % zones}",
+                legacy_text(LEGACY_NOW - timedelta(minutes=events - i)),
+            )
+            for i in range(events)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO failed_attempts (ip_address, attempt_type, timestamp) VALUES (?, ?, ?)",
+        [
+            (
+                f"keypad{i % 3}",
+                "pin_auth",
+                legacy_text(LEGACY_NOW - timedelta(seconds=30 * (attempts - i))),
+            )
+            for i in range(attempts)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO alarm_zones (entity_id, zone_name, zone_type, last_state_change) "
+        "VALUES (?, ?, ?, ?)",
+        [
+            (f"binary_sensor.zone{i}", f"Zone {i}", "door", legacy_text(LEGACY_NOW))
+            for i in range(zones)
+        ],
+    )
+    conn.commit()
+    conn.close()
@@ -0,0 +1,56 @@
+"""Check when updating a user ends their admin sessions."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.secure_alarm.alarm_coordinator import AlarmCoordinator
+
+
+@pytest.fixture
+def admin(database):
+    """Return a coordinator, an admin's id and a session token of theirs."""
+    user_id = database.add_user("Alice", "123456", is_admin=True)
+    coordinator = AlarmCoordinator(SimpleNamespace(), database)
+    token = coordinator._sessions.create(user_id, "Alice")
+    yield coordinator, user_id, token
+    coordinator.shutdown()
+
+
+def update(coordinator, user_id, token, **fields):
+    args = {
+        key: fields.get(key)
+        for key in (
+            "name",
+            "pin",
+            "phone",
+            "email",
+            "is_admin",
+            "has_separate_lock_pin",
+            "lock_pin",
+        )
+    }
+    return asyncio.run(
+        coordinator.update_user(user_id, admin_pin=None, session_token=token, **args)
+    )
+
+
+def test_profile_edit_keeps_sessions(database, admin):
+    coordinator, user_id, token = admin
+
+    assert update(coordinator, user_id, token, name="Alice B", email="a@example.com")[
+        "success"
+    ]
+
+    assert coordinator._sessions.verify(token) is not None
+    assert database.users.get(user_id).is_admin
+
+
+def test_demotion_ends_sessions(database, admin):
+    coordinator, user_id, token = admin
+
+    assert update(coordinator, user_id, token, is_admin=False)["success"]
+
+    assert coordinator._sessions.verify(token) is None
+    assert not database.users.get(user_id).is_admin
@@ -0,0 +1,56 @@
+"""Check that admission counters are pushed to the sensors, coalesced."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.secure_alarm import alarm_coordinator
+from custom_components.secure_alarm.alarm_coordinator import AlarmCoordinator
+
+
+@pytest.fixture
+def later(monkeypatch):
+    """Record delayed callbacks instead of scheduling them."""
+    scheduled = []
+
+    def call_later(hass, delay, action):
+        scheduled.append(action)
+        return lambda: scheduled.remove(action)
+
+    monkeypatch.setattr(alarm_coordinator, "async_call_later", call_later)
+    return scheduled
+
+
+@pytest.fixture
+def coordinator(database):
+    coordinator = AlarmCoordinator(SimpleNamespace(), database)
+    yield coordinator
+    coordinator.shutdown()
+
+
+def test_pin_checks_push_one_update(database, coordinator, later):
+    database.add_user("Alice", "123456")
+    updates = []
+    remove = coordinator.add_admission_listener(lambda: updates.append(True))
+
+    for _ in range(3):
+        asyncio.run(coordinator._authenticate("123456"))
+
+    assert len(later) == 1 and not updates
+    later.pop()(None)
+    assert updates == [True] and not later
+
+    asyncio.run(coordinator._authenticate("123456"))
+    remove()
+    later.pop()(None)
+    assert updates == [True]
+
+
+def test_shutdown_cancels_pending_update(database, coordinator, later):
+    database.add_user("Alice", "123456")
+    asyncio.run(coordinator._authenticate("123456"))
+    assert len(later) == 1
+
+    coordinator.shutdown()
+    assert not later
@@ -0,0 +1,36 @@
+"""Check that audit entries are queued only after their transaction commits."""
+
+import pytest
+
+
+@pytest.fixture
+def write_depths(database):
+    """Record the writer's transaction depth each time an event is logged."""
+    depths = []
+    log_event = database.log_event
+
+    def record(*args, **kwargs):
+        depths.append(database._connections._write_depth)
+        return log_event(*args, **kwargs)
+
+    database.log_event = record
+    return depths
+
+
+def test_user_changes_log_outside_the_transaction(database, write_depths):
+    user_id = database.add_user("Alice", "123456")
+    write_depths.clear()
+
+    assert database.set_user_enabled(user_id, False)
+    assert database.remove_user(user_id)
+    assert write_depths == [0, 0]
+
+
+def test_zone_changes_log_outside_the_transaction(database, write_depths):
+    database.add_zone("binary_sensor.front", "Front", "entry")
+    database.set_zone_bypass("binary_sensor.front", True)
+    write_depths.clear()
+
+    assert database.clear_zone_bypasses()
+    assert database.remove_zone("binary_sensor.front")
+    assert write_depths == [0, 0]
@@ -0,0 +1,57 @@
+"""Check that the coordinator snapshot follows timed zone bypasses."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.secure_alarm import alarm_coordinator
+from custom_components.secure_alarm.alarm_coordinator import AlarmCoordinator
+from custom_components.secure_alarm.models import Zone
+from custom_components.secure_alarm.timestamps import now_ms
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    """Record point-in-time callbacks instead of scheduling them."""
+    scheduled = []
+
+    def track(hass, action, point_in_time):
+        scheduled.append((point_in_time, action))
+        return lambda: scheduled.remove((point_in_time, action))
+
+    monkeypatch.setattr(alarm_coordinator, "async_track_point_in_time", track)
+    return scheduled
+
+
+def test_snapshot_drops_expired_bypass(database, timers):
+    until = now_ms() + 200
+    database.zones.upsert_many(
+        [
+            Zone(
+                "binary_sensor.front",
+                "Front",
+                "entry",
+                bypassed=True,
+                bypass_until=until,
+            ),
+            Zone("binary_sensor.back", "Back", "perimeter", bypassed=True),
+        ]
+    )
+    coordinator = AlarmCoordinator(SimpleNamespace(), database)
+    updates = []
+    coordinator._listeners.append(lambda: updates.append(coordinator.snapshot))
+    coordinator._schedule_bypass_expiry()
+
+    assert set(coordinator.snapshot.bypassed_zones) == {"Front", "Back"}
+    assert [point.timestamp() * 1000 for point, _ in timers] == [pytest.approx(until)]
+
+    time.sleep(0.25)
+    _, refresh = timers[0]
+    refresh(None)
+
+    assert coordinator.snapshot.bypassed_zones == ("Back",)
+    assert updates and updates[-1].bypassed_zones == ("Back",)
+    # The untimed bypass leaves nothing to wait for
+    assert timers == []
+    coordinator.shutdown()
@@ -0,0 +1,46 @@
+"""Check that callers cannot pick their own lockout source."""
+
+import asyncio
+
+from homeassistant.core import Context, ServiceCall
+
+from custom_components.secure_alarm import _admission_scope
+from custom_components.secure_alarm.admission import AUTH_CALLER, SOURCE_SERVICE
+from custom_components.secure_alarm.const import MAX_FAILED_ATTEMPTS
+from custom_components.secure_alarm.failed_attempts import SourceLockouts
+
+
+def caller_of(data, user_id=None):
+    """Return the AuthCaller a service handler sees for a call."""
+
+    @_admission_scope
+    async def handler(call):
+        return AUTH_CALLER.get()
+
+    call = ServiceCall("secure_alarm", "disarm", data, Context(user_id=user_id))
+    return asyncio.run(handler(call))
+
+
+def test_code_is_not_the_lockout_source():
+    """Every code-only call is counted under the service entry point."""
+    sources = {
+        caller_of({"pin": "0000", "code": str(i)}).lockout_source for i in range(10)
+    }
+
+    assert sources == {SOURCE_SERVICE}
+
+
+def test_user_is_the_lockout_source():
+    caller = caller_of({"pin": "0000", "code": "x"}, user_id="abc")
+
+    assert caller.lockout_source == "user:abc"
+
+
+def test_global_fallback_matches_the_source_limit():
+    """Failures spread over many sources lock everyone out as quickly as before."""
+    lockouts = SourceLockouts()
+    for i in range(MAX_FAILED_ATTEMPTS):
+        assert not lockouts.is_locked_out(now=1000.0 + i)
+        lockouts.record(f"user:{i}", 1000.0 + i)
+
+    assert lockouts.is_locked_out(now=1000.0 + MAX_FAILED_ATTEMPTS)
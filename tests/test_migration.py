@@ -0,0 +1,84 @@
+"""Check the migration of legacy text timestamps to epoch milliseconds."""
+
+from datetime import timedelta
+
+import pytest
+from legacy import LEGACY_NOW, create_legacy_database
+
+from custom_components.secure_alarm.const import DB_SCHEMA_VERSION
+from custom_components.secure_alarm.database import AlarmDatabase
+from custom_components.secure_alarm.timestamps import to_ms
+
+
+@pytest.fixture
+def migrated(tmp_path):
+    """Return a database opened on a legacy file, and the file's path."""
+    path = str(tmp_path / "secure_alarm.db")
+    create_legacy_database(path, events=100, attempts=20)
+    db = AlarmDatabase(path, pepper=b"test-pepper")
+    yield db, path
+    db.close()
+
+
+def column_types(db, table):
+    with db._connections.read() as cursor:
+        cursor.execute(f"PRAGMA table_info({table})")
+        return {row["name"]: row["type"] for row in cursor.fetchall()}
+
+
+def test_schema_version(migrated):
+    db, _ = migrated
+    with db._connections.read() as cursor:
+        cursor.execute("PRAGMA user_version")
+        assert cursor.fetchone()[0] == DB_SCHEMA_VERSION
+
+    assert column_types(db, "alarm_events")["timestamp"] == "INTEGER"
+    assert column_types(db, "failed_attempts")["timestamp"] == "INTEGER"
+    assert column_types(db, "alarm_users")["last_used"] == "INTEGER"
+    assert column_types(db, "alarm_zones")["last_state_change"] == "INTEGER"
+
+
+def test_times_are_preserved(migrated):
+    db, _ = migrated
+    events = list(db.iter_events())
+
+    assert len(events) == 100
+    assert events[0]["timestamp"] == to_ms(LEGACY_NOW - timedelta(minutes=100))
+    assert events[-1]["timestamp"] == to_ms(LEGACY_NOW - timedelta(minutes=1))
+
+    user = db.get_users()[0]
+    assert user["last_used"] == to_ms(LEGACY_NOW - timedelta(hours=14))
+    assert user["accessible_locks"] == ["lock.front_door"]
+
+
+def test_ids_are_not_reused(migrated):
+    db, _ = migrated
+    db.log_event("state_change")
+    db._audit.flush()
+
+    ids = [event["id"] for event in db.iter_events()]
+    assert ids == list(range(1, 102))
+
+
+def test_time_range_after_migration(migrated):
+    db, _ = migrated
+    since = to_ms(LEGACY_NOW - timedelta(minutes=30))
+
+    page = db.query_events(limit=100, since=since)
+    assert page["total"] == 30
+
+    attempts = db.query_failed_attempts(
+        limit=100, since=to_ms(LEGACY_NOW - timedelta(minutes=5))
+    )
+    assert attempts["total"] == 10
+
+
+def test_migration_runs_once(migrated):
+    db, path = migrated
+    db.close()
+
+    reopened = AlarmDatabase(path, pepper=b"test-pepper")
+    try:
+        assert len(list(reopened.iter_events())) == 100
+    finally:
+        reopened.close()
@@ -0,0 +1,85 @@
+"""Check when stored PIN hashes are rehashed, and that it stays off the login path."""
+
+import time
+
+import bcrypt
+import pytest
+
+from custom_components.secure_alarm.const import TABLE_USERS
+from custom_components.secure_alarm.pin_hasher import PinHasher, hash_cost
+
+
+def fake_hash(cost):
+    """Return a string shaped like a bcrypt hash of ``cost``."""
+    return f"$2b${cost:02d}$" + "x" * 53
+
+
+@pytest.mark.parametrize(
+    "stored, rehash",
+    [(12, False), (11, False), (13, False), (10, True), (14, True), (3, True)],
+)
+def test_needs_rehash_tolerance(stored, rehash):
+    """Costs within one step of the chosen cost are kept; weak ones never are."""
+    hasher = PinHasher(min_cost=4, max_cost=14)
+    hasher._cost = 12
+
+    assert hasher.needs_rehash(fake_hash(stored)) is rehash
+
+
+def test_needs_rehash_below_minimum():
+    """A hash below the minimum cost is replaced even within the tolerance."""
+    hasher = PinHasher(min_cost=10, max_cost=14)
+
+    assert hasher.needs_rehash(fake_hash(9))
+    assert hasher.needs_rehash("not a bcrypt hash")
+
+
+def stored_hash(database, user_id):
+    with database._connections.read() as cursor:
+        cursor.execute(f"SELECT pin_hash FROM {TABLE_USERS} WHERE id = ?", (user_id,))
+        return cursor.fetchone()["pin_hash"]
+
+
+def wait_for_rehash(database, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not database._usage._pins:
+        assert time.monotonic() < deadline, "rehash was never queued"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def weak_user(database):
+    """Return the id of a user whose PIN is stored below the minimum cost."""
+    user_id = database.add_user("Alice", "1234")
+    with database._connections.write() as cursor:
+        cursor.execute(
+            f"UPDATE {TABLE_USERS} SET pin_hash = ? WHERE id = ?",
+            (bcrypt.hashpw(b"1234", bcrypt.gensalt(4)).decode(), user_id),
+        )
+    database.flush_usage()
+    return user_id
+
+
+def test_rehash_is_written_behind(database, weak_user):
+    """A login returns before the rehash is stored; the next flush stores it."""
+    assert database.authenticate_user("1234")["id"] == weak_user
+    assert hash_cost(stored_hash(database, weak_user)) == 4
+
+    wait_for_rehash(database)
+    database.flush_usage()
+
+    new_hash = stored_hash(database, weak_user)
+    assert hash_cost(new_hash) == database.pin_hasher.cost
+    assert database.authenticate_user("1234")["id"] == weak_user
+
+
+def test_rehash_does_not_undo_a_pin_change(database, weak_user):
+    """A PIN changed before the flush is not overwritten by the rehash."""
+    assert database.authenticate_user("1234")["id"] == weak_user
+    wait_for_rehash(database)
+
+    assert database.update_user(weak_user, pin="5678")
+    database.flush_usage()
+
+    assert database.authenticate_user("5678")["id"] == weak_user
+    assert database.authenticate_user("1234") is None
@@ -0,0 +1,154 @@
+"""Check that paged and streamed audit queries are read in index order."""
+
+from contextlib import contextmanager
+
+import pytest
+
+from custom_components.secure_alarm.const import TABLE_EVENTS, TABLE_FAILED_ATTEMPTS
+
+EVENT_TYPES = ("state_change", "disarm", "failed_attempt", "zone_bypassed")
+BASE_MS = 1_700_000_000_000
+
+
+class PlanRecorder:
+    """Cursor wrapper recording the plan of every SELECT it runs."""
+
+    def __init__(self, cursor, plans):
+        self._cursor = cursor
+        self._plans = plans
+
+    def execute(self, sql, params=()):
+        if sql.lstrip().upper().startswith("SELECT") and "COUNT(*)" not in sql:
+            rows = self._cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+            self._plans.append(" | ".join(row["detail"] for row in rows))
+        return self._cursor.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+@pytest.fixture(params=[False, True], ids=["fresh", "analyzed"])
+def plans(request, database):
+    """Fill the audit tables and record the plan of every read query."""
+    with database._connections.write() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {TABLE_EVENTS} (event_type, user_name, zone_entity_id, timestamp) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (
+                    EVENT_TYPES[i % 4],
+                    f"user{i % 7}",
+                    f"binary_sensor.zone{i % 11}",
+                    BASE_MS + (i // 3) * 1000,
+                )
+                for i in range(3000)
+            ],
+        )
+        cursor.executemany(
+            f"INSERT INTO {TABLE_FAILED_ATTEMPTS} (ip_address, attempt_type, timestamp) "
+            "VALUES (?, ?, ?)",
+            [(f"keypad{i % 5}", "pin", BASE_MS + (i // 2) * 1000) for i in range(1000)],
+        )
+        if request.param:
+            cursor.execute("ANALYZE")
+
+    recorded = []
+    read = database._connections.read
+
+    @contextmanager
+    def recording_read():
+        with read() as cursor:
+            yield PlanRecorder(cursor, recorded)
+
+    database._connections.read = recording_read
+    yield recorded
+
+
+def assert_index_order(plans, index):
+    """Assert every recorded query used ``index`` and needed no sort."""
+    assert plans
+    for plan in plans:
+        assert "TEMP B-TREE" not in plan, plan
+        assert index in plan, plan
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        ({}, "idx_events_timestamp_id"),
+        (
+            {"since": BASE_MS + 100_000, "until": BASE_MS + 500_000},
+            "idx_events_timestamp_id",
+        ),
+        ({"event_types": ["disarm"]}, "idx_events_type_timestamp_id"),
+        ({"event_types": ["disarm", "zone_bypassed"]}, "idx_events_type_timestamp_id"),
+        (
+            {"event_types": ["disarm", "state_change"], "since": BASE_MS + 100_000},
+            "idx_events_type_timestamp_id",
+        ),
+        ({"zone_entity_id": "binary_sensor.zone3"}, "idx_events_zone_timestamp_id"),
+        ({"user_name": "user2"}, "idx_events_user_timestamp_id"),
+    ],
+)
+def test_event_pages(database, plans, filters, index):
+    """First and cursor pages of the audit log need no sort."""
+    page = database.query_events(limit=20, **filters)
+    database.query_events(limit=20, after=page["next_key"], **filters)
+
+    assert_index_order(plans, index)
+
+
+def test_event_pages_match_unfiltered_order(database, plans):
+    """Merging one branch per event type keeps the keyset order."""
+    types = ["disarm", "zone_bypassed"]
+    expected = [
+        item
+        for item in database.query_events(limit=5000, fields=["id", "event_type"])[
+            "items"
+        ]
+        if item["event_type"] in types
+    ]
+
+    items, key = [], None
+    while True:
+        page = database.query_events(
+            limit=40, fields=["id", "event_type"], event_types=types, after=key
+        )
+        items.extend(page["items"])
+        key = page["next_key"]
+        if key is None:
+            break
+
+    assert items == expected
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        ({}, "idx_failed_attempts_timestamp_id"),
+        ({"source": "keypad2"}, "idx_failed_attempts_source_timestamp_id"),
+    ],
+)
+def test_failed_attempt_pages(database, plans, filters, index):
+    """First and cursor pages of failed attempts need no sort."""
+    page = database.query_failed_attempts(limit=20, **filters)
+    database.query_failed_attempts(limit=20, after=page["next_key"], **filters)
+
+    assert_index_order(plans, index)
+
+
+@pytest.mark.parametrize(
+    "event_types, index",
+    [
+        (None, "idx_events_timestamp_id"),
+        (["disarm", "state_change"], "idx_events_type_timestamp_id"),
+    ],
+)
+def test_event_stream(database, plans, event_types, index):
+    """Streaming live events for an export reads chunks in index order."""
+    events = list(database.iter_events(event_types=event_types))
+
+    assert [(e["timestamp"], e["id"]) for e in events] == sorted(
+        (e["timestamp"], e["id"]) for e in events
+    )
+    assert_index_order(plans, index)
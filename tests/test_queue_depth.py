@@ -0,0 +1,34 @@
+"""Check that every job on the database thread is counted in queue_depth."""
+
+import threading
+import time
+
+import pytest
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.mark.parametrize("writer", ["audit", "usage"])
+def test_timed_flush_is_counted(database, writer):
+    """A timed flush waiting behind another job shows in queue_depth."""
+    release = threading.Event()
+    blocker = database.submit_job(release.wait)
+    assert database.queue_depth == 1
+
+    if writer == "audit":
+        database._audit._flush_interval = 0.01
+        database.log_event("state_change")
+    else:
+        database._usage._flush_interval = 0.01
+        database.clear_failed_attempts("keypad1")
+
+    wait_for(lambda: database.queue_depth == 2)
+
+    release.set()
+    blocker.result()
+    wait_for(lambda: database.queue_depth == 0)
@@ -0,0 +1,55 @@
+"""Check that write-behind writers keep a batch whose write failed."""
+
+import sqlite3
+
+from custom_components.secure_alarm.const import TABLE_EVENTS, TABLE_USERS
+
+
+def fail_next_write(writer):
+    """Make the writer's next batch write raise after the batch was taken."""
+    write = writer._write
+    failed = []
+
+    def flaky_write(cursor, batch):
+        if not failed:
+            failed.append(True)
+            raise sqlite3.OperationalError("disk I/O error")
+        write(cursor, batch)
+
+    writer._write = flaky_write
+    return failed
+
+
+def count(database, sql):
+    with database._connections.read() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchone()[0]
+
+
+def test_audit_events_survive_a_failed_flush(database):
+    database.log_event("state_change")
+    database.log_event("disarm")
+    failed = fail_next_write(database._audit)
+
+    database._audit.flush()
+    assert failed and database._audit.pending == 2
+
+    database._audit.flush()
+    assert database._audit.pending == 0
+    assert count(database, f"SELECT COUNT(*) FROM {TABLE_EVENTS}") == 2
+
+
+def test_usage_survives_a_failed_flush(database):
+    user_id = database.add_user("Alice", "123456")
+    database.flush_usage()
+    database._usage.record_use(user_id, 1000)
+    failed = fail_next_write(database._usage)
+
+    database.flush_usage()
+    assert failed and database._usage.pending == 1
+
+    database._usage.record_use(user_id, 2000)
+    database.flush_usage()
+    assert database._usage.pending == 0
+    assert count(database, f"SELECT use_count FROM {TABLE_USERS}") == 2
+    assert count(database, f"SELECT last_used FROM {TABLE_USERS}") == 2000